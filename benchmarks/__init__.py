@@ -0,0 +1 @@
+"""Benchmark suite for geomeffibem, run with asv (https://asv.readthedocs.io)."""
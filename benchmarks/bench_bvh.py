@@ -0,0 +1,38 @@
+"""Benchmarks for the bounding volume hierarchy queries."""
+
+import numpy as np
+
+from benchmarks.generators import boxGrid
+from geomeffibem.bvh import SurfaceBVH
+
+
+class BVHSuite:
+    """Build and batched queries, on a grid of box zones, with 10000 rays or points."""
+
+    params = [5, 20, 50]
+    param_names = ['nPerSide']
+
+    def setup(self, nPerSide):
+        """Build the zones, the tree and the queries."""
+        self.zones = boxGrid(nPerSide, nStories=2)
+        self.bvh = SurfaceBVH.from_polyhedra(self.zones)
+        extent = 10.0 * nPerSide
+        rng = np.random.default_rng(0)
+        self.origins = rng.uniform([0.0, 0.0, 0.0], [extent, extent, 6.0], size=(10000, 3))
+        self.directions = rng.normal(size=(10000, 3))
+
+    def time_build(self, nPerSide):
+        """SurfaceBVH.from_polyhedra."""
+        SurfaceBVH.from_polyhedra(self.zones)
+
+    def time_intersectRays(self, nPerSide):
+        """First hit of each ray."""
+        self.bvh.intersectRays(self.origins, self.directions)
+
+    def time_pointsInZones(self, nPerSide):
+        """Zone of each point."""
+        self.bvh.pointsInZones(self.origins)
+
+    def time_nearestSurfaces(self, nPerSide):
+        """Closest surface of each point."""
+        self.bvh.nearestSurfaces(self.origins)
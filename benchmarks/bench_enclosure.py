@@ -0,0 +1,20 @@
+"""Benchmarks for the batch enclosure checks, on many small zones."""
+
+from benchmarks.generators import nStoryBox, tJunctionZone
+from geomeffibem.enclosure import checkEnclosures
+from geomeffibem.surfacearray import SurfaceArray
+
+
+class EnclosureSuite:
+    """checkEnclosures, serial versus on a process pool, for an increasing number of zones."""
+
+    params = ([1, None], [10, 100, 500])
+    param_names = ['maxWorkers', 'nZones']
+
+    def setup(self, maxWorkers, nZones):
+        """Build the zones, half of them needing the second (collinear) pass."""
+        self.zones = [SurfaceArray.from_polyhedron(nStoryBox(3) if i % 2 else tJunctionZone(4)) for i in range(nZones)]
+
+    def time_checkEnclosures(self, maxWorkers, nZones):
+        """checkEnclosures."""
+        checkEnclosures(self.zones, maxWorkers=maxWorkers)
@@ -0,0 +1,9 @@
+"""Benchmarks for the import time of the package."""
+
+
+def timeraw_import_geomeffibem():
+    """Import of geomeffibem in a fresh interpreter.
+
+    It's about 0.2-0.3 s, mostly numpy, since openstudio and matplotlib are imported lazily.
+    """
+    return "import geomeffibem"
@@ -0,0 +1,43 @@
+"""Benchmarks for surface matching across spaces."""
+
+from benchmarks.generators import boxGrid
+from geomeffibem.clipping import intersectMatches
+from geomeffibem.matching import findMatchingSurfaces
+from geomeffibem.surfacearray import SurfaceArray
+
+
+class MatchingSuite:
+    """findMatchingSurfaces on a grid of adjacent boxes, up to about 50k surfaces."""
+
+    params = [5, 20, 50, 90]
+    param_names = ['nPerSide']
+    timeout = 300
+
+    def setup(self, nPerSide):
+        """Build the spaces."""
+        self.spaces = [SurfaceArray.from_polyhedron(zonePoly) for zonePoly in boxGrid(nPerSide)]
+
+    def time_findMatchingSurfaces(self, nPerSide):
+        """findMatchingSurfaces."""
+        findMatchingSurfaces(self.spaces)
+
+    def track_numSurfaces(self, nPerSide):
+        """Number of surfaces, to put the timings in perspective."""
+        return sum(len(sa) for sa in self.spaces)
+
+
+class IntersectMatchesSuite:
+    """intersectMatches on all the matched surfaces of a multi-story grid of boxes, up to about 5000 spaces."""
+
+    params = [10, 32]
+    param_names = ['nPerSide']
+    timeout = 300
+
+    def setup(self, nPerSide):
+        """Build the spaces and match their surfaces."""
+        self.spaces = [SurfaceArray.from_polyhedron(zonePoly) for zonePoly in boxGrid(nPerSide, nStories=5)]
+        self.matches = findMatchingSurfaces(self.spaces)
+
+    def time_intersectMatches(self, nPerSide):
+        """intersectMatches."""
+        intersectMatches(self.spaces, self.matches)
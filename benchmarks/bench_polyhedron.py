@@ -0,0 +1,70 @@
+"""Benchmarks for the Polyhedron operations, on synthetic zones of increasing size."""
+
+from benchmarks.generators import GENERATORS
+
+
+class PolyhedronSuite:
+    """Enclosure check, unique vertices and volume. The sizes give the scaling curve of each operation."""
+
+    params = (list(GENERATORS), [1, 10, 50, 200])
+    param_names = ['generator', 'size']
+
+    def setup(self, generator, size):
+        """Build the zone."""
+        self.zonePoly = GENERATORS[generator](size)
+
+    def time_isEnclosedVolume(self, generator, size):
+        """Polyhedron.isEnclosedVolume. For tJunctionZone, this includes the collinear update and second pass."""
+        self.zonePoly.isEnclosedVolume()
+
+    def time_uniqueVertices(self, generator, size):
+        """Polyhedron.uniqueVertices."""
+        self.zonePoly.uniqueVertices()
+
+    def time_edgesNotTwoForEnclosedVolumeTest(self, generator, size):
+        """Edge matching."""
+        self.zonePoly.edgesNotTwoForEnclosedVolumeTest(self.zonePoly)
+
+    def time_updateZonePolygonsForMissingColinearPoints(self, generator, size):
+        """Collinear vertex insertion."""
+        self.zonePoly.updateZonePolygonsForMissingColinearPoints()
+
+    def time_calcPolyhedronVolume(self, generator, size):
+        """Polyhedron.calcPolyhedronVolume."""
+        self.zonePoly.calcPolyhedronVolume()
+
+    def track_numSurfaces(self, generator, size):
+        """Number of surfaces of the zone, to put the timings in perspective."""
+        return len(self.zonePoly.surfaces)
+
+
+class IncrementalEnclosureSuite:
+    """Moving one surface and checking the enclosure again, with the persistent edge counts vs from scratch."""
+
+    params = ([1, 10, 50, 200],)
+    param_names = ['size']
+
+    def setup(self, size):
+        """Build the zone, its edge counts and their cached splits, and a move of one wall back and forth."""
+        from geomeffibem.transformation import Transformation
+        from geomeffibem.vertex import Vertex
+
+        self.zonePoly = GENERATORS['tJunctionZone'](size)
+        self.zonePoly.isEnclosedVolume(incremental=True)
+        self.wall = self.zonePoly.surfaces[-1]
+        self.moves = [
+            Transformation.Translation(Vertex(0.0, 0.0, 1.0)),
+            Transformation.Translation(Vertex(0.0, 0.0, -1.0)),
+        ]
+
+    def time_move_isEnclosedVolume_incremental(self, size):
+        """Polyhedron.transformSurface then isEnclosedVolume(incremental=True)."""
+        for move in self.moves:
+            self.zonePoly.transformSurface(self.wall, move)
+            self.zonePoly.isEnclosedVolume(incremental=True)
+
+    def time_move_isEnclosedVolume_full(self, size):
+        """The same moves, with a full isEnclosedVolume after each."""
+        for move in self.moves:
+            self.zonePoly.transformSurface(self.wall, move)
+            self.zonePoly.isEnclosedVolume()
@@ -0,0 +1,117 @@
+"""Benchmarks for the Surface operations and Transformations, over many surfaces."""
+
+import numpy as np
+
+from benchmarks.generators import lShape
+from geomeffibem.surface import Surface, plot_vertices
+from geomeffibem.surfacearray import SurfaceArray
+from geomeffibem.transformation import Transformation
+from geomeffibem.vertex import Vertex
+
+
+class SurfaceSuite:
+    """Derived properties and splitting, for all the surfaces of an L-shaped zone."""
+
+    params = [10, 100, 1000]
+    param_names = ['nStories']
+
+    def setup(self, nStories):
+        """All surfaces of an L-shaped zone."""
+        self.surfaces = lShape(nStories).surfaces
+
+    def time_area(self, nStories):
+        """Surface.area."""
+        for surface in self.surfaces:
+            surface.area()
+
+    def time_outwardNormal(self, nStories):
+        """Surface.outwardNormal."""
+        for surface in self.surfaces:
+            surface.outwardNormal()
+
+    def time_all_properties(self, nStories):
+        """A report asking for every derived property of each surface, twice."""
+        for _ in range(2):
+            for surface in self.surfaces:
+                surface.area()
+                surface.perimeter()
+                surface.tilt()
+                surface.azimuth()
+                surface.get_plane()
+
+    def time_split_into_n_segments(self, nStories):
+        """Surface.split_into_n_segments, on the walls."""
+        for surface in self.surfaces[2:]:
+            surface.split_into_n_segments(n_segments=4, axis='z')
+
+
+class SubdivisionSuite:
+    """Splitting rotated walls in 20 by 20 tiles, all at once."""
+
+    params = [100, 1000]
+    param_names = ['nSurfaces']
+
+    def setup(self, nSurfaces):
+        """Walls along x, rotated by a different angle each."""
+        walls = [
+            Surface.Rectangle(min_x=i, max_x=i + 1.0, min_y=0.0, max_y=0.0, min_z=0.0, max_z=3.0).rotate(float(i))
+            for i in range(nSurfaces)
+        ]
+        self.surfaceArray = SurfaceArray.from_surfaces(walls)
+
+    def time_subdivide(self, nSurfaces):
+        """SurfaceArray.subdivide."""
+        self.surfaceArray.subdivide(nX=20, nY=20)
+
+
+class TransformationSuite:
+    """Rotating all the surfaces of a model, one by one or all at once."""
+
+    params = [100, 1000, 10000]
+    param_names = ['nSurfaces']
+
+    def setup(self, nSurfaces):
+        """Walls along x, and a rotation."""
+        self.surfaces = [
+            Surface.from_numpy_array([[i, 0.0, 3.0], [i, 0.0, 0.0], [i + 1.0, 0.0, 0.0], [i + 1.0, 0.0, 3.0]])
+            for i in range(nSurfaces)
+        ]
+        self.coords = np.concatenate([s.to_numpy() for s in self.surfaces])
+        self.rotation = Transformation.Rotation(axis=Vertex(0.0, 0.0, 1.0), radians=0.3)
+
+    def time_mul_surface(self, nSurfaces):
+        """Transformation * Surface, for each surface."""
+        for surface in self.surfaces:
+            self.rotation * surface
+
+    def time_apply_many(self, nSurfaces):
+        """Transformation.apply_many."""
+        self.rotation.apply_many(self.surfaces)
+
+    def time_apply_in_place(self, nSurfaces):
+        """Transformation.apply on the concatenated coordinates, in place."""
+        self.rotation.apply(self.coords, out=self.coords)
+
+
+class PlotSuite:
+    """plot_vertices, for an axis-aligned and a rotated surface."""
+
+    params = [False, True]
+    param_names = ['rotated']
+
+    def setup(self, rotated):
+        """A named floor."""
+        import matplotlib
+
+        matplotlib.use('Agg')
+        self.surface = Surface.Floor()
+        if rotated:
+            self.surface = self.surface.rotate(30.0)
+        self.surface.name = "Floor"
+
+    def time_plot_vertices(self, rotated):
+        """plot_vertices, including the figure creation."""
+        import matplotlib.pyplot as plt
+
+        plot_vertices(self.surface, name=self.surface.name)
+        plt.close('all')
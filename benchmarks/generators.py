@@ -0,0 +1,116 @@
+"""Synthetic building generators for the benchmarks.
+
+Zones are extruded from a footprint (counterclockwise seen from above), with walls split per story and optionally in
+several segments along each side, which creates collinear T-junctions with the floor and roof edges.
+"""
+
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+from geomeffibem.polyhedron import Polyhedron
+from geomeffibem.surface import Surface
+
+
+def boxFootprint(width: float = 10.0, depth: float = 10.0) -> List[Tuple[float, float]]:
+    """A rectangular footprint."""
+    return [(0.0, 0.0), (width, 0.0), (width, depth), (0.0, depth)]
+
+
+def lShapeFootprint(width: float = 20.0, depth: float = 20.0, notch: float = 10.0) -> List[Tuple[float, float]]:
+    """An L-shaped footprint: a width x depth rectangle with a notch x notch square removed from a corner."""
+    return [
+        (0.0, 0.0),
+        (width, 0.0),
+        (width, depth - notch),
+        (width - notch, depth - notch),
+        (width - notch, depth),
+        (0.0, depth),
+    ]
+
+
+def extrudedZone(
+    footprint: Sequence[Tuple[float, float]], nStories: int = 1, floorHeight: float = 3.0, wallSegments: int = 1
+) -> Polyhedron:
+    """Extrudes a footprint into a Polyhedron.
+
+    Args:
+    -----
+    * footprint: the (x, y) points of the floor, counterclockwise seen from above
+    * nStories (int): each wall is split in that many stories
+    * floorHeight (float): the height of a story
+    * wallSegments (int): each wall is split in that many segments along the footprint side. With more than one,
+      the floor and roof edges have collinear points on them and isEnclosedVolume needs its second pass
+
+    Returns:
+    ---------
+    * a Polyhedron with 2 + len(footprint) * nStories * wallSegments surfaces
+    """
+    pts = np.array(footprint, dtype=float)
+    height = nStories * floorHeight
+    floor = np.column_stack([pts[::-1], np.zeros(len(pts))])
+    roof = np.column_stack([pts, np.full(len(pts), height)])
+    surfaces = [Surface.from_numpy_array(floor, name="Floor"), Surface.from_numpy_array(roof, name="Roof")]
+
+    for i, start in enumerate(pts):
+        end = pts[(i + 1) % len(pts)]
+        for j in range(wallSegments):
+            left = start + (end - start) * j / wallSegments
+            right = start + (end - start) * (j + 1) / wallSegments
+            for k in range(nStories):
+                bottom = k * floorHeight
+                top = bottom + floorHeight
+                # Upper Left Corner, counterclockwise seen from outside
+                wall = np.array(
+                    [
+                        [left[0], left[1], top],
+                        [left[0], left[1], bottom],
+                        [right[0], right[1], bottom],
+                        [right[0], right[1], top],
+                    ]
+                )
+                surfaces.append(Surface.from_numpy_array(wall, name=f"Wall {i + 1}-{j + 1}-{k + 1}"))
+
+    return Polyhedron(surfaces=surfaces)
+
+
+def nStoryBox(nStories: int) -> Polyhedron:
+    """A box with its walls split per story. Enclosed on the first pass."""
+    return extrudedZone(boxFootprint(), nStories=nStories)
+
+
+def lShape(nStories: int) -> Polyhedron:
+    """An L-shaped zone with its walls split per story. Enclosed on the first pass."""
+    return extrudedZone(lShapeFootprint(), nStories=nStories)
+
+
+def tJunctionZone(wallSegments: int) -> Polyhedron:
+    """A box with each wall split in segments, so floor and roof edges have collinear T-junctions."""
+    return extrudedZone(boxFootprint(), wallSegments=wallSegments)
+
+
+def boxGrid(nPerSide: int, nStories: int = 1, floorHeight: float = 3.0, size: float = 10.0) -> List[Polyhedron]:
+    """A nPerSide x nPerSide x nStories grid of adjacent box zones, each with 6 surfaces, for surface matching."""
+    zones = []
+    for i in range(nPerSide):
+        for j in range(nPerSide):
+            footprint = boxFootprint(width=size, depth=size)
+            footprint = [(x + i * size, y + j * size) for x, y in footprint]
+            zonePoly = extrudedZone(footprint, floorHeight=floorHeight)
+            for k in range(nStories):
+                zones.append(
+                    Polyhedron(
+                        surfaces=[
+                            Surface.from_numpy_array(s.to_numpy() + [0.0, 0.0, k * floorHeight], name=s.name)
+                            for s in zonePoly.surfaces
+                        ]
+                    )
+                )
+    return zones
+
+
+GENERATORS = {
+    'nStoryBox': nStoryBox,
+    'lShape': lShape,
+    'tJunctionZone': tJunctionZone,
+}
@@ -4,13 +4,22 @@ __author__ = """Julien Marrec"""
 __email__ = 'contact@effibem.com'
 __version__ = '0.1.10'
 
-from geomeffibem.boundingbox import BoundingBox
+from geomeffibem.boundingbox import BoundingBox, BoundingBoxArray
+from geomeffibem.bvh import SurfaceBVH
+from geomeffibem.clipping import intersect, intersectMatches, intersectPairs, subtract, union
+from geomeffibem.enclosure import EnclosureResult, checkEnclosures
+from geomeffibem.loader import SpaceGeometry, iter_spaces
+from geomeffibem.matching import SurfaceMatch, findMatchingSurfaces, getOverlapArea
 from geomeffibem.plane import Plane
 from geomeffibem.polyhedron import Polyhedron
 from geomeffibem.surface import Surface, Surface3dEge, plot_vertices
+from geomeffibem.surfacearray import SurfaceArray
 from geomeffibem.transformation import Transformation
 from geomeffibem.vertex import (
     Vertex,
+    VertexArray,
+    VertexView,
+    arePointsOnLineBetweenPoints,
     distance,
     distanceFromPointToLine,
     getAngle,
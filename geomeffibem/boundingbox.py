@@ -1,11 +1,32 @@
-"""Bounding Box."""
+"""Bounding Box.
 
-from typing import Optional, Tuple
+BoundingBox is a single axis-aligned box, BoundingBoxArray holds many of them as an (M, 6) array of
+(minX, minY, minZ, maxX, maxY, maxZ) rows, for culling across a whole building with NumPy.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, List, Optional, Tuple, Union
 
 import numpy as np
 
 from geomeffibem.vertex import Vertex
 
+if TYPE_CHECKING:
+    from geomeffibem.polyhedron import Polyhedron
+    from geomeffibem.surface import Surface
+    from geomeffibem.surfacearray import SurfaceArray
+
+
+def _as_points(points) -> np.ndarray:
+    """Converts a list of Vertex, or an array-like, to an (N, 3) float64 array."""
+    if isinstance(points, np.ndarray):
+        return np.asarray(points, dtype=np.float64).reshape(-1, 3)
+    points = list(points)
+    if points and isinstance(points[0], Vertex):
+        return np.array([[v.x, v.y, v.z] for v in points], dtype=np.float64)
+    return np.asarray(points, dtype=np.float64).reshape(-1, 3)
+
 
 class BoundingBox:
     """A crude BoundingBox.
@@ -13,6 +34,25 @@ class BoundingBox:
     As you add points to it, the min/max x, y, z are updated.
     """
 
+    @staticmethod
+    def from_numpy(arr) -> BoundingBox:
+        """Factory method to construct from an (N, 3) array of points."""
+        bb = BoundingBox()
+        bb.addPoints(arr)
+        return bb
+
+    @staticmethod
+    def from_surface(surface: Surface) -> BoundingBox:
+        """Factory method to construct from the vertices of a Surface."""
+        return BoundingBox.from_numpy(surface.to_numpy())
+
+    @staticmethod
+    def from_polyhedron(polyhedron: Polyhedron) -> BoundingBox:
+        """Factory method to construct from the vertices of all the surfaces of a Polyhedron."""
+        from geomeffibem.surfacearray import SurfaceArray  # Lazy: surfacearray imports surface and polyhedron
+
+        return BoundingBox.from_numpy(SurfaceArray.from_polyhedron(polyhedron).coords)
+
     def __init__(self):
         """Constructor for BoundingBox."""
         self.minX = None
@@ -75,9 +115,234 @@ class BoundingBox:
             self.maxZ = max(self.maxZ, vertex.z)
 
     def addPoints(self, vertices):
-        """Adds multiple points and updates the min/max x, y, z."""
-        [self.addPoint(v) for v in vertices]
+        """Adds multiple points (a list of Vertex or an (N, 3) array) and updates the min/max x, y, z."""
+        pts = _as_points(vertices)
+        if pts.shape[0] == 0:
+            return
+        self._addMinMax(pts.min(axis=0), pts.max(axis=0))
+
+    def addBoundingBox(self, other: BoundingBox) -> None:
+        """Merges another BoundingBox into this one, so it encloses both."""
+        if other.isEmpty():
+            return
+        self._addMinMax([other.minX, other.minY, other.minZ], [other.maxX, other.maxY, other.maxZ])
+
+    def _addMinMax(self, mins, maxs) -> None:
+        """Updates the min/max x, y, z with the min and max of some points."""
+        minX, minY, minZ = (float(x) for x in mins)
+        maxX, maxY, maxZ = (float(x) for x in maxs)
+        if self.isEmpty():
+            self.minX, self.minY, self.minZ = minX, minY, minZ
+            self.maxX, self.maxY, self.maxZ = maxX, maxY, maxZ
+        else:
+            self.minX = min(self.minX, minX)
+            self.minY = min(self.minY, minY)
+            self.minZ = min(self.minZ, minZ)
+
+            self.maxX = max(self.maxX, maxX)
+            self.maxY = max(self.maxY, maxY)
+            self.maxZ = max(self.maxZ, maxZ)
 
     def dimensions(self) -> Vertex:
         """Returns the dimensions of the bounding box."""
         return Vertex(self.maxX - self.minX, self.maxY - self.minY, self.maxZ - self.minZ)
+
+    def to_numpy(self) -> np.ndarray:
+        """Returns a (6,) array of (minX, minY, minZ, maxX, maxY, maxZ)."""
+        if self.isEmpty():
+            raise ValueError("You need to add some points")
+        return np.array([self.minX, self.minY, self.minZ, self.maxX, self.maxY, self.maxZ])
+
+    def intersects(self, other: BoundingBox, tol: float = 0.001) -> bool:
+        """Checks whether two bounding boxes overlap, or are closer than tol (like openstudio.BoundingBox)."""
+        if self.isEmpty() or other.isEmpty():
+            return False
+        return (
+            self.minX <= other.maxX + tol
+            and other.minX <= self.maxX + tol
+            and self.minY <= other.maxY + tol
+            and other.minY <= self.maxY + tol
+            and self.minZ <= other.maxZ + tol
+            and other.minZ <= self.maxZ + tol
+        )
+
+    def containsPoint(self, vertex: Vertex, tol: float = 0.001) -> bool:
+        """Checks whether a Vertex is inside the bounding box (or within tol of it)."""
+        if self.isEmpty():
+            return False
+        return (
+            self.minX - tol <= vertex.x <= self.maxX + tol
+            and self.minY - tol <= vertex.y <= self.maxY + tol
+            and self.minZ - tol <= vertex.z <= self.maxZ + tol
+        )
+
+    def containsPoints(self, points, tol: float = 0.001) -> np.ndarray:
+        """Checks which of the points (a list of Vertex or an (N, 3) array) are inside, returns an (N,) mask."""
+        pts = _as_points(points)
+        if self.isEmpty():
+            return np.zeros(pts.shape[0], dtype=bool)
+        bounds = self.to_numpy()
+        return np.asarray(((pts >= bounds[:3] - tol) & (pts <= bounds[3:] + tol)).all(axis=1))
+
+    def containsBoundingBox(self, other: BoundingBox, tol: float = 0.001) -> bool:
+        """Checks whether another bounding box is entirely inside this one."""
+        if self.isEmpty() or other.isEmpty():
+            return False
+        return bool(self.containsPoints(np.array([other.to_numpy()[:3], other.to_numpy()[3:]]), tol=tol).all())
+
+    def __repr__(self):
+        """Repr."""
+        if self.isEmpty():
+            return "BoundingBox (empty)"
+        return f"BoundingBox ({self.minX}, {self.minY}, {self.minZ}) - ({self.maxX}, {self.maxY}, {self.maxZ})"
+
+
+class BoundingBoxArray:
+    """Many bounding boxes, as an (M, 6) array of (minX, minY, minZ, maxX, maxY, maxZ) rows."""
+
+    @staticmethod
+    def from_surface_array(surfaceArray: SurfaceArray) -> BoundingBoxArray:
+        """Factory method to construct the bounding box of each surface of a SurfaceArray."""
+        if len(surfaceArray) == 0:
+            return BoundingBoxArray(np.zeros((0, 6)))
+        if (np.diff(surfaceArray.offsets) == 0).any():
+            raise ValueError("Cannot compute the bounding box of a surface without vertices")
+        starts = surfaceArray.offsets[:-1]
+        return BoundingBoxArray(
+            np.hstack(
+                [
+                    np.minimum.reduceat(surfaceArray.coords, starts, axis=0),
+                    np.maximum.reduceat(surfaceArray.coords, starts, axis=0),
+                ]
+            )
+        )
+
+    @staticmethod
+    def from_surfaces(surfaces: List[Surface]) -> BoundingBoxArray:
+        """Factory method to construct the bounding box of each Surface."""
+        from geomeffibem.surfacearray import SurfaceArray  # Lazy: surfacearray imports surface and polyhedron
+
+        return BoundingBoxArray.from_surface_array(SurfaceArray.from_surfaces(surfaces))
+
+    @staticmethod
+    def from_polyhedron(polyhedron: Polyhedron) -> BoundingBoxArray:
+        """Factory method to construct the bounding box of each surface of a Polyhedron."""
+        return BoundingBoxArray.from_surfaces(polyhedron.surfaces)
+
+    @staticmethod
+    def from_bounding_boxes(boundingBoxes: List[BoundingBox]) -> BoundingBoxArray:
+        """Factory method to construct from a list of (non empty) BoundingBox."""
+        return BoundingBoxArray(np.array([bb.to_numpy() for bb in boundingBoxes], dtype=np.float64).reshape(-1, 6))
+
+    def __init__(self, boxes):
+        """Constructor for BoundingBoxArray, from an (M, 6) array-like."""
+        self.boxes = np.asarray(boxes, dtype=np.float64)
+        if self.boxes.ndim != 2 or self.boxes.shape[1] != 6:
+            raise ValueError(f"Expected an array with a dimension (M, 6), got {self.boxes.shape}")
+
+    def __len__(self) -> int:
+        """Number of boxes."""
+        return self.boxes.shape[0]
+
+    def __getitem__(self, i: int) -> BoundingBox:
+        """Returns box i, as a BoundingBox."""
+        bb = BoundingBox()
+        bb._addMinMax(self.boxes[i, :3], self.boxes[i, 3:])
+        return bb
+
+    def to_numpy(self) -> np.ndarray:
+        """Returns the underlying (M, 6) array."""
+        return self.boxes
+
+    def mins(self) -> np.ndarray:
+        """(M, 3) min corners."""
+        return self.boxes[:, :3]
+
+    def maxs(self) -> np.ndarray:
+        """(M, 3) max corners."""
+        return self.boxes[:, 3:]
+
+    def dimensions(self) -> np.ndarray:
+        """(M, 3) dimensions of the boxes."""
+        return self.boxes[:, 3:] - self.boxes[:, :3]
+
+    def centerPoints(self) -> np.ndarray:
+        """(M, 3) centers of the boxes."""
+        return (self.boxes[:, :3] + self.boxes[:, 3:]) / 2.0
+
+    def union(self) -> BoundingBox:
+        """Merges all the boxes into a single BoundingBox."""
+        bb = BoundingBox()
+        if len(self) > 0:
+            bb._addMinMax(self.boxes[:, :3].min(axis=0), self.boxes[:, 3:].max(axis=0))
+        return bb
+
+    def intersects(self, other: Union[BoundingBox, np.ndarray], tol: float = 0.001) -> np.ndarray:
+        """Checks which boxes overlap another box (a BoundingBox or a (6,) array), returns an (M,) mask."""
+        if isinstance(other, BoundingBox):
+            if other.isEmpty():
+                return np.zeros(len(self), dtype=bool)
+            other = other.to_numpy()
+        other = np.asarray(other, dtype=np.float64)
+        return ((self.boxes[:, :3] <= other[3:] + tol) & (other[:3] <= self.boxes[:, 3:] + tol)).all(axis=1)
+
+    def containsPoint(self, vertex: Vertex, tol: float = 0.001) -> np.ndarray:
+        """Checks which boxes contain a Vertex, returns an (M,) mask."""
+        pt = np.array([vertex.x, vertex.y, vertex.z])
+        return ((self.boxes[:, :3] - tol <= pt) & (pt <= self.boxes[:, 3:] + tol)).all(axis=1)
+
+    def intersectingPairs(self, other: Optional[BoundingBoxArray] = None, tol: float = 0.001) -> np.ndarray:
+        """Finds all the pairs of overlapping boxes, with a vectorized sweep and prune along x.
+
+        Args:
+        -----
+        * other (BoundingBoxArray): the boxes to test against. If None, the boxes of this array are tested against
+          each other (each pair once, i < j, and not a box with itself)
+        * tol (float): boxes closer than tol are considered overlapping
+
+        Returns:
+        ---------
+        * a (K, 2) array of index pairs (i in self, j in other), sorted
+        """
+        if other is None:
+            boxes = self.boxes
+            owners = np.zeros(len(self), dtype=np.intp)
+            localIds = np.arange(len(self), dtype=np.intp)
+        else:
+            boxes = np.vstack([self.boxes, other.boxes])
+            owners = np.concatenate([np.zeros(len(self), dtype=np.intp), np.ones(len(other), dtype=np.intp)])
+            localIds = np.concatenate([np.arange(len(self), dtype=np.intp), np.arange(len(other), dtype=np.intp)])
+
+        # Sort by minX: the boxes that may overlap box k along x are the next ones, up to the first one starting
+        # after its maxX
+        order = np.argsort(boxes[:, 0], kind='stable')
+        boxes = boxes[order]
+        n = len(boxes)
+        ends = np.searchsorted(boxes[:, 0], boxes[:, 3] + tol, side='right')
+        counts = np.maximum(ends - np.arange(1, n + 1), 0)
+        first = np.repeat(np.arange(n), counts)
+        # For each k, second goes k+1, k+2, ..., ends[k] - 1
+        second = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts) + first + 1
+
+        overlap = ((boxes[first, :3] <= boxes[second, 3:] + tol) & (boxes[second, :3] <= boxes[first, 3:] + tol)).all(
+            axis=1
+        )
+        first = order[first[overlap]]
+        second = order[second[overlap]]
+
+        if other is not None:
+            # Keep the pairs across the two arrays, with the one from self first
+            across = owners[first] != owners[second]
+            first, second = first[across], second[across]
+            swap = owners[first] == 1
+            first[swap], second[swap] = second[swap], first[swap]
+        else:
+            swap = first > second
+            first[swap], second[swap] = second[swap], first[swap]
+
+        pairs = np.column_stack([localIds[first], localIds[second]])
+        return pairs[np.lexsort((pairs[:, 1], pairs[:, 0]))]
+
+    def __repr__(self):
+        """Repr."""
+        return f"BoundingBoxArray({len(self)} boxes)"
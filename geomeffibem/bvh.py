@@ -0,0 +1,336 @@
+"""A bounding volume hierarchy (BVH) over surfaces, for ray, nearest surface and point in zone queries.
+
+The tree is stored in flat arrays (an AABB tree, with the bounding boxes of the nodes as an (K, 6) array), and all the
+queries take batches: thousands of rays or points walk the tree together, level by level, with NumPy.
+"""
+
+from __future__ import annotations
+
+from typing import List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from geomeffibem.boundingbox import BoundingBoxArray
+from geomeffibem.kernels import getPlanes
+from geomeffibem.plane import Plane
+from geomeffibem.polygon2d import insidePolygon2d
+from geomeffibem.polyhedron import Polyhedron
+from geomeffibem.surface import Surface
+from geomeffibem.surfacearray import SurfaceArray
+
+# A direction that isn't aligned with any axis nor diagonal, so rays cast to test whether a point is inside a zone
+# don't go exactly through the edges of typical (orthogonal) buildings
+_POINT_IN_ZONE_DIRECTION = np.array([0.5773, 0.5779, 0.5770])
+
+
+def _raggedArange(starts: np.ndarray, counts: np.ndarray) -> np.ndarray:
+    """Concatenates arange(start, start + count) for each start, count."""
+    offsets = np.repeat(np.cumsum(counts) - counts, counts)
+    return np.arange(counts.sum()) - offsets + np.repeat(starts, counts)
+
+
+class SurfaceBVH:
+    """A bounding volume hierarchy over surfaces.
+
+    Each surface k keeps its index in the SurfaceArray it is built from, and optionally the id of the zone
+    (Polyhedron) it belongs to.
+    """
+
+    @staticmethod
+    def from_surfaces(surfaces: List[Surface], leafSize: int = 4) -> SurfaceBVH:
+        """Factory method to construct from a list of Surface objects."""
+        return SurfaceBVH(SurfaceArray.from_surfaces(surfaces), leafSize=leafSize)
+
+    @staticmethod
+    def from_polyhedra(zones: Sequence[Union[Polyhedron, SurfaceArray]], leafSize: int = 4) -> SurfaceBVH:
+        """Factory method to construct from several zones, so surfaces know their zone, for pointsInZones."""
+        arrays = [SurfaceArray.from_polyhedron(z) if isinstance(z, Polyhedron) else z for z in zones]
+        zoneIds = np.concatenate([np.full(len(sa), i, dtype=np.intp) for i, sa in enumerate(arrays)])
+        return SurfaceBVH(SurfaceArray.concatenate(arrays), zoneIds=zoneIds, leafSize=leafSize)
+
+    def __init__(self, surfaceArray: SurfaceArray, zoneIds: Optional[np.ndarray] = None, leafSize: int = 4):
+        """Constructor for SurfaceBVH, from a SurfaceArray, and optionally the zone id of each surface."""
+        if leafSize < 1:
+            raise ValueError("leafSize must be at least 1")
+        self.surfaceArray = surfaceArray
+        if zoneIds is not None:
+            zoneIds = np.asarray(zoneIds, dtype=np.intp)
+            if zoneIds.shape != (len(surfaceArray),):
+                raise ValueError(f"Expected {len(surfaceArray)} zoneIds, got {zoneIds.shape}")
+        self.zoneIds = zoneIds
+        self.leafSize = leafSize
+
+        self.planes = getPlanes(surfaceArray.coords, surfaceArray.offsets).reshape(-1, 4)
+        self.boxes = BoundingBoxArray.from_surface_array(surfaceArray).to_numpy()
+
+        # 2D coordinates of each vertex, dropping the axis along which the normal of its surface is largest
+        self.counts = np.diff(surfaceArray.offsets)
+        axes = np.argmax(np.abs(self.planes[:, :3]), axis=1)
+        self.uAxes = (axes + 1) % 3
+        self.vAxes = (axes + 2) % 3
+        surfaceOfVertex = np.repeat(np.arange(len(surfaceArray)), self.counts)
+        rows = np.arange(surfaceArray.numVertices())
+        self.coords2d = np.column_stack(
+            [
+                surfaceArray.coords[rows, self.uAxes[surfaceOfVertex]],
+                surfaceArray.coords[rows, self.vAxes[surfaceOfVertex]],
+            ]
+        )
+        self.nextVertex = np.arange(1, surfaceArray.numVertices() + 1)
+        self.nextVertex[surfaceArray.offsets[1:] - 1] = surfaceArray.offsets[:-1]
+
+        self._build()
+
+    def _build(self) -> None:
+        """Builds the tree, splitting the surfaces at the median of their box centers along the longest axis."""
+        centers = (self.boxes[:, :3] + self.boxes[:, 3:]) / 2.0
+        self.order = np.arange(len(self.boxes))
+        nodeBoxes: List[np.ndarray] = []
+        lefts: List[int] = []
+        rights: List[int] = []
+        starts: List[int] = []
+        counts: List[int] = []
+
+        def build(start: int, end: int) -> int:
+            node = len(nodeBoxes)
+            ids = self.order[start:end]
+            nodeBoxes.append(np.concatenate([self.boxes[ids, :3].min(axis=0), self.boxes[ids, 3:].max(axis=0)]))
+            lefts.append(-1)
+            rights.append(-1)
+            starts.append(start)
+            counts.append(end - start)
+            if end - start <= self.leafSize:
+                return node
+            axis = int(np.argmax(np.ptp(centers[ids], axis=0)))
+            mid = (end - start) // 2
+            self.order[start:end] = ids[np.argpartition(centers[ids, axis], mid)]
+            lefts[node] = build(start, start + mid)
+            rights[node] = build(start + mid, end)
+            return node
+
+        if len(self.boxes) > 0:
+            build(0, len(self.boxes))
+        self.nodeBoxes = np.array(nodeBoxes, dtype=np.float64).reshape(-1, 6)
+        self.nodeLeft = np.array(lefts, dtype=np.intp)
+        self.nodeRight = np.array(rights, dtype=np.intp)
+        self.nodeStart = np.array(starts, dtype=np.intp)
+        self.nodeCount = np.array(counts, dtype=np.intp)
+
+    def __len__(self) -> int:
+        """Number of surfaces."""
+        return len(self.boxes)
+
+    def numNodes(self) -> int:
+        """Number of nodes of the tree."""
+        return len(self.nodeBoxes)
+
+    def plane(self, i: int) -> Plane:
+        """The Plane of surface i."""
+        return Plane(*self.planes[i].tolist())
+
+    def _leafSurfaces(self, queries: np.ndarray, nodes: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Expands (query, leaf node) pairs into (query, surface) pairs."""
+        counts = self.nodeCount[nodes]
+        return np.repeat(queries, counts), self.order[_raggedArange(self.nodeStart[nodes], counts)]
+
+    def _pointsInPolygons(self, points: np.ndarray, surfaces: np.ndarray) -> np.ndarray:
+        """Crossing number test of each point against the surface it's paired with, in the surface 2D projection."""
+        if len(surfaces) == 0:
+            return np.zeros(0, dtype=bool)
+        rows = np.arange(len(surfaces))
+        px = points[rows, self.uAxes[surfaces]]
+        py = points[rows, self.vAxes[surfaces]]
+        counts = self.counts[surfaces]
+        vertices = _raggedArange(self.surfaceArray.offsets[surfaces], counts)
+        return insidePolygon2d(
+            np.column_stack([px, py]),
+            starts=self.coords2d[vertices],
+            ends=self.coords2d[self.nextVertex[vertices]],
+            offsets=np.concatenate([[0], np.cumsum(counts)]),
+        )
+
+    def _rayPairs(self, origins: np.ndarray, directions: np.ndarray, tMax: np.ndarray):
+        """Walks the tree with all the rays at once, returns the (ray, surface) pairs whose boxes the rays cross."""
+        with np.errstate(divide='ignore'):
+            invDirections = 1.0 / directions
+        rays = np.arange(len(origins))
+        nodes = np.zeros(len(origins), dtype=np.intp)
+        if self.numNodes() == 0:
+            rays = nodes = np.zeros(0, dtype=np.intp)
+        pairRays = []
+        pairSurfaces = []
+        while len(rays) > 0:
+            boxes = self.nodeBoxes[nodes]
+            with np.errstate(invalid='ignore'):
+                t1 = (boxes[:, :3] - origins[rays]) * invDirections[rays]
+                t2 = (boxes[:, 3:] - origins[rays]) * invDirections[rays]
+            # fmin/fmax ignore the NaNs of a ray parallel to a slab, starting on its boundary
+            tNear = np.fmax.reduce(np.fmin(t1, t2), axis=1)
+            tFar = np.fmin.reduce(np.fmax(t1, t2), axis=1)
+            hit = (tFar >= np.maximum(tNear, 0.0)) & (tNear <= tMax[rays])
+            rays, nodes = rays[hit], nodes[hit]
+
+            leaf = self.nodeLeft[nodes] == -1
+            r, s = self._leafSurfaces(rays[leaf], nodes[leaf])
+            pairRays.append(r)
+            pairSurfaces.append(s)
+            rays, nodes = rays[~leaf], nodes[~leaf]
+            rays = np.concatenate([rays, rays])
+            nodes = np.concatenate([self.nodeLeft[nodes], self.nodeRight[nodes]])
+
+        if not pairRays:
+            return np.zeros(0, dtype=np.intp), np.zeros(0, dtype=np.intp)
+        return np.concatenate(pairRays), np.concatenate(pairSurfaces)
+
+    def intersectRaysAll(
+        self, origins, directions, tMax: Union[float, np.ndarray] = np.inf
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Finds all the surfaces hit by each ray.
+
+        Args:
+        -----
+        * origins (np.ndarray): the (R, 3) origins of the rays
+        * directions (np.ndarray): the (R, 3) directions of the rays
+        * tMax (float or np.ndarray): only hits at origin + t * direction with 0 <= t <= tMax count
+
+        Returns:
+        ---------
+        * rayIds, surfaceIds, ts (np.ndarray): one entry per hit, sorted by ray then t
+        """
+        origins = np.asarray(origins, dtype=np.float64).reshape(-1, 3)
+        directions = np.asarray(directions, dtype=np.float64).reshape(-1, 3)
+        if origins.shape != directions.shape:
+            raise ValueError("Expected as many origins as directions")
+        tMax = np.broadcast_to(np.asarray(tMax, dtype=np.float64), (len(origins),))
+
+        rays, surfaces = self._rayPairs(origins, directions, tMax)
+        normals = self.planes[surfaces, :3]
+        denoms = np.einsum('ij,ij->i', normals, directions[rays])
+        with np.errstate(invalid='ignore', divide='ignore'):
+            ts = -(np.einsum('ij,ij->i', normals, origins[rays]) + self.planes[surfaces, 3]) / denoms
+        valid = (denoms != 0.0) & (ts >= 0.0) & (ts <= tMax[rays])
+        rays, surfaces, ts = rays[valid], surfaces[valid], ts[valid]
+        points = origins[rays] + ts[:, np.newaxis] * directions[rays]
+        inside = self._pointsInPolygons(points, surfaces)
+        rays, surfaces, ts = rays[inside], surfaces[inside], ts[inside]
+
+        order = np.lexsort((surfaces, ts, rays))
+        return rays[order], surfaces[order], ts[order]
+
+    def intersectRays(
+        self, origins, directions, tMax: Union[float, np.ndarray] = np.inf
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Finds the first surface hit by each ray, cf intersectRaysAll.
+
+        Returns:
+        ---------
+        * surfaceIds (np.ndarray): the (R,) index of the first surface hit, -1 if none
+        * ts (np.ndarray): the (R,) parameter of the hit point, origin + t * direction, inf if none
+        """
+        nRays = np.asarray(origins).reshape(-1, 3).shape[0]
+        rays, surfaces, ts = self.intersectRaysAll(origins, directions, tMax=tMax)
+        surfaceIds = np.full(nRays, -1, dtype=np.intp)
+        firstTs = np.full(nRays, np.inf)
+        if len(rays) > 0:
+            first = np.concatenate([[True], rays[1:] != rays[:-1]])
+            surfaceIds[rays[first]] = surfaces[first]
+            firstTs[rays[first]] = ts[first]
+        return surfaceIds, firstTs
+
+    def pointsInZones(self, points) -> np.ndarray:
+        """Finds the zone containing each point, by counting the surfaces of each zone that a ray from it crosses.
+
+        Returns the (N,) zone ids, -1 for points outside of all zones (and the lowest id if zones overlap).
+        """
+        if self.zoneIds is None:
+            raise ValueError("The zones are unknown, construct it with SurfaceBVH.from_polyhedra")
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+        directions = np.broadcast_to(_POINT_IN_ZONE_DIRECTION, points.shape)
+        rays, surfaces, _ = self.intersectRaysAll(points, directions)
+
+        result = np.full(len(points), -1, dtype=np.intp)
+        nZones = int(self.zoneIds.max()) + 1 if len(self.zoneIds) > 0 else 0
+        keys, crossings = np.unique(rays * nZones + self.zoneIds[surfaces], return_counts=True)
+        # Keys are sorted, so iterating backwards leaves the lowest zone id for each point
+        inside = keys[crossings % 2 == 1][::-1]
+        result[inside // max(nZones, 1)] = inside % max(nZones, 1)
+        return result
+
+    def _pointSurfaceDistances(self, points: np.ndarray, surfaces: np.ndarray) -> np.ndarray:
+        """Distance from each point to the surface (polygon) it is paired with."""
+        if len(surfaces) == 0:
+            return np.zeros(0)
+        normals = self.planes[surfaces, :3]
+        signed = np.einsum('ij,ij->i', normals, points) + self.planes[surfaces, 3]
+        projected = points - signed[:, np.newaxis] * normals
+        inside = self._pointsInPolygons(projected, surfaces)
+
+        counts = self.counts[surfaces]
+        vertices = _raggedArange(self.surfaceArray.offsets[surfaces], counts)
+        starts = self.surfaceArray.coords[vertices]
+        d = self.surfaceArray.coords[self.nextVertex[vertices]] - starts
+        p = np.repeat(points, counts, axis=0)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            t = np.clip(np.einsum('ij,ij->i', p - starts, d) / np.einsum('ij,ij->i', d, d), 0.0, 1.0)
+        edgeDistances = np.linalg.norm(p - (starts + np.nan_to_num(t)[:, np.newaxis] * d), axis=1)
+        toEdges = np.minimum.reduceat(edgeDistances, np.cumsum(counts) - counts)
+        return np.where(inside, np.abs(signed), toEdges)
+
+    def _boxDistances(self, points: np.ndarray, nodes: np.ndarray) -> np.ndarray:
+        """Distance from each point to the box of the node it's paired with (0 if inside)."""
+        boxes = self.nodeBoxes[nodes]
+        return np.linalg.norm(np.maximum(0.0, np.maximum(boxes[:, :3] - points, points - boxes[:, 3:])), axis=1)
+
+    def _updateNearest(self, queries, surfaces, points, best, bestIds):
+        """Evaluates the (point, surface) pairs, and keeps the closest surface of each point in best/bestIds."""
+        distances = self._pointSurfaceDistances(points[queries], surfaces)
+        order = np.lexsort((surfaces, distances, queries))
+        queries, surfaces, distances = queries[order], surfaces[order], distances[order]
+        first = np.concatenate([[True], queries[1:] != queries[:-1]]) if len(queries) else np.zeros(0, dtype=bool)
+        queries, surfaces, distances = queries[first], surfaces[first], distances[first]
+        better = distances < best[queries]
+        best[queries[better]] = distances[better]
+        bestIds[queries[better]] = surfaces[better]
+
+    def nearestSurfaces(self, points) -> Tuple[np.ndarray, np.ndarray]:
+        """Finds the closest surface to each point.
+
+        Returns:
+        ---------
+        * surfaceIds (np.ndarray): the (N,) index of the closest surface, -1 if there are no surfaces
+        * distances (np.ndarray): the (N,) distance to it
+        """
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+        best = np.full(len(points), np.inf)
+        bestIds = np.full(len(points), -1, dtype=np.intp)
+        if self.numNodes() == 0:
+            return bestIds, best
+
+        # Greedy descent to a single leaf first, to get an upper bound that prunes most of the tree
+        queries = np.arange(len(points))
+        nodes = np.zeros(len(points), dtype=np.intp)
+        internal = self.nodeLeft[nodes] != -1
+        while internal.any():
+            q, n = queries[internal], nodes[internal]
+            lefts, rights = self.nodeLeft[n], self.nodeRight[n]
+            goLeft = self._boxDistances(points[q], lefts) <= self._boxDistances(points[q], rights)
+            nodes[internal] = np.where(goLeft, lefts, rights)
+            internal = self.nodeLeft[nodes] != -1
+        self._updateNearest(*self._leafSurfaces(queries, nodes), points, best, bestIds)
+
+        nodes = np.zeros(len(points), dtype=np.intp)
+        while len(queries) > 0:
+            keep = self._boxDistances(points[queries], nodes) <= best[queries]
+            queries, nodes = queries[keep], nodes[keep]
+            leaf = self.nodeLeft[nodes] == -1
+            if leaf.any():
+                self._updateNearest(*self._leafSurfaces(queries[leaf], nodes[leaf]), points, best, bestIds)
+            queries, nodes = queries[~leaf], nodes[~leaf]
+            queries = np.concatenate([queries, queries])
+            nodes = np.concatenate([self.nodeLeft[nodes], self.nodeRight[nodes]])
+
+        return bestIds, best
+
+    def __repr__(self):
+        """Repr."""
+        return f"SurfaceBVH({len(self)} surfaces, {self.numNodes()} nodes)"
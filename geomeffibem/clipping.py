@@ -0,0 +1,411 @@
+"""Boolean operations (intersection, union, difference) of coplanar polygons.
+
+Both polygons are moved to the Transformation.alignFace local frame of the first one, where they are 2D. The edges of
+each polygon are split where they cross or touch the boundary of the other, and each fragment is classified by its
+midpoint: inside the other polygon, outside, or on its boundary (running in the same or in the opposite direction).
+The result of each operation is a selection of those fragments, which are stitched back into closed loops.
+
+A Surface can't have holes, so results with holes (which union and subtract can produce) are cut in hole-free pieces
+along a line through each hole.
+"""
+
+from __future__ import annotations
+
+from typing import List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from geomeffibem.kernels import flatten, getAlignFaceMatrices, getPlanes, getSignedDistances
+from geomeffibem.matching import SurfaceMatch
+from geomeffibem.polygon2d import insidePolygon2d, segmentDistances2d, signedArea2d, splitEdges2d
+from geomeffibem.polyhedron import Polyhedron
+from geomeffibem.spatialindex import weldPoints
+from geomeffibem.surface import Surface
+from geomeffibem.surfacearray import SurfaceArray
+
+SurfaceLike = Union[Surface, np.ndarray]
+
+_OPERATIONS = ('intersect', 'union', 'subtract')
+
+
+def _ringEdges(rings: Sequence[np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+    """The (E, 2) start and end points of the edges of closed 2D rings."""
+    return np.concatenate(rings), np.concatenate([np.roll(ring, -1, axis=0) for ring in rings])
+
+
+def _classifyFragments(
+    fragStarts: np.ndarray, fragEnds: np.ndarray, otherStarts: np.ndarray, otherEnds: np.ndarray, tol: float
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Classifies fragments against the other region: (inside, on its boundary in the same direction, in opposite)."""
+    mids = (fragStarts + fragEnds) / 2.0
+    distances = segmentDistances2d(mids, otherStarts, otherEnds)
+    onBoundary = distances.min(axis=1) < tol
+    nearestEdges = distances.argmin(axis=1)
+    dots = np.einsum('ij,ij->i', fragEnds - fragStarts, (otherEnds - otherStarts)[nearestEdges])
+    inside = ~onBoundary & insidePolygon2d(mids, starts=otherStarts, ends=otherEnds)
+    return inside, onBoundary & (dots > 0.0), onBoundary & (dots <= 0.0)
+
+
+def _clockwiseAngles(fromDirection: np.ndarray, directions: np.ndarray) -> np.ndarray:
+    """Angles in (0, 2 pi] to rotate fromDirection clockwise onto each direction."""
+    angles = np.arctan2(fromDirection[1], fromDirection[0]) - np.arctan2(directions[:, 1], directions[:, 0])
+    angles = np.mod(angles, 2.0 * np.pi)
+    return np.where(angles <= 1e-12, 2.0 * np.pi, angles)
+
+
+def _stitchLoops(starts: np.ndarray, ends: np.ndarray, tol: float) -> List[np.ndarray]:
+    """Stitches directed 2D segments into closed loops, keeping the region on their left.
+
+    Endpoints closer than tol are welded. Where several segments leave the same point, the loop takes the one
+    closest clockwise to the way back, which keeps loops that touch at a vertex separate.
+    """
+    if len(starts) == 0:
+        return []
+    n = len(starts)
+    pts = np.concatenate([starts, ends])
+    uniqueIndices, ids = weldPoints(np.column_stack([pts, np.zeros(2 * n)]), tol=tol)
+    positions = pts[uniqueIndices]
+
+    edges = {(int(a), int(b)) for a, b in zip(ids[:n], ids[n:]) if a != b}
+    # Segments going back and forth cancel out
+    edges = {edge for edge in edges if (edge[1], edge[0]) not in edges}
+    outgoing: dict = {}
+    for a, b in sorted(edges):
+        outgoing.setdefault(a, []).append(b)
+
+    loops = []
+    for a, b in sorted(edges):
+        if b not in outgoing.get(a, []):
+            continue
+        outgoing[a].remove(b)
+        loop = [a]
+        previous, current = a, b
+        while current != a:
+            loop.append(current)
+            candidates = outgoing.get(current, [])
+            if not candidates:
+                # Open chain, which only happens with inconsistent input: drop it
+                loop = []
+                break
+            if len(candidates) == 1:
+                nextId = candidates[0]
+            else:
+                angles = _clockwiseAngles(
+                    positions[previous] - positions[current], positions[candidates] - positions[current]
+                )
+                nextId = candidates[int(np.argmin(angles))]
+            candidates.remove(nextId)
+            previous, current = current, nextId
+        if len(loop) >= 3:
+            loops.append(positions[loop])
+    return loops
+
+
+def _cleanLoop(loop: np.ndarray, tol: float) -> Optional[np.ndarray]:
+    """Removes the vertices closer than tol to the line through their neighbors, None if nothing is left."""
+    while len(loop) >= 3:
+        previous = np.roll(loop, 1, axis=0)
+        following = np.roll(loop, -1, axis=0)
+        d = following - previous
+        lengths = np.linalg.norm(d, axis=1)
+        rel = loop - previous
+        with np.errstate(invalid='ignore', divide='ignore'):
+            offsets = np.abs(d[:, 0] * rel[:, 1] - d[:, 1] * rel[:, 0]) / lengths
+        offsets = np.where(lengths > 0.0, offsets, 0.0)
+        if (offsets >= tol).all():
+            return loop
+        # One at a time, so that two neighbors that are both collinear with each other's neighbors don't both go
+        loop = np.delete(loop, int(np.argmin(offsets)), axis=0)
+    return None
+
+
+def _booleanLoops2d(
+    ringsA: Sequence[np.ndarray], ringsB: Sequence[np.ndarray], operation: str, tol: float
+) -> List[np.ndarray]:
+    """Computes the loops of the result of operation between two 2D regions.
+
+    Each region is given as counterclockwise outer rings and clockwise holes, and so are the resulting loops.
+    """
+    startsA, endsA = _ringEdges(ringsA)
+    startsB, endsB = _ringEdges(ringsB)
+    fragStartsA, fragEndsA = splitEdges2d(startsA, endsA, startsB, endsB, tol)
+    fragStartsB, fragEndsB = splitEdges2d(startsB, endsB, startsA, endsA, tol)
+    insideA, sameA, oppositeA = _classifyFragments(fragStartsA, fragEndsA, startsB, endsB, tol)
+    insideB, sameB, oppositeB = _classifyFragments(fragStartsB, fragEndsB, startsA, endsA, tol)
+    outsideA = ~(insideA | sameA | oppositeA)
+    outsideB = ~(insideB | sameB | oppositeB)
+
+    # Shared boundaries are only taken from A, so they are not counted twice
+    if operation == 'intersect':
+        keepA, keepB, reverseB = insideA | sameA, insideB, False
+    elif operation == 'union':
+        keepA, keepB, reverseB = outsideA | sameA, outsideB, False
+    elif operation == 'subtract':
+        keepA, keepB, reverseB = outsideA | oppositeA, insideB, True
+    else:
+        raise ValueError(f"Unknown operation '{operation}', expected one of {_OPERATIONS}")
+
+    startsB, endsB = fragStartsB[keepB], fragEndsB[keepB]
+    if reverseB:
+        startsB, endsB = endsB, startsB
+    loops = _stitchLoops(
+        np.concatenate([fragStartsA[keepA], startsB]), np.concatenate([fragEndsA[keepA], endsB]), tol=tol
+    )
+    cleaned = [_cleanLoop(loop, tol) for loop in loops]
+    return [loop for loop in cleaned if loop is not None and abs(signedArea2d(loop)) > tol * tol]
+
+
+def _removeHoles2d(loops: List[np.ndarray], tol: float) -> List[np.ndarray]:
+    """Cuts a region given as outer loops and holes in hole-free polygons, along a vertical line through each hole."""
+    holes = [loop for loop in loops if signedArea2d(loop) < 0.0]
+    if not holes:
+        return loops
+    cuts = np.unique([(hole[:, 0].min() + hole[:, 0].max()) / 2.0 for hole in holes])
+    allPoints = np.concatenate(loops)
+    (minX, minY), (maxX, maxY) = allPoints.min(axis=0) - 1.0, allPoints.max(axis=0) + 1.0
+    bounds = np.concatenate([[minX], cuts, [maxX]])
+    pieces = []
+    for x0, x1 in zip(bounds[:-1], bounds[1:]):
+        strip = np.array([[x0, minY], [x1, minY], [x1, maxY], [x0, maxY]])
+        pieces.extend(_booleanLoops2d(loops, [strip], 'intersect', tol))
+    return pieces
+
+
+def _boolean(coordsA: np.ndarray, coordsB: np.ndarray, operation: str, tol: float) -> List[np.ndarray]:
+    """Boolean operation on two coplanar polygons, returns the (N_i, 3) coordinates of the resulting polygons.
+
+    They have the same outward normal as A.
+    """
+    if operation not in _OPERATIONS:
+        raise ValueError(f"Unknown operation '{operation}', expected one of {_OPERATIONS}")
+    coordsA = np.asarray(coordsA, dtype=np.float64).reshape(-1, 3)
+    coordsB = np.asarray(coordsB, dtype=np.float64).reshape(-1, 3)
+    planeA = getPlanes(coordsA)
+    if np.abs(getSignedDistances(coordsB, planeA)).max() > tol:
+        raise ValueError("The polygons are not coplanar")
+    matrix = getAlignFaceMatrices(coordsA)
+    rotation = matrix[:3, :3]
+    origin = matrix[:3, 3]
+    # In the local frame of A, where A is counterclockwise
+    a = (coordsA - origin) @ rotation
+    b = (coordsB - origin) @ rotation
+    ringA = a[:, :2]
+    ringB = b[:, :2]
+    if signedArea2d(ringB) < 0.0:
+        ringB = ringB[::-1]
+
+    loops = _booleanLoops2d([ringA], [ringB], operation, tol)
+    if operation != 'intersect':
+        loops = _removeHoles2d(loops, tol)
+    return [np.column_stack([loop, np.zeros(len(loop))]) @ rotation.T + origin for loop in loops]
+
+
+def _asCoords(surface: SurfaceLike) -> np.ndarray:
+    """The (N, 3) coordinates of a Surface or array."""
+    if isinstance(surface, Surface):
+        return surface.to_numpy()
+    return np.asarray(surface, dtype=np.float64).reshape(-1, 3)
+
+
+def intersect(surfaceA: SurfaceLike, surfaceB: SurfaceLike, tol: float = 0.0127) -> List[Surface]:
+    """Computes the intersection of two coplanar polygons (in either orientation), as Surfaces facing like A.
+
+    Args:
+    -----
+    * surfaceA (Surface or np.ndarray): the first polygon
+    * surfaceB (Surface or np.ndarray): the second polygon, in the same plane (within tol)
+    * tol (float): the distance under which points are considered equal, or on an edge
+
+    Returns:
+    ---------
+    * a list of Surface, empty if they don't overlap
+    """
+    return [
+        Surface.from_numpy_array(coords)
+        for coords in _boolean(_asCoords(surfaceA), _asCoords(surfaceB), 'intersect', tol)
+    ]
+
+
+def union(surfaceA: SurfaceLike, surfaceB: SurfaceLike, tol: float = 0.0127) -> List[Surface]:
+    """Computes the union of two coplanar polygons (in either orientation), as hole-free Surfaces facing like A.
+
+    cf intersect for the arguments.
+    """
+    return [
+        Surface.from_numpy_array(coords) for coords in _boolean(_asCoords(surfaceA), _asCoords(surfaceB), 'union', tol)
+    ]
+
+
+def subtract(surfaceA: SurfaceLike, surfaceB: SurfaceLike, tol: float = 0.0127) -> List[Surface]:
+    """Computes A minus B for two coplanar polygons (in either orientation), as hole-free Surfaces facing like A.
+
+    cf intersect for the arguments.
+    """
+    return [
+        Surface.from_numpy_array(coords)
+        for coords in _boolean(_asCoords(surfaceA), _asCoords(surfaceB), 'subtract', tol)
+    ]
+
+
+def _paddedRings(coords: np.ndarray, starts: np.ndarray, counts: np.ndarray, reverse: np.ndarray) -> np.ndarray:
+    """Gathers K rings into a (K, max(counts), 3) array, optionally reversed, padded by repeating their last vertex."""
+    width = int(counts.max())
+    j = np.minimum(np.arange(width)[np.newaxis, :], counts[:, np.newaxis] - 1)
+    j = np.where(reverse[:, np.newaxis], counts[:, np.newaxis] - 1 - j, j)
+    return coords[starts[:, np.newaxis] + j]
+
+
+def _areConvex2d(rings: np.ndarray, counts: np.ndarray) -> np.ndarray:
+    """Whether each padded counterclockwise 2D ring only turns left (collinear and repeated vertices are fine)."""
+    rows = np.arange(len(rings))[:, np.newaxis]
+    idx = np.arange(rings.shape[1])[np.newaxis, :]
+    nextIdx = (idx + 1) % counts[:, np.newaxis]
+    edges = rings[rows, nextIdx] - rings
+    nextEdges = edges[rows, nextIdx]
+    crosses = edges[:, :, 0] * nextEdges[:, :, 1] - edges[:, :, 1] * nextEdges[:, :, 0]
+    scale = np.linalg.norm(edges, axis=2) * np.linalg.norm(nextEdges, axis=2)
+    return ((crosses >= -1e-9 * scale) | (idx >= counts[:, np.newaxis])).all(axis=1)
+
+
+def _compact(points: np.ndarray, keep: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Moves the kept points of each row first, returns the trimmed array and the counts."""
+    counts = keep.sum(axis=1)
+    order = np.argsort(~keep, axis=1, kind='stable')[:, : max(int(counts.max(initial=0)), 1)]
+    return np.take_along_axis(points, order[:, :, np.newaxis], axis=1), counts
+
+
+def _neighbors(points: np.ndarray, counts: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """The previous and next points of each point of padded rings, and the mask of the actual points."""
+    rows = np.arange(len(points))[:, np.newaxis]
+    idx = np.arange(points.shape[1])[np.newaxis, :]
+    safeCounts = np.maximum(counts, 1)[:, np.newaxis]
+    return points[rows, (idx - 1) % safeCounts], points[rows, (idx + 1) % safeCounts], idx < counts[:, np.newaxis]
+
+
+def _clipConvex2d(
+    subjects: np.ndarray, subjectCounts: np.ndarray, clips: np.ndarray, clipCounts: np.ndarray, tol: float
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Sutherland-Hodgman clipping of K padded 2D rings by K convex counterclockwise rings, all at once.
+
+    Returns the padded resulting rings and their number of vertices, after removing the repeated and collinear ones.
+    """
+    poly, counts = subjects, subjectCounts
+    rows = np.arange(len(poly))
+    for j in range(clips.shape[1]):
+        p0 = clips[:, j]
+        e = clips[rows, (j + 1) % clipCounts] - p0
+        lengths = np.linalg.norm(e, axis=1)
+        active = (j < clipCounts) & (lengths > 0.0)
+        _, following, valid = _neighbors(poly, counts)
+        rel = poly - p0[:, np.newaxis, :]
+        relNext = following - p0[:, np.newaxis, :]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            dist = (e[:, np.newaxis, 0] * rel[:, :, 1] - e[:, np.newaxis, 1] * rel[:, :, 0]) / lengths[:, np.newaxis]
+            distNext = (e[:, np.newaxis, 0] * relNext[:, :, 1] - e[:, np.newaxis, 1] * relNext[:, :, 0]) / lengths[
+                :, np.newaxis
+            ]
+            t = np.clip(dist / (dist - distNext), 0.0, 1.0)
+        inside = ~active[:, np.newaxis] | (dist >= -tol)
+        insideNext = ~active[:, np.newaxis] | (distNext >= -tol)
+        crossings = poly + np.nan_to_num(t)[:, :, np.newaxis] * (following - poly)
+        # For each edge of the subject: the crossing point if it crosses, then its end if that is inside
+        out = np.stack([crossings, following], axis=2).reshape(len(poly), -1, 2)
+        keep = np.stack([valid & (inside != insideNext), valid & insideNext], axis=2).reshape(len(poly), -1)
+        poly, counts = _compact(out, keep)
+
+    # Repeated vertices, then vertices on the line through their neighbors
+    previous, _, valid = _neighbors(poly, counts)
+    poly, counts = _compact(poly, valid & (np.linalg.norm(poly - previous, axis=2) >= tol))
+    previous, following, valid = _neighbors(poly, counts)
+    d = following - previous
+    rel = poly - previous
+    with np.errstate(invalid='ignore', divide='ignore'):
+        offsets = np.abs(d[:, :, 0] * rel[:, :, 1] - d[:, :, 1] * rel[:, :, 0]) / np.linalg.norm(d, axis=2)
+    return _compact(poly, valid & (np.nan_to_num(offsets) >= tol))
+
+
+def intersectPairs(
+    surfaceArray: SurfaceArray, pairs, tol: float = 0.0127, other: Optional[SurfaceArray] = None
+) -> Tuple[SurfaceArray, np.ndarray]:
+    """Intersects many pairs of coplanar surfaces, eg: all the candidate pairs of a matching step.
+
+    Pairs of convex polygons (most walls) are clipped all at once with a vectorized Sutherland-Hodgman, in the
+    alignFace local frame of their first surface. The other pairs go through the general engine, cf intersect.
+
+    Args:
+    -----
+    * surfaceArray (SurfaceArray): the surfaces
+    * pairs (array-like): a (K, 2) array of indices: surface pairs[k, 0] is intersected with surface pairs[k, 1]
+    * tol (float): the distance under which points are considered equal, or on an edge
+    * other (SurfaceArray): if passed, pairs[:, 1] are indices in other instead of surfaceArray
+
+    Returns:
+    ---------
+    * result (SurfaceArray): the polygons of all the intersections, facing like the first surface of their pair
+    * pairIds (np.ndarray): for each polygon of result, the index k of its pair
+    """
+    if other is None:
+        other = surfaceArray
+    pairs = np.asarray(pairs, dtype=np.intp).reshape(-1, 2)
+    if len(pairs) == 0:
+        return SurfaceArray(coords=np.zeros((0, 3)), offsets=[0]), np.zeros(0, dtype=np.intp)
+    idxA, idxB = pairs[:, 0], pairs[:, 1]
+    startsA, countsA = surfaceArray.offsets[idxA], np.diff(surfaceArray.offsets)[idxA]
+    startsB, countsB = other.offsets[idxB], np.diff(other.offsets)[idxB]
+
+    # Everything in the local frame of the first surface of each pair
+    matrices = getAlignFaceMatrices(surfaceArray.coords, surfaceArray.offsets).reshape(-1, 4, 4)[idxA]
+    rotations, origins = matrices[:, :3, :3], matrices[:, :3, 3]
+    ringsA = _paddedRings(surfaceArray.coords, startsA, countsA, np.zeros(len(pairs), dtype=bool))
+    ringsB = _paddedRings(other.coords, startsB, countsB, np.zeros(len(pairs), dtype=bool))
+    localA = np.einsum('kli,kij->klj', ringsA - origins[:, np.newaxis, :], rotations)
+    localB = np.einsum('kli,kij->klj', ringsB - origins[:, np.newaxis, :], rotations)
+    if (np.abs(localB[:, :, 2]) > tol).any():
+        notCoplanar = np.flatnonzero((np.abs(localB[:, :, 2]) > tol).any(axis=1))
+        raise ValueError(f"The surfaces of pairs {notCoplanar.tolist()} are not coplanar")
+
+    # Make B counterclockwise too
+    xB, yB = localB[:, :, 0], localB[:, :, 1]
+    reverseB = (xB * np.roll(yB, -1, axis=1) - np.roll(xB, -1, axis=1) * yB).sum(axis=1) < 0.0
+    ringsB = _paddedRings(other.coords, startsB, countsB, reverseB)
+    localB = np.einsum('kli,kij->klj', ringsB - origins[:, np.newaxis, :], rotations)[:, :, :2]
+    localA = localA[:, :, :2]
+
+    polygons: List[Tuple[int, np.ndarray]] = []
+    convex = _areConvex2d(localA, countsA) & _areConvex2d(localB, countsB)
+    convexIds = np.flatnonzero(convex)
+    if len(convexIds):
+        clipped, counts = _clipConvex2d(
+            localA[convexIds], countsA[convexIds], localB[convexIds], countsB[convexIds], tol
+        )
+        _, following, valid = _neighbors(clipped, counts)
+        crosses = clipped[:, :, 0] * following[:, :, 1] - following[:, :, 0] * clipped[:, :, 1]
+        areas = np.where(valid, crosses, 0.0).sum(axis=1) / 2.0
+        clipped3d = np.concatenate([clipped, np.zeros(clipped.shape[:2] + (1,))], axis=2)
+        world = np.einsum('klj,kij->kli', clipped3d, rotations[convexIds]) + origins[convexIds, np.newaxis, :]
+        for k, poly, count, area in zip(convexIds.tolist(), world, counts.tolist(), areas.tolist()):
+            if count >= 3 and area > tol * tol:
+                polygons.append((k, poly[:count]))
+    for k in np.flatnonzero(~convex).tolist():
+        coordsA, coordsB = surfaceArray.get_coords(idxA[k]), other.get_coords(idxB[k])
+        polygons.extend((k, coords) for coords in _boolean(coordsA, coordsB, 'intersect', tol))
+    polygons.sort(key=lambda item: item[0])
+
+    if not polygons:
+        return SurfaceArray(coords=np.zeros((0, 3)), offsets=[0]), np.zeros(0, dtype=np.intp)
+    pairIds = np.array([k for k, _ in polygons], dtype=np.intp)
+    coords, offsets = flatten([poly for _, poly in polygons])
+    return SurfaceArray(coords=coords, offsets=offsets), pairIds
+
+
+def intersectMatches(
+    spaces: Sequence[Union[Polyhedron, SurfaceArray]], matches: Sequence[SurfaceMatch], tol: float = 0.0127
+) -> Tuple[SurfaceArray, np.ndarray]:
+    """Intersects the surfaces of each SurfaceMatch found by matching.findMatchingSurfaces, cf intersectPairs.
+
+    Returns the polygons of all the intersections, facing like surfaceA, and for each of them the index of its match.
+    """
+    arrays = [space if isinstance(space, SurfaceArray) else SurfaceArray.from_polyhedron(space) for space in spaces]
+    firsts = np.concatenate([[0], np.cumsum([len(array) for array in arrays])])
+    pairs = [[firsts[m.spaceA] + m.surfaceA, firsts[m.spaceB] + m.surfaceB] for m in matches]
+    return intersectPairs(SurfaceArray.concatenate(arrays), pairs, tol=tol)
@@ -0,0 +1,101 @@
+"""Batch enclosure and volume checks of many zones, on a process pool.
+
+Each zone is independent, so they are checked in parallel with a ProcessPoolExecutor. Zones are shipped to the workers
+as compact (name, coords, offsets) array payloads rather than pickled Surface and Vertex objects, and rebuilt there.
+"""
+
+from __future__ import annotations
+
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from geomeffibem.polyhedron import Polyhedron
+from geomeffibem.surfacearray import SurfaceArray
+
+ZoneLike = Union[Polyhedron, SurfaceArray, Tuple[np.ndarray, np.ndarray]]
+
+
+class EnclosureResult:
+    """The result of the enclosure check of a zone.
+
+    Attributes:
+    -----------
+    * name: the name of the zone, if any
+    * isEnclosed (bool): whether all its edges are used exactly twice, cf Polyhedron.isEnclosedVolume
+    * badEdges (np.ndarray): a (K, 2, 3) array of the start and end points of the edges not used twice
+    * volume (float): the volume, cf Polyhedron.calcPolyhedronVolume. Only meaningful if isEnclosed
+    """
+
+    def __init__(self, name: Optional[str], isEnclosed: bool, badEdges: np.ndarray, volume: float):
+        """Constructor for EnclosureResult."""
+        self.name = name
+        self.isEnclosed = isEnclosed
+        self.badEdges = badEdges
+        self.volume = volume
+
+    def __repr__(self):
+        """Repr."""
+        if self.isEnclosed:
+            return f"EnclosureResult '{self.name}': enclosed, volume={self.volume}"
+        return f"EnclosureResult '{self.name}': not enclosed, {len(self.badEdges)} bad edges"
+
+
+def _toPayload(zone: ZoneLike, name: Optional[str]) -> Tuple[Optional[str], np.ndarray, np.ndarray]:
+    """Converts a zone to a (name, coords, offsets) payload, cheap to pickle."""
+    if isinstance(zone, Polyhedron):
+        zone = SurfaceArray.from_polyhedron(zone)
+    if isinstance(zone, SurfaceArray):
+        return name, zone.coords, zone.offsets
+    coords, offsets = zone
+    # Validates it
+    zone = SurfaceArray(coords=coords, offsets=offsets)
+    return name, zone.coords, zone.offsets
+
+
+def _checkEnclosure(payload: Tuple[Optional[str], np.ndarray, np.ndarray]) -> EnclosureResult:
+    """Runs the enclosure and volume checks on a payload. This is what runs in the worker processes."""
+    name, coords, offsets = payload
+    zonePoly = SurfaceArray(coords=coords, offsets=offsets).to_polyhedron()
+    isEnclosed, edges = zonePoly.isEnclosedVolume()
+    badEdges = np.array([[edge.start.to_numpy(), edge.end.to_numpy()] for edge in edges], dtype=np.float64)
+    return EnclosureResult(
+        name=name,
+        isEnclosed=isEnclosed,
+        badEdges=badEdges.reshape(-1, 2, 3),
+        volume=zonePoly.calcPolyhedronVolume(),
+    )
+
+
+def checkEnclosures(
+    zones: Sequence[ZoneLike],
+    names: Optional[Sequence[Optional[str]]] = None,
+    maxWorkers: Optional[int] = None,
+    chunksize: int = 16,
+) -> List[EnclosureResult]:
+    """Checks whether many zones are enclosed, and computes their volume, in parallel.
+
+    Args:
+    -----
+    * zones: the zones to check, each given as a Polyhedron, a SurfaceArray, or a (coords, offsets) tuple of arrays
+    * names: optional names for the zones, reported in the results
+    * maxWorkers (int): the number of worker processes, defaults to the number of CPUs. With maxWorkers=1, the
+      zones are checked serially in the current process
+    * chunksize (int): the number of zones sent to a worker at once
+
+    Returns:
+    ---------
+    * a list of EnclosureResult, in the same order as zones
+    """
+    if names is None:
+        names = [None] * len(zones)
+    elif len(names) != len(zones):
+        raise ValueError(f"Expected {len(zones)} names, got {len(names)}")
+    payloads = [_toPayload(zone, name) for zone, name in zip(zones, names)]
+
+    if maxWorkers == 1 or len(payloads) <= 1:
+        return [_checkEnclosure(payload) for payload in payloads]
+
+    with ProcessPoolExecutor(max_workers=maxWorkers) as executor:
+        return list(executor.map(_checkEnclosure, payloads, chunksize=chunksize))
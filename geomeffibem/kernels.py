@@ -0,0 +1,440 @@
+"""Vectorized NumPy kernels operating on coordinate arrays.
+
+They accept either a single polygon as an (N, 3) array, or a ragged batch of polygons given as the flat (M, 3) array
+of all their coordinates plus an array of P + 1 offsets, where polygon k is `coords[offsets[k]:offsets[k + 1]]`.
+With a single polygon, results are returned for that polygon only (eg: a (3,) Newell vector), with a batch they are
+returned for every polygon (eg: a (P, 3) array of Newell vectors).
+"""
+
+from __future__ import annotations
+
+from typing import Iterable, Optional, Tuple
+
+import numpy as np
+
+from geomeffibem.polygon2d import insidePolygon2d, segmentDistances2d
+
+
+def flatten(polygons: Iterable[np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+    """Concatenates a list of (N_i, 3) arrays into a ragged batch: the flat (M, 3) coordinates and the offsets."""
+    arrays = [np.asarray(p, dtype=np.float64).reshape(-1, 3) for p in polygons]
+    offsets = np.zeros(len(arrays) + 1, dtype=np.intp)
+    np.cumsum([len(a) for a in arrays], out=offsets[1:])
+    if not arrays:
+        return np.zeros((0, 3)), offsets
+    return np.concatenate(arrays), offsets
+
+
+def _asBatch(coords, offsets) -> Tuple[np.ndarray, np.ndarray, bool]:
+    """Normalizes the arguments to a ragged batch, and returns whether it was a single polygon."""
+    pts = np.asarray(coords, dtype=np.float64).reshape(-1, 3)
+    single = offsets is None
+    if single:
+        offsets = np.array([0, pts.shape[0]], dtype=np.intp)
+    else:
+        offsets = np.asarray(offsets, dtype=np.intp)
+        if offsets.ndim != 1 or offsets[0] != 0 or offsets[-1] != pts.shape[0]:
+            raise ValueError("offsets must start at 0 and end at the number of points")
+    if (np.diff(offsets) < 3).any():
+        raise ValueError("Cannot compute Newell Vector for less than 3 points")
+    return pts, offsets, single
+
+
+def getNewellVectors(coords, offsets: Optional[np.ndarray] = None) -> np.ndarray:
+    """Computes the Newell vector of each polygon.
+
+    Its direction is the same as the outward normal, and its magnitude is twice the area.
+    This is the same triangle fan from the first point as getNewellVector, all at once.
+    """
+    pts, offsets, single = _asBatch(coords, offsets)
+    starts = offsets[:-1]
+    counts = np.diff(offsets)
+    firsts = np.repeat(pts[starts], counts, axis=0)
+    nexts = np.arange(1, pts.shape[0] + 1)
+    nexts[offsets[1:] - 1] = starts
+    crosses = np.cross(pts - firsts, pts[nexts] - firsts)
+    newellVectors = np.add.reduceat(crosses, starts, axis=0)
+    if single:
+        return newellVectors[0]
+    return newellVectors
+
+
+def getAreas(coords, offsets: Optional[np.ndarray] = None) -> np.ndarray:
+    """Computes the area of each polygon."""
+    newellVectors = np.atleast_2d(getNewellVectors(coords, offsets))
+    areas = np.linalg.norm(newellVectors, axis=1) / 2.0
+    if offsets is None:
+        return areas[0]
+    return areas
+
+
+def getOutwardNormals(coords, offsets: Optional[np.ndarray] = None) -> np.ndarray:
+    """Computes the outward normal (unit vector) of each polygon. Degenerate polygons get NaN."""
+    newellVectors = np.atleast_2d(getNewellVectors(coords, offsets))
+    lengths = np.linalg.norm(newellVectors, axis=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        normals = newellVectors / np.where(lengths > 0, lengths, np.nan)[:, np.newaxis]
+    if offsets is None:
+        return normals[0]
+    return normals
+
+
+def getSignedVolumes(coords, offsets: Optional[np.ndarray] = None) -> np.ndarray:
+    """Computes the signed volume of the pyramid formed by each polygon and the origin.
+
+    Summed over the faces of an enclosed polyhedron with outward normals, this gives its volume.
+    """
+    pts, offsets_, _ = _asBatch(coords, offsets)
+    newellVectors = np.atleast_2d(getNewellVectors(pts, offsets_))
+    # Any point on the face would do for a planar face, use the second one like calcPolyhedronVolume always did
+    facePoints = pts[offsets_[:-1] + 1]
+    # Our newellArea vector has twice the length
+    volumes = np.einsum('ij,ij->i', newellVectors, facePoints) / 6.0
+    if offsets is None:
+        return volumes[0]
+    return volumes
+
+
+def getPlanes(coords, offsets: Optional[np.ndarray] = None, planarityTol: float = 1e-9) -> np.ndarray:
+    """Fits a plane `ax + by + cz + d = 0` to each polygon, returned as rows of (a, b, c, d).
+
+    This follows the same conventions as openstudio.Plane, without any OpenStudio call:
+    * the normal (a, b, c) is a unit vector, oriented like the outward normal (Newell vector)
+    * a planar polygon gets the plane of its Newell vector going through its points
+    * a non-planar polygon with more than 3 points gets a least squares fit: the coordinate along which the normal is
+      largest is regressed against the two others
+
+    Raises a ValueError if a polygon is degenerate (its Newell vector is null).
+    """
+    pts, offsets_, single = _asBatch(coords, offsets)
+    newellVectors = np.atleast_2d(getNewellVectors(pts, offsets_))
+    lengths = np.linalg.norm(newellVectors, axis=1)
+    if (lengths == 0.0).any():
+        raise ValueError("Cannot compute the plane of a degenerate polygon")
+    normals = newellVectors / lengths[:, np.newaxis]
+
+    starts = offsets_[:-1]
+    counts = np.diff(offsets_)
+    means = np.add.reduceat(pts, starts, axis=0) / counts[:, np.newaxis]
+    centered = pts - np.repeat(means, counts, axis=0)
+
+    # Planar polygons: Newell normal, through the mean point
+    planes = np.empty((len(counts), 4))
+    planes[:, :3] = normals
+    planes[:, 3] = -np.einsum('ij,ij->i', normals, means)
+
+    deviations = np.abs(np.einsum('ij,ij->i', centered, np.repeat(normals, counts, axis=0)))
+    nonPlanar = (np.maximum.reduceat(deviations, starts) > planarityTol) & (counts > 3)
+    if nonPlanar.any():
+        # Least squares, on centered coordinates: w = alpha * u + beta * v, where w is the dominant axis
+        axes = np.argmax(np.abs(normals), axis=1)
+        uAxes = (axes + 1) % 3
+        vAxes = (axes + 2) % 3
+        polyIdx = np.repeat(np.arange(len(counts)), counts)
+        rows = np.arange(len(pts))
+        u = centered[rows, uAxes[polyIdx]]
+        v = centered[rows, vAxes[polyIdx]]
+        w = centered[rows, axes[polyIdx]]
+        suu = np.add.reduceat(u * u, starts)[nonPlanar]
+        suv = np.add.reduceat(u * v, starts)[nonPlanar]
+        svv = np.add.reduceat(v * v, starts)[nonPlanar]
+        suw = np.add.reduceat(u * w, starts)[nonPlanar]
+        svw = np.add.reduceat(v * w, starts)[nonPlanar]
+        det = suu * svv - suv * suv
+        fitted = np.empty((len(det), 3))
+        rows = np.arange(len(det))
+        fitted[rows, axes[nonPlanar]] = -1.0
+        fitted[rows, uAxes[nonPlanar]] = (suw * svv - svw * suv) / det
+        fitted[rows, vAxes[nonPlanar]] = (svw * suu - suw * suv) / det
+        fitted /= np.linalg.norm(fitted, axis=1)[:, np.newaxis]
+        fitted *= np.sign(np.einsum('ij,ij->i', fitted, normals[nonPlanar]))[:, np.newaxis]
+        planes[nonPlanar, :3] = fitted
+        planes[nonPlanar, 3] = -np.einsum('ij,ij->i', fitted, means[nonPlanar])
+
+    if single:
+        return planes[0]
+    return planes
+
+
+def getCentroids(coords, offsets: Optional[np.ndarray] = None) -> np.ndarray:
+    """Computes the area-weighted centroid of each planar polygon. Degenerate polygons (null area) get NaN.
+
+    The polygon is split in a fan of triangles from its first point, and the triangle centroids are weighted by their
+    signed area (so this works for non-convex polygons too).
+    """
+    pts, offsets_, single = _asBatch(coords, offsets)
+    starts = offsets_[:-1]
+    counts = np.diff(offsets_)
+    firsts = np.repeat(pts[starts], counts, axis=0)
+    nexts = np.arange(1, pts.shape[0] + 1)
+    nexts[offsets_[1:] - 1] = starts
+    crosses = np.cross(pts - firsts, pts[nexts] - firsts)
+    newellVectors = np.add.reduceat(crosses, starts, axis=0)
+
+    # Twice the signed area of each triangle, projected on the polygon normal
+    weights = np.einsum('ij,ij->i', crosses, np.repeat(newellVectors, counts, axis=0))
+    triangleCentroids = (firsts + pts + pts[nexts]) / 3.0
+    totals = np.add.reduceat(weights, starts)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        centroids = (
+            np.add.reduceat(triangleCentroids * weights[:, np.newaxis], starts, axis=0)
+            / np.where(totals > 0, totals, np.nan)[:, np.newaxis]
+        )
+    if single:
+        return centroids[0]
+    return centroids
+
+
+def getAlignFaceMatrices(coords, offsets: Optional[np.ndarray] = None) -> np.ndarray:
+    """Computes the Transformation.alignFace matrix of each polygon, as (4, 4) arrays.
+
+    In that local frame, the outward normal is z', y' is aligned with z (or x' with -x for polygons facing up or
+    down), and the origin is at the minimum x', y' and z' of the polygon. Degenerate polygons get the identity.
+    """
+    pts, offsets_, single = _asBatch(coords, offsets)
+    zp = np.atleast_2d(getOutwardNormals(pts, offsets_))
+    valid = np.isfinite(zp).all(axis=1)
+    zp = np.where(valid[:, np.newaxis], zp, [0.0, 0.0, 1.0])
+
+    # Not facing up or down: set y' along the z axis. Facing up or down: set x' along -x
+    facingSide = (np.abs(zp[:, 2]) < 0.99)[:, np.newaxis]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        ypSide = np.array([0.0, 0.0, 1.0]) - zp * zp[:, 2:3]
+        ypSide /= np.linalg.norm(ypSide, axis=1)[:, np.newaxis]
+        xpSide = np.cross(ypSide, zp)
+        xpUpDown = np.array([-1.0, 0.0, 0.0]) + zp * zp[:, 0:1]
+        xpUpDown /= np.linalg.norm(xpUpDown, axis=1)[:, np.newaxis]
+        ypUpDown = np.cross(zp, xpUpDown)
+    rotations = np.stack([np.where(facingSide, xpSide, xpUpDown), np.where(facingSide, ypSide, ypUpDown), zp], axis=2)
+
+    starts = offsets_[:-1]
+    counts = np.diff(offsets_)
+    aligned = np.einsum('mj,mjk->mk', pts, np.repeat(rotations, counts, axis=0))
+    mins = np.minimum.reduceat(aligned, starts, axis=0)
+
+    matrices = np.tile(np.identity(4), (len(counts), 1, 1))
+    matrices[:, :3, :3] = rotations
+    matrices[:, :3, 3] = np.einsum('pij,pj->pi', rotations, mins)
+    matrices[~valid] = np.identity(4)
+    if single:
+        return matrices[0]
+    return matrices
+
+
+def getSignedDistances(points, planes) -> np.ndarray:
+    """Computes the signed distances from points to planes, positive on the side of the normal.
+
+    With a single (4,) plane (a, b, c, d), returns an (N,) array. With (P, 4) planes, returns an (N, P) array.
+    """
+    pts = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+    planes = np.asarray(planes, dtype=np.float64)
+    normals = planes[..., :3]
+    return (pts @ normals.T + planes[..., 3]) / np.linalg.norm(normals, axis=-1)
+
+
+def getPointsInPolygons(points, coords, offsets: Optional[np.ndarray] = None, tol: float = 0.0) -> np.ndarray:
+    """Checks whether the projection of each point on the plane of each polygon falls inside it.
+
+    Points and polygons are moved to the alignFace local frame of each polygon (cf getAlignFaceMatrices), where the
+    test is a 2D crossing number test. Points within tol of an edge count as inside. Degenerate polygons contain no
+    points.
+
+    With a single polygon, returns an (N,) mask. With a batch of P polygons, returns an (N, P) mask.
+    """
+    pts = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+    polyPts, offsets_, single = _asBatch(coords, offsets)
+    matrices = np.atleast_3d(getAlignFaceMatrices(polyPts, offsets_)).reshape(-1, 4, 4)
+    degenerate = ~np.isfinite(np.atleast_2d(getOutwardNormals(polyPts, offsets_))).all(axis=1)
+
+    result = np.zeros((pts.shape[0], len(offsets_) - 1), dtype=bool)
+    for k in range(len(offsets_) - 1):
+        if degenerate[k]:
+            continue
+        rotation = matrices[k, :3, :3]
+        origin = rotation.T @ matrices[k, :3, 3]
+        local = (pts @ rotation - origin)[:, :2]
+        poly = (polyPts[offsets_[k] : offsets_[k + 1]] @ rotation - origin)[:, :2]
+        inside = insidePolygon2d(local, poly)
+        if tol > 0.0:
+            inside |= segmentDistances2d(local, poly, np.roll(poly, -1, axis=0)).min(axis=1) <= tol
+        result[:, k] = inside
+    if single:
+        return result[:, 0]
+    return result
+
+
+def getGridTiles(
+    coords, offsets: Optional[np.ndarray] = None, nX: int = 2, nY: int = 2, tol: float = 0.001
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Subdivides each rectangle into a grid of nX by nY tiles, all at once.
+
+    The grid is laid out in the alignFace local frame of each rectangle (cf getAlignFaceMatrices): the nX columns are
+    along the side of the rectangle closest to x' (horizontal for a wall), the nY rows along the other side. The
+    rectangles may have any orientation, including a rotation in their own plane.
+
+    Args:
+    -----
+    * coords, offsets: a polygon or a ragged batch of P polygons, which must be rectangles (4 vertices, opposite sides
+      parallel and right angles, within tol)
+    * nX (int), nY (int): the number of columns and rows of tiles, at least 1
+    * tol (float): the tolerance of the rectangle checks, in meters
+
+    Returns:
+    ---------
+    * coords (np.ndarray): the (P * nY * nX * 4, 3) coordinates of the tiles. Tiles of rectangle p come first, row by
+      row from the local origin, and tile k comes from rectangle k // (nX * nY). Each tile has the same outward normal
+      as its rectangle
+    * offsets (np.ndarray): the (P * nY * nX + 1,) offsets of the tiles, every 4 coordinates
+    """
+    if nX < 1 or nY < 1:
+        raise ValueError(f"Expected at least one row and one column of tiles, got {nX=} and {nY=}")
+    pts, offsets_, _ = _asBatch(coords, offsets)
+    if (np.diff(offsets_) != 4).any():
+        raise ValueError("Only rectangles (with exactly 4 vertices) can be subdivided in a grid")
+    corners = pts.reshape(-1, 4, 3)
+    u = corners[:, 1] - corners[:, 0]
+    w = corners[:, 3] - corners[:, 0]
+    uLengths = np.linalg.norm(u, axis=1)
+    wLengths = np.linalg.norm(w, axis=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        isRectangle = (
+            (uLengths > tol)
+            & (wLengths > tol)
+            & (np.linalg.norm(corners[:, 2] - corners[:, 1] - w, axis=1) <= tol)
+            & (np.abs(np.einsum('ij,ij->i', u, w)) / uLengths <= tol)
+        )
+    if not isRectangle.all():
+        raise ValueError(f"Polygons {np.flatnonzero(~isRectangle).tolist()} are not rectangles")
+
+    rotations = np.atleast_3d(getAlignFaceMatrices(pts, offsets_)).reshape(-1, 4, 4)[:, :3, :3]
+    xAxes, yAxes = rotations[:, :, 0], rotations[:, :, 1]
+    uAlignment = np.abs(np.einsum('ij,ij->i', u, xAxes)) / uLengths
+    wAlignment = np.abs(np.einsum('ij,ij->i', w, xAxes)) / wLengths
+    uIsX = (uAlignment >= wAlignment)[:, np.newaxis]
+    xSides = np.where(uIsX, u, w)
+    ySides = np.where(uIsX, w, u)
+    # Make both sides go along +x' and +y', starting from the corner at the local origin
+    origins = corners[:, 0].copy()
+    for sides, axes in ((xSides, xAxes), (ySides, yAxes)):
+        flip = np.einsum('ij,ij->i', sides, axes) < 0
+        origins[flip] += sides[flip]
+        sides[flip] *= -1.0
+
+    # (P, nY + 1, nX + 1, 3) grid points, then the 4 corners of each tile, counterclockwise around z'
+    s = np.arange(nX + 1) / nX
+    t = np.arange(nY + 1) / nY
+    grid = (
+        origins[:, np.newaxis, np.newaxis, :]
+        + s[np.newaxis, np.newaxis, :, np.newaxis] * xSides[:, np.newaxis, np.newaxis, :]
+        + t[np.newaxis, :, np.newaxis, np.newaxis] * ySides[:, np.newaxis, np.newaxis, :]
+    )
+    tiles = np.stack([grid[:, :-1, :-1], grid[:, :-1, 1:], grid[:, 1:, 1:], grid[:, 1:, :-1]], axis=3)
+    tileCoords = tiles.reshape(-1, 3)
+    return tileCoords, np.arange(0, tileCoords.shape[0] + 1, 4, dtype=np.intp)
+
+
+def getRedundantVertices(coords, offsets: Optional[np.ndarray] = None, tol: float = 0.0127) -> np.ndarray:
+    """Finds the vertices that can be removed from each polygon without changing its shape.
+
+    These are the vertices almost equal to the previous kept one (cf isAlmostEqual3dPt), then among the others, the
+    ones on the segment between the previous kept vertex and the next one (cf isPointOnLineBetweenPoints), as long as
+    all the vertices removed since the previous kept one are also within tol of that segment. So the tolerance
+    doesn't add up along a run of near-duplicates or of vertices on a gentle arc. Polygons that would be left with
+    less than 3 vertices only lose their duplicates, or nothing.
+
+    All polygons are first checked against their immediate neighbors at once, and only the ones where something can
+    be removed are walked vertex by vertex.
+
+    Returns an (M,) mask of the vertices to remove.
+    """
+    pts, offsets_, _ = _asBatch(coords, offsets)
+    starts = offsets_[:-1]
+    counts = np.diff(offsets_)
+    polyIds = np.repeat(np.arange(len(counts)), counts)
+    lasts = starts + counts - 1
+
+    # Almost equal to the previous vertex. The first one is compared to the last one from the other side, so it stays
+    duplicate = np.zeros(len(pts), dtype=bool)
+    duplicate[1:] = (np.abs(pts[1:] - pts[:-1]) < tol).all(axis=1)
+    duplicate[starts] = False
+    duplicate[lasts] |= (np.abs(pts[lasts] - pts[starts]) < tol).all(axis=1)
+    remainingCounts = np.bincount(polyIds[~duplicate], minlength=len(counts))
+    duplicate &= (remainingCounts >= 3)[polyIds]
+
+    # On the segment between the previous and next remaining vertices
+    kept = np.flatnonzero(~duplicate)
+    keptCounts = np.bincount(polyIds[kept], minlength=len(counts))
+    keptStarts = np.cumsum(keptCounts) - keptCounts
+    keptLasts = keptStarts + keptCounts - 1
+    position = np.arange(len(kept))
+    keptPolyIds = polyIds[kept]
+    previous = np.where(position == keptStarts[keptPolyIds], keptLasts[keptPolyIds], position - 1)
+    following = np.where(position == keptLasts[keptPolyIds], keptStarts[keptPolyIds], position + 1)
+    test, start, end = pts[kept], pts[kept[previous]], pts[kept[following]]
+    lineLengths = np.linalg.norm(end - start, axis=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        distToLine = np.linalg.norm(np.cross(end - start, test - start), axis=1) / lineLengths
+    distStart = np.linalg.norm(test - start, axis=1)
+    distEnd = np.linalg.norm(test - end, axis=1)
+    collinear = (lineLengths > 0.0) & (distToLine < tol) & (np.abs(lineLengths - (distStart + distEnd)) < tol)
+    remainingCounts = keptCounts - np.bincount(keptPolyIds[collinear], minlength=len(counts))
+    collinear &= (remainingCounts >= 3)[keptPolyIds]
+
+    redundant = duplicate.copy()
+    redundant[kept[collinear]] = True
+    # Nothing can be removed by the walk if nothing can be removed next to immediate neighbors
+    for polyId in np.unique(polyIds[redundant]):
+        start, end = offsets_[polyId], offsets_[polyId + 1]
+        redundant[start:end] = _getRedundantVerticesInLoop(pts[start:end], tol)
+    return redundant
+
+
+def _onSegments(points: np.ndarray, start: np.ndarray, end: np.ndarray, tol: float) -> np.ndarray:
+    """Whether each of the (N, 3) points is on the segment from start to end, cf isPointOnLineBetweenPoints."""
+    lineLength = np.linalg.norm(end - start)
+    if lineLength == 0.0:
+        return np.zeros(len(points), dtype=bool)
+    distToLine = np.linalg.norm(np.cross(end - start, points - start), axis=1) / lineLength
+    distStart = np.linalg.norm(points - start, axis=1)
+    distEnd = np.linalg.norm(points - end, axis=1)
+    return (distToLine < tol) & (np.abs(lineLength - (distStart + distEnd)) < tol)
+
+
+def _getRedundantVerticesInLoop(pts: np.ndarray, tol: float) -> np.ndarray:
+    """The mask of getRedundantVertices for a single (N, 3) polygon, walking it from a vertex that is always kept."""
+    n = len(pts)
+    redundant = np.zeros(n, dtype=bool)
+    # The lexicographically smallest vertex is a corner of the convex hull, so it is a good start for the walk
+    first = int(np.lexsort(pts.T[::-1])[0])
+    order = (first + np.arange(n)) % n
+
+    # Almost equal to the previous kept vertex, and the last ones almost equal to the first one
+    kept = [first]
+    for i in order[1:]:
+        if not (np.abs(pts[i] - pts[kept[-1]]) < tol).all():
+            kept.append(int(i))
+    while len(kept) > 1 and (np.abs(pts[kept[-1]] - pts[first]) < tol).all():
+        kept.pop()
+    if len(kept) < 3:
+        return redundant
+    redundant[:] = True
+    redundant[kept] = False
+
+    # On the segment from the previous kept vertex to the next one, along with the vertices removed in between
+    loop = pts[kept]
+    m = len(kept)
+    corners = [0]
+    for i in range(1, m):
+        following = loop[(i + 1) % m]
+        if not _onSegments(loop[corners[-1] + 1 : i + 1], loop[corners[-1]], following, tol).all():
+            corners.append(i)
+    # The first vertex, between the last corner and the second one
+    if len(corners) > 3:
+        between = np.concatenate([loop[corners[-1] + 1 :], loop[: corners[1]]])
+        if _onSegments(between, loop[corners[-1]], loop[corners[1]], tol).all():
+            corners.pop(0)
+    if len(corners) < 3:
+        return redundant
+    redundant[kept] = True
+    redundant[np.asarray(kept)[corners]] = False
+    return redundant
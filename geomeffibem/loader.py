@@ -0,0 +1,137 @@
+"""Bulk loading of OpenStudio models into geomeffibem objects.
+
+Spaces are loaded one at a time through a generator, so a huge model never has to be fully converted in memory.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Iterator, List, Optional, Union
+
+import numpy as np
+
+from geomeffibem.polyhedron import Polyhedron
+from geomeffibem.surface import Surface
+from geomeffibem.surfacearray import SurfaceArray
+from geomeffibem.transformation import Transformation
+
+if TYPE_CHECKING:
+    import openstudio
+
+
+class SpaceGeometry:
+    """The geometry of an OpenStudio Space.
+
+    Attributes:
+    -----------
+    * name (str): the name of the Space
+    * surfaces: its surfaces, as a Polyhedron (or a SurfaceArray when loaded with asArrays=True)
+    * subSurfaces: the sub surfaces (windows, doors, etc) of its surfaces, as a list of Surface (or a SurfaceArray)
+    * shadingSurfaces: the surfaces of its Space shading groups, as a list of Surface (or a SurfaceArray)
+    """
+
+    def __init__(
+        self,
+        name: str,
+        surfaces: Union[Polyhedron, SurfaceArray],
+        subSurfaces: Union[List[Surface], SurfaceArray],
+        shadingSurfaces: Union[List[Surface], SurfaceArray],
+    ):
+        """Constructor for SpaceGeometry."""
+        self.name = name
+        self.surfaces = surfaces
+        self.subSurfaces = subSurfaces
+        self.shadingSurfaces = shadingSurfaces
+
+    def __repr__(self):
+        """Repr."""
+        nSurfaces = len(self.surfaces.surfaces) if isinstance(self.surfaces, Polyhedron) else len(self.surfaces)
+        return (
+            f"SpaceGeometry '{self.name}': {nSurfaces} surfaces, {len(self.subSurfaces)} sub surfaces, "
+            f"{len(self.shadingSurfaces)} shading surfaces"
+        )
+
+
+def transformation_from_openstudio(os_transformation: openstudio.Transformation) -> Transformation:
+    """Converts an openstudio.Transformation, by transforming the origin and the three unit vectors."""
+    import openstudio
+
+    matrix = np.identity(4)
+    origin = os_transformation * openstudio.Point3d(0.0, 0.0, 0.0)
+    matrix[:3, 3] = [origin.x(), origin.y(), origin.z()]
+    for j, unit in enumerate([(1.0, 0.0, 0.0), (0.0, 1.0, 0.0), (0.0, 0.0, 1.0)]):
+        pt = os_transformation * openstudio.Point3d(*unit)
+        matrix[:3, j] = [pt.x() - origin.x(), pt.y() - origin.y(), pt.z() - origin.z()]
+    return Transformation(matrix)
+
+
+def _load_planar_surfaces(planar_surfaces: list, transformation: Optional[Transformation]) -> SurfaceArray:
+    """Converts openstudio PlanarSurface objects into a SurfaceArray, in one contiguous coordinate buffer."""
+    coords: List[float] = []
+    counts = []
+    names = []
+    for planar_surface in planar_surfaces:
+        points = planar_surface.vertices()
+        counts.append(len(points))
+        for pt in points:
+            coords += (pt.x(), pt.y(), pt.z())
+        names.append(planar_surface.nameString())
+
+    arr = np.array(coords, dtype=np.float64).reshape(-1, 3)
+    if transformation is not None:
+        transformation.apply(arr, out=arr)
+    offsets = np.zeros(len(counts) + 1, dtype=np.intp)
+    np.cumsum(counts, out=offsets[1:])
+    return SurfaceArray(coords=arr, offsets=offsets, names=names)
+
+
+def _by_name(objects) -> list:
+    """Sorts openstudio objects by name, so the results don't depend on the order they are stored in the model."""
+    return sorted(objects, key=lambda x: x.nameString())
+
+
+def iter_spaces(
+    model: openstudio.model.Model, absolute: bool = True, asArrays: bool = False
+) -> Iterator[SpaceGeometry]:
+    """Walks all the Spaces of an OpenStudio Model, yielding a SpaceGeometry for each, sorted by name.
+
+    Args:
+    -----
+    * model (openstudio.model.Model): the model to load
+    * absolute (bool): if True, the coordinates are converted to the Building coordinate system, otherwise they are
+      left relative to the Space (or to the shading surface group)
+    * asArrays (bool): if True, the surfaces are kept as SurfaceArray objects, with their coordinates in a single
+      contiguous array, instead of Surface and Vertex objects
+
+    Yields:
+    --------
+    * a SpaceGeometry per Space
+    """
+    for space in _by_name(model.getSpaces()):
+        spaceTransformation = transformation_from_openstudio(space.buildingTransformation()) if absolute else None
+
+        os_surfaces = _by_name(space.surfaces())
+        surfaces = _load_planar_surfaces(os_surfaces, spaceTransformation)
+        subSurfaces = _load_planar_surfaces(
+            [sub for os_surface in os_surfaces for sub in _by_name(os_surface.subSurfaces())], spaceTransformation
+        )
+
+        shadingArrays = []
+        for group in _by_name(space.shadingSurfaceGroups()):
+            groupTransformation = transformation_from_openstudio(group.buildingTransformation()) if absolute else None
+            shadingArrays.append(_load_planar_surfaces(_by_name(group.shadingSurfaces()), groupTransformation))
+        shadingSurfaces = SurfaceArray.concatenate(shadingArrays)
+
+        if asArrays:
+            yield SpaceGeometry(
+                name=space.nameString(),
+                surfaces=surfaces,
+                subSurfaces=subSurfaces,
+                shadingSurfaces=shadingSurfaces,
+            )
+        else:
+            yield SpaceGeometry(
+                name=space.nameString(),
+                surfaces=surfaces.to_polyhedron(),
+                subSurfaces=subSurfaces.to_surfaces(),
+                shadingSurfaces=shadingSurfaces.to_surfaces(),
+            )
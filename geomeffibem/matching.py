@@ -0,0 +1,211 @@
+"""Surface matching across spaces.
+
+Finds the surfaces of different spaces that are coplanar, facing opposite directions and overlapping, which is what
+OpenStudio surface matching needs.
+
+Instead of testing every pair of surfaces, their planes are hashed into a grid (on the outward normal and the plane
+offset), so each surface only looks at the surfaces whose plane is opposite to its own. Those candidates are then
+pruned with 2D bounding boxes in the plane, and the remaining pairs get their exact overlap area.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, List, Sequence, Tuple, Union
+
+import numpy as np
+
+from geomeffibem.boundingbox import BoundingBoxArray
+from geomeffibem.kernels import getNewellVectors, getPlanes
+from geomeffibem.polygon2d import insidePolygon2d, segmentDistances2d, signedArea2d, splitEdges2d
+from geomeffibem.polyhedron import Polyhedron
+from geomeffibem.surfacearray import SurfaceArray
+
+
+class SurfaceMatch:
+    """A pair of matched surfaces, identified by the index of their space and their index in that space."""
+
+    def __init__(self, spaceA: int, surfaceA: int, spaceB: int, surfaceB: int, overlapArea: float):
+        """Constructor for SurfaceMatch."""
+        self.spaceA = spaceA
+        self.surfaceA = surfaceA
+        self.spaceB = spaceB
+        self.surfaceB = surfaceB
+        self.overlapArea = overlapArea
+
+    def __repr__(self):
+        """Repr."""
+        return (
+            f"SurfaceMatch(space {self.spaceA} surface {self.surfaceA}, space {self.spaceB} surface {self.surfaceB}, "
+            f"overlapArea={self.overlapArea})"
+        )
+
+
+def _projectionAxes(normal: np.ndarray) -> Tuple[int, int]:
+    """The two axes to keep to project a plane to 2D: drop the one along which the normal is largest."""
+    axis = int(np.argmax(np.abs(normal)))
+    return (axis + 1) % 3, (axis + 2) % 3
+
+
+def _boundaryContribution2d(poly: np.ndarray, other: np.ndarray, tol: float, keepShared: bool) -> float:
+    """Green's theorem integral over the fragments of the boundary of poly that lie inside other.
+
+    Fragments that lie on the boundary of other are kept only if keepShared and they run in the same direction, so
+    that a shared boundary is counted exactly once.
+    """
+    fragStarts, fragEnds = splitEdges2d(poly, np.roll(poly, -1, axis=0), other, np.roll(other, -1, axis=0), tol)
+    mids = (fragStarts + fragEnds) / 2.0
+    otherStarts = other
+    otherEnds = np.roll(other, -1, axis=0)
+
+    distances = segmentDistances2d(mids, otherStarts, otherEnds)
+    onBoundary = distances.min(axis=1) < tol
+    nearestEdges = distances.argmin(axis=1)
+    sameDirection = np.einsum('ij,ij->i', fragEnds - fragStarts, (otherEnds - otherStarts)[nearestEdges]) > 0.0
+    inside = insidePolygon2d(mids, other)
+
+    keep = np.where(onBoundary, sameDirection & keepShared, inside)
+    s, e = fragStarts[keep], fragEnds[keep]
+    return float((s[:, 0] * e[:, 1] - e[:, 0] * s[:, 1]).sum()) / 2.0
+
+
+def _isSamePolygonReversed(coordsA: np.ndarray, coordsB: np.ndarray, tol: float) -> bool:
+    """Checks whether B has the same vertices as A, in reverse order (the usual case of matched surfaces)."""
+    if len(coordsA) != len(coordsB):
+        return False
+    matches = np.nonzero((np.abs(coordsB - coordsA[0]) < tol).all(axis=1))[0]
+    if len(matches) == 0:
+        return False
+    reversedB = np.roll(coordsB[::-1], -(len(coordsB) - 1 - matches[0]), axis=0)
+    return bool((np.abs(reversedB - coordsA) < tol).all())
+
+
+def getOverlapArea(coordsA, coordsB, tol: float = 0.0127) -> float:
+    """Computes the area of the intersection of two coplanar polygons (in either orientation).
+
+    Both polygons are projected to 2D and oriented counterclockwise. Their edges are split where they cross the other
+    polygon, and by Green's theorem the area is the boundary integral over the fragments that lie inside the other
+    polygon (a shared boundary counts once). This works for non-convex polygons too.
+
+    Args:
+    -----
+    * coordsA (np.ndarray): the (N, 3) coordinates of the first polygon
+    * coordsB (np.ndarray): the (M, 3) coordinates of the second polygon, in the same plane
+    * tol (float): the distance under which points are considered on the boundary
+
+    Returns:
+    ---------
+    * the overlap area, 0.0 if they don't overlap
+    """
+    coordsA = np.asarray(coordsA, dtype=np.float64).reshape(-1, 3)
+    coordsB = np.asarray(coordsB, dtype=np.float64).reshape(-1, 3)
+    normal = getNewellVectors(coordsA)
+    length = np.linalg.norm(normal)
+    if length == 0.0:
+        return 0.0
+    u, v = _projectionAxes(normal)
+    a = coordsA[:, [u, v]]
+    b = coordsB[:, [u, v]]
+    areaA = signedArea2d(a)
+    areaB = signedArea2d(b)
+    if areaA == 0.0 or areaB == 0.0:
+        return 0.0
+    if areaA < 0.0:
+        a = a[::-1]
+    if areaB < 0.0:
+        b = b[::-1]
+
+    area = _boundaryContribution2d(a, b, tol, keepShared=True) + _boundaryContribution2d(b, a, tol, keepShared=False)
+    # The projection to 2D scales areas by the normal component along the dropped axis
+    return max(area, 0.0) * length / abs(normal[3 - u - v])
+
+
+def findMatchingSurfaces(
+    spaces: Sequence[Union[Polyhedron, SurfaceArray]], tol: float = 0.0127, angleTol: float = 1.0
+) -> List[SurfaceMatch]:
+    """Finds the pairs of surfaces of different spaces that are coplanar, opposite facing and overlapping.
+
+    Args:
+    -----
+    * spaces: the spaces, each as a Polyhedron or a SurfaceArray
+    * tol (float): the distance tolerance, used for the plane offsets and the overlap, defaults to 0.0127 m (1/2 inch)
+    * angleTol (float): the tolerance on the angle between the outward normals and exactly opposite, in degrees
+
+    Returns:
+    ---------
+    * a list of SurfaceMatch, with spaceA < spaceB, sorted. Only pairs with an overlap area larger than tol² are kept
+    """
+    arrays = [SurfaceArray.from_polyhedron(s) if isinstance(s, Polyhedron) else s for s in spaces]
+    surfaceArray = SurfaceArray.concatenate(arrays)
+    if len(surfaceArray) == 0:
+        return []
+    spaceIds = np.concatenate([np.full(len(sa), i, dtype=np.intp) for i, sa in enumerate(arrays)])
+    localIds = np.concatenate([np.arange(len(sa), dtype=np.intp) for sa in arrays])
+
+    planes = getPlanes(surfaceArray.coords, surfaceArray.offsets)
+    areas = surfaceArray.areas()
+    normalTol = np.deg2rad(angleTol)
+    planeTols = np.array([normalTol, normalTol, normalTol, tol])
+    # Cells of twice the tolerance, so the range of a query spans at most 2 cells along each dimension
+    cellSizes = 2.0 * planeTols
+
+    counts = np.diff(surfaceArray.offsets)
+    boxes = BoundingBoxArray.from_surface_array(surfaceArray)
+    mins, maxs = boxes.mins(), boxes.maxs()
+
+    cells: Dict[Tuple[int, ...], List[int]] = {}
+    for i, cell in enumerate(np.floor(planes / cellSizes).astype(np.int64).tolist()):
+        cells.setdefault(tuple(cell), []).append(i)
+    cellArrays = {cell: np.array(members, dtype=np.intp) for cell, members in cells.items()}
+
+    los = np.floor((-planes - planeTols) / cellSizes).astype(np.int64).tolist()
+    his = np.floor((-planes + planeTols) / cellSizes).astype(np.int64).tolist()
+
+    matches = []
+    for i in range(len(surfaceArray)):
+        lo, hi = los[i], his[i]
+        buckets = [
+            cellArrays[key]
+            for key in (
+                (a, b, c, d)
+                for a in range(lo[0], hi[0] + 1)
+                for b in range(lo[1], hi[1] + 1)
+                for c in range(lo[2], hi[2] + 1)
+                for d in range(lo[3], hi[3] + 1)
+            )
+            if key in cellArrays
+        ]
+        if not buckets:
+            continue
+        candidates = np.concatenate(buckets)
+        # Each pair once, and only across spaces
+        candidates = candidates[(candidates > i) & (spaceIds[candidates] != spaceIds[i])]
+        if len(candidates) == 0:
+            continue
+        opposite = (np.abs(planes[candidates] + planes[i]) <= planeTols).all(axis=1)
+        opposite &= np.linalg.norm(planes[candidates, :3] + planes[i, :3], axis=1) <= normalTol
+        candidates = candidates[opposite]
+        if len(candidates) == 0:
+            continue
+        # 2D bounding boxes, in the plane: they must overlap by more than tol, surfaces that only touch don't match
+        u, v = _projectionAxes(planes[i, :3])
+        overlapping = (
+            (mins[candidates, u] < maxs[i, u] - tol)
+            & (maxs[candidates, u] > mins[i, u] + tol)
+            & (mins[candidates, v] < maxs[i, v] - tol)
+            & (maxs[candidates, v] > mins[i, v] + tol)
+        )
+        coordsA = surfaceArray.get_coords(i)
+        for j in candidates[overlapping].tolist():
+            coordsB = surfaceArray.get_coords(j)
+            if counts[i] == counts[j] and _isSamePolygonReversed(coordsA, coordsB, tol):
+                area = float(areas[i])
+            else:
+                area = getOverlapArea(coordsA, coordsB, tol=tol)
+            if area > tol * tol:
+                a, b = (i, j) if spaceIds[i] < spaceIds[j] else (j, i)
+                matches.append(
+                    SurfaceMatch(int(spaceIds[a]), int(localIds[a]), int(spaceIds[b]), int(localIds[b]), area)
+                )
+
+    matches.sort(key=lambda m: (m.spaceA, m.surfaceA, m.spaceB, m.surfaceB))
+    return matches
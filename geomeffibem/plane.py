@@ -2,6 +2,7 @@
 
 import numpy as np
 
+from geomeffibem.kernels import getSignedDistances
 from geomeffibem.vertex import Vertex, distance
 
 
@@ -33,6 +34,21 @@ class Plane:
 
         return distance(point, projected) <= tol
 
+    def signedDistances(self, points) -> np.ndarray:
+        """Signed distances of an (N, 3) array of points to the Plane, positive on the side of the outwardNormal."""
+        return getSignedDistances(points, [self.a, self.b, self.c, self.d])
+
+    def pointsOnPlane(self, points, tol=0.001) -> np.ndarray:
+        """Checks whether each point of an (N, 3) array is on the Plane, cf pointOnPlane. Returns an (N,) mask."""
+        return np.abs(self.signedDistances(points)) <= tol
+
+    def projectPoints(self, points) -> np.ndarray:
+        """Projects an (N, 3) array of points onto the Plane, cf project."""
+        pts = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+        normal = np.array([self.a, self.b, self.c], dtype=np.float64)
+        ratios = (pts @ normal + self.d) / (normal @ normal)
+        return pts - ratios[:, np.newaxis] * normal
+
     def project(self, point: Vertex) -> Vertex:
         """Project a point onto a Plane."""
         # http://www.9math.com/book/projection-point-plane
@@ -52,6 +68,20 @@ class Plane:
 
         return Vertex(x, y, z)
 
+    def __eq__(self, other):
+        """Operator equal, on the coefficients. Raises if not passed a Plane."""
+        if not isinstance(other, Plane):
+            raise NotImplementedError("Not implemented for any other types than Plane itself")
+        return (self.a, self.b, self.c, self.d) == (other.a, other.b, other.c, other.d)
+
+    def __ne__(self, other):
+        """Operator not equal."""
+        return not self == other
+
+    def __hash__(self):
+        """Hash of the coefficients, consistent with __eq__."""
+        return hash((self.a, self.b, self.c, self.d))
+
     def __repr__(self):
         """Repr."""
         return f"Plane ({self.a}, {self.b}, {self.c}, {self.d})"
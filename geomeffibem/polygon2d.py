@@ -0,0 +1,122 @@
+"""2D polygon helpers, on NumPy arrays of points in a plane.
+
+A polygon is an (n, 2) array of its vertices, implicitly closed. These are the building blocks of the surface
+matching and clipping, which move coplanar 3D polygons to 2D first, and of the point in polygon kernel.
+"""
+
+from __future__ import annotations
+
+from typing import Optional, Tuple
+
+import numpy as np
+
+
+def signedArea2d(poly: np.ndarray) -> float:
+    """Signed area of an (n, 2) polygon, positive if counterclockwise (shoelace formula)."""
+    x, y = poly[:, 0], poly[:, 1]
+    return float(np.dot(x, np.roll(y, -1)) - np.dot(np.roll(x, -1), y)) / 2.0
+
+
+def insidePolygon2d(
+    points: np.ndarray,
+    poly: Optional[np.ndarray] = None,
+    starts: Optional[np.ndarray] = None,
+    ends: Optional[np.ndarray] = None,
+    offsets: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """Even-odd crossing number test of (F, 2) points against an (n, 2) polygon, or against explicit edges.
+
+    Args:
+    -----
+    * points (np.ndarray): the (F, 2) points to test
+    * poly (np.ndarray): an (n, 2) polygon, implicitly closed
+    * starts, ends (np.ndarray): instead of poly, the (E, 2) start and end points of the edges of the region, eg:
+      several closed rings for a region with holes
+    * offsets (np.ndarray): with starts and ends, an (F + 1,) array so that point i is only tested against the edges
+      offsets[i]:offsets[i + 1], eg: each point against the polygon it is paired with. By default, all the points are
+      tested against all the edges
+
+    Returns:
+    ---------
+    * an (F,) mask of the points inside
+
+    Points exactly on the boundary can go either way, use segmentDistances2d to catch them with a tolerance.
+    """
+    if poly is not None:
+        starts, ends = poly, np.roll(poly, -1, axis=0)
+    elif starts is None or ends is None:
+        raise ValueError("Pass either poly, or starts and ends")
+
+    x0, y0, x1, y1 = starts[:, 0], starts[:, 1], ends[:, 0], ends[:, 1]
+    if offsets is None:
+        # An (F, E) grid of all the points against all the edges
+        x, y = points[:, 0:1], points[:, 1:2]
+    else:
+        # Each edge against the point it belongs to
+        pointIds = np.repeat(np.arange(len(points)), np.diff(offsets))
+        x, y = points[pointIds, 0], points[pointIds, 1]
+    straddles = (y0 > y) != (y1 > y)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        xCross = x0 + (y - y0) * (x1 - x0) / (y1 - y0)
+    crossings = straddles & (x < xCross)
+    if offsets is None:
+        return crossings.sum(axis=1) % 2 == 1
+    return np.bincount(pointIds[crossings], minlength=len(points)) % 2 == 1
+
+
+def segmentDistances2d(points: np.ndarray, starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    """Distances from (F, 2) points to E segments given by their (E, 2) starts and ends. Returns an (F, E) array."""
+    d = ends - starts
+    lengthsSq = np.einsum('ij,ij->i', d, d)
+    rel = points[:, np.newaxis, :] - starts[np.newaxis, :, :]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        t = np.clip(np.einsum('fej,ej->fe', rel, d) / lengthsSq, 0.0, 1.0)
+    t = np.nan_to_num(t)
+    closest = starts[np.newaxis, :, :] + t[:, :, np.newaxis] * d[np.newaxis, :, :]
+    return np.linalg.norm(points[:, np.newaxis, :] - closest, axis=2)
+
+
+def splitEdges2d(
+    starts: np.ndarray, ends: np.ndarray, otherStarts: np.ndarray, otherEnds: np.ndarray, tol: float
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Splits (E, 2) edges where they cross or touch (within tol) other edges, in a single vectorized pass.
+
+    Splits closer than tol from each other are merged. Returns the (F, 2) start and end points of the fragments, in
+    order along each edge, and edge after edge.
+    """
+    d = ends - starts
+    lengthsSq = np.einsum('ij,ij->i', d, d)
+    e = otherEnds - otherStarts
+
+    # Proper crossings: t along the edges, s along the other edges
+    rel = otherStarts[np.newaxis, :, :] - starts[:, np.newaxis, :]
+    denom = d[:, np.newaxis, 0] * e[np.newaxis, :, 1] - d[:, np.newaxis, 1] * e[np.newaxis, :, 0]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        t = (rel[:, :, 0] * e[np.newaxis, :, 1] - rel[:, :, 1] * e[np.newaxis, :, 0]) / denom
+        s = (rel[:, :, 0] * d[:, np.newaxis, 1] - rel[:, :, 1] * d[:, np.newaxis, 0]) / denom
+    crossing = (denom != 0.0) & (t > 0.0) & (t < 1.0) & (s >= 0.0) & (s <= 1.0)
+
+    # Other vertices that touch an edge (T-junctions and collinear overlaps)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        tVertex = np.einsum('ekj,ej->ek', rel, d) / lengthsSq[:, np.newaxis]
+    closest = starts[:, np.newaxis, :] + tVertex[:, :, np.newaxis] * d[:, np.newaxis, :]
+    touching = (
+        (tVertex > 0.0) & (tVertex < 1.0) & (np.linalg.norm(closest - otherStarts[np.newaxis, :, :], axis=2) < tol)
+    )
+
+    fragStarts = []
+    fragEnds = []
+    for i in range(len(starts)):
+        params = np.concatenate([[0.0], t[i, crossing[i]], tVertex[i, touching[i]], [1.0]])
+        params = np.unique(params)
+        # Drop splits closer than tol from each other
+        minStep = tol / np.sqrt(lengthsSq[i]) if lengthsSq[i] > 0 else 1.0
+        keep = np.concatenate([[True], np.diff(params) > minStep])
+        params = params[keep]
+        params[-1] = 1.0
+        if len(params) < 2:
+            params = np.array([0.0, 1.0])
+        pts = starts[i] + params[:, np.newaxis] * d[i]
+        fragStarts.append(pts[:-1])
+        fragEnds.append(pts[1:])
+    return np.concatenate(fragStarts), np.concatenate(fragEnds)
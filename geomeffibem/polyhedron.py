@@ -6,12 +6,41 @@ You can check whether it's enclosed or not.
 from __future__ import annotations
 
 import copy
-from typing import List, Tuple
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence, Set, Tuple
 
 import numpy as np
 
+from geomeffibem.kernels import flatten, getRedundantVertices, getSignedVolumes
+from geomeffibem.profiling import instrumented, stage
+from geomeffibem.spatialindex import PointGrid, PointWelder, weldPoints
 from geomeffibem.surface import Surface, Surface3dEge
-from geomeffibem.vertex import Vertex, getNewellVector
+from geomeffibem.vertex import Vertex, arePointsOnLineBetweenPoints
+
+if TYPE_CHECKING:
+    from geomeffibem.transformation import Transformation
+
+
+def _countVertices(zonePoly: Polyhedron, *args, **kwargs) -> int:
+    """Number of vertices processed by an instrumented Polyhedron operation, cf profiling.instrumented."""
+    return zonePoly.numVertices()
+
+
+def _pointsOnEdge(grid: PointGrid, start: np.ndarray, end: np.ndarray, tol: float) -> np.ndarray:
+    """The indices of the points of grid that are on the edge from start to end, in order along the edge.
+
+    Same as Surface3dEge.containsPoints: on the segment, but not almost equal to its start or end. The candidates are
+    queried with the bounding box of the edge.
+    """
+    found = grid.queryBox(np.minimum(start, end) - tol, np.maximum(start, end) + tol)
+    if len(found) == 0:
+        return found
+    pts = grid.points[found]
+    notStart = (np.abs(pts - start) >= tol).any(axis=1)
+    notEnd = (np.abs(pts - end) >= tol).any(axis=1)
+    onEdge = notStart & notEnd & arePointsOnLineBetweenPoints(start, end, pts, tol=tol)
+    hits = found[onEdge]
+    params = (grid.points[hits] - start) @ (end - start)
+    return hits[np.argsort(params, kind='stable')]
 
 
 class Polyhedron:
@@ -26,6 +55,45 @@ class Polyhedron:
             if not isinstance(surface, Surface):
                 raise ValueError(f"Element {i} is not a Surface object")
         self.surfaces = surfaces
+        # Built on demand by edgeCounts, for the incremental enclosure checks
+        self._edgeCounts: Optional[EdgeCounts] = None
+
+    def __getstate__(self) -> Dict[str, Any]:
+        """Pickles the surfaces as flat coordinates, offsets and names, instead of every Vertex and its back-reference.
+
+        The EdgeCounts aren't pickled, they are rebuilt on demand. copy.copy and copy.deepcopy don't go through this.
+        """
+        state = self.__dict__.copy()
+        surfaces = state.pop('surfaces')
+        coords, offsets = flatten([surface.to_numpy() for surface in surfaces])
+        state['_flatSurfaces'] = (coords, offsets, [surface.name for surface in surfaces])
+        state['_edgeCounts'] = None
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        """Rebuilds the surfaces of a pickled Polyhedron, cf __getstate__."""
+        state = state.copy()
+        coords, offsets, names = state.pop('_flatSurfaces')
+        self.__dict__.update(state)
+        self.surfaces = [
+            Surface.from_numpy_array(coords[offsets[i] : offsets[i + 1]], name=name) for i, name in enumerate(names)
+        ]
+
+    def __copy__(self) -> Polyhedron:
+        """Shallow copy: shares the list of surfaces, like the default copy.copy."""
+        cls = self.__class__
+        new = cls.__new__(cls)
+        new.__dict__.update(self.__dict__)
+        return new
+
+    def __deepcopy__(self, memo: Dict[int, Any]) -> Polyhedron:
+        """Deep copy of all the attributes, like the default copy.deepcopy, instead of going through __getstate__."""
+        cls = self.__class__
+        new = cls.__new__(cls)
+        memo[id(self)] = new
+        for key, value in self.__dict__.items():
+            setattr(new, key, copy.deepcopy(value, memo))
+        return new
 
     def get_surface_by_name(self, name):
         """Locate a surface by its name."""
@@ -40,94 +108,184 @@ class Polyhedron:
             count += len(s.vertices)
         return count
 
-    def uniqueVertices(self) -> List[Vertex]:
-        """Get a list of unique vertices (uses Vertex __eq__ operator which has a tolerance)."""
-        uniqueVertices: List[Vertex] = []
-        for s in self.surfaces:
-            for vertex in s.vertices:
-                found = False
-                for unique_v in uniqueVertices:
-                    if unique_v == vertex:
-                        found = True
-                        break
-                if not found:
-                    uniqueVertices.append(vertex)
+    def uniqueVertices(self, tol: float = 0.0127) -> List[Vertex]:
+        """Get a list of unique vertices (with the same tolerance as the Vertex __eq__ operator)."""
+        uniqueVertices, _ = self.weldVertices(tol=tol)
         return uniqueVertices
 
+    @instrumented(elements=_countVertices)
+    def weldVertices(self, tol: float = 0.0127) -> Tuple[List[Vertex], List[np.ndarray]]:
+        """Welds the vertices of all surfaces that are almost equal, via spatial hashing.
+
+        Returns the unique vertices, and for each surface an array mapping each of its vertices to its welded id
+        (the index in the unique vertices).
+        """
+        allVertices = [vertex for s in self.surfaces for vertex in s.vertices]
+        coords = np.array([[v.x, v.y, v.z] for v in allVertices], dtype=np.float64).reshape(-1, 3)
+        uniqueIndices, weldIds = weldPoints(coords, tol=tol)
+
+        indexMap = []
+        start = 0
+        for s in self.surfaces:
+            end = start + len(s.vertices)
+            indexMap.append(weldIds[start:end])
+            start = end
+        return [allVertices[i] for i in uniqueIndices], indexMap
+
     @staticmethod
-    def edgesNotTwoForEnclosedVolumeTest(zonePoly: Polyhedron) -> Tuple[List[Surface3dEge], List[Surface3dEge]]:
+    @instrumented(name='Polyhedron.edgesNotTwoForEnclosedVolumeTest', elements=_countVertices)
+    def edgesNotTwoForEnclosedVolumeTest(
+        zonePoly: Polyhedron, tol: float = 0.0127
+    ) -> Tuple[List[Surface3dEge], List[Surface3dEge]]:
         """Counts the number of times an Edge is used.
 
         Returns the ones that isn't used twice (and the ones used twice for debugging/inspection)
+
+        Vertices are welded first (cf weldVertices), and edges are keyed by the sorted pair of welded ids of their
+        start and end, so matching edges is a dict lookup instead of a scan of all the edges found so far.
         """
-        uniqueSurface3dEdges: List[Surface3dEge] = []
-
-        for surface in zonePoly.surfaces:
-            for edge in surface.to_Surface3dEdges():
-                found = False
-                for uniqEdge in uniqueSurface3dEdges:
-                    if uniqEdge == edge:
-                        uniqEdge.allSurfaces.append(surface)
-                        found = True
-                        break
-                if not found:
-                    uniqueSurface3dEdges.append(edge)
-
-        edgesNotTwoCount = [x for x in uniqueSurface3dEdges if x.count() != 2]
-        edgesTwoCount = [x for x in uniqueSurface3dEdges if x.count() == 2]
+        uniqueSurface3dEdges: Dict[Tuple[int, int], Surface3dEge] = {}
+
+        _, indexMap = zonePoly.weldVertices(tol=tol)
+        for surface, ids in zip(zonePoly.surfaces, indexMap):
+            vertices = surface.vertices
+            n = len(vertices)
+            ids = ids.tolist()
+            for i in range(n):
+                inext = i + 1 if i < n - 1 else 0
+                a, b = ids[i], ids[inext]
+                key = (a, b) if a <= b else (b, a)
+                uniqEdge = uniqueSurface3dEdges.get(key)
+                if uniqEdge is None:
+                    uniqEdge = Surface3dEge(start=vertices[i], end=vertices[inext], firstSurface=surface)
+                    uniqueSurface3dEdges[key] = uniqEdge
+                else:
+                    uniqEdge.allSurfaces.append(surface)
+
+        edgesNotTwoCount = [x for x in uniqueSurface3dEdges.values() if x.count() != 2]
+        edgesTwoCount = [x for x in uniqueSurface3dEdges.values() if x.count() == 2]
         return edgesNotTwoCount, edgesTwoCount
 
-    def updateZonePolygonsForMissingColinearPoints(self) -> Polyhedron:
-        """Creates a new Polyhedron with extra vertices when a point is found to be on a line segment."""
-        updZonePoly = copy.deepcopy(self)
-
-        uniqVertices = self.uniqueVertices()
-
-        for surface in updZonePoly.surfaces:
-            insertedVertex = True
-            while insertedVertex:
-                insertedVertex = False
-                for i, edge in enumerate(surface.to_Surface3dEdges()):
-                    for testVertex in uniqVertices:
-                        if edge.containsPoints(testVertex):
-                            if i == len(surface.vertices) - 1:
-                                inext = 0
-                            else:
-                                inext = i + 1
-                            surface.vertices.insert(inext, testVertex)
-                            insertedVertex = True
-                            break
-                    # Break out of the loop on vertices/edges too, start again at while loop
-                    if insertedVertex:
-                        break
-        return updZonePoly
+    @instrumented(elements=_countVertices)
+    def updateZonePolygonsForMissingColinearPoints(self, tol: float = 0.0127) -> Polyhedron:
+        """Creates a new Polyhedron with extra vertices when a point is found to be on a line segment.
 
-    def isEnclosedVolume(self) -> Tuple[bool, List[Surface3dEge]]:
-        """Checks if the Polyhedron is enclosed, that is all its edges are used exactly twice."""
-        edgeNot2orig, _ = Polyhedron.edgesNotTwoForEnclosedVolumeTest(zonePoly=self)
+        This is a single pass: for each edge, candidate vertices are queried from a PointGrid of the unique vertices
+        using the bounding box of the edge, then the ones that are on the edge are inserted all at once, sorted by
+        their position along the edge. The ones on the closing edge (from the last vertex to the first one) are
+        inserted at the start of the surface. The result is a deep copy of self (so of the same class, with the same
+        attributes), with the new surfaces.
+        """
+        uniqVertices = self.uniqueVertices(tol=tol)
+        uniqCoords = np.array([[v.x, v.y, v.z] for v in uniqVertices], dtype=np.float64).reshape(-1, 3)
+        grid = PointGrid(uniqCoords)
+
+        newSurfaces = []
+        for surface in self.surfaces:
+            coords = surface.to_numpy()
+            n = len(coords)
+            newVertices: List[Vertex] = []
+            for i in range(n):
+                start = coords[i]
+                end = coords[i + 1 if i < n - 1 else 0]
+                newVertices.append(surface.vertices[i].copy())
+                # The vertices inserted on the closing edge go first
+                insertAt = 0 if i == n - 1 else len(newVertices)
+                newVertices[insertAt:insertAt] = [uniqVertices[k].copy() for k in _pointsOnEdge(grid, start, end, tol)]
+
+            newSurfaces.append(Surface.from_trusted_vertices(vertices=newVertices, name=surface.name))
+
+        # Deep copy the other attributes, with the new surfaces instead of copies of the old ones. The EdgeCounts
+        # are for the old surfaces, they are rebuilt on demand
+        return copy.deepcopy(self, {id(self.surfaces): newSurfaces, id(self._edgeCounts): None})
+
+    def simplify(self, tol: float = 0.0127) -> int:
+        """Removes the duplicate consecutive and collinear vertices of all surfaces in place, cf Surface.simplify.
+
+        This is the counterpart of updateZonePolygonsForMissingColinearPoints. Returns the number of vertices removed.
+        """
+        return int(simplifyPolyhedra([self], tol=tol)[0])
+
+    def edgeCounts(self, tol: float = 0.0127) -> EdgeCounts:
+        """Returns the persistent EdgeCounts of the Polyhedron, built on the first call (or if tol changed).
+
+        It stays up to date as long as the surfaces are changed through addSurface, removeSurface, transformSurface or
+        updateSurface. If self.surfaces is modified directly, call edgeCounts().rebuild(self.surfaces).
+        """
+        if self._edgeCounts is None or self._edgeCounts.tol != tol:
+            self._edgeCounts = EdgeCounts(self.surfaces, tol=tol)
+        return self._edgeCounts
+
+    def addSurface(self, surface: Surface) -> None:
+        """Adds a Surface, and its edges to the EdgeCounts if they are being tracked."""
+        if not isinstance(surface, Surface):
+            raise ValueError("Expected a Surface object")
+        self.surfaces.append(surface)
+        if self._edgeCounts is not None:
+            self._edgeCounts.add(surface)
+
+    def removeSurface(self, surface: Surface) -> None:
+        """Removes a Surface (the object itself, not an equal one), and its edges from the EdgeCounts."""
+        for i, s in enumerate(self.surfaces):
+            if s is surface:
+                break
+        else:
+            raise ValueError("The Surface is not in the Polyhedron")
+        del self.surfaces[i]
+        if self._edgeCounts is not None:
+            self._edgeCounts.remove(surface)
+
+    def transformSurface(self, surface: Surface, transformation: Transformation) -> None:
+        """Moves the vertices of one of the surfaces in place, and updates the EdgeCounts for its edges only."""
+        coords = transformation.apply(surface.to_numpy())
+        for vertex, (x, y, z) in zip(surface.vertices, coords.tolist()):
+            vertex.x, vertex.y, vertex.z = x, y, z
+        self.updateSurface(surface)
+
+    def updateSurface(self, surface: Surface) -> None:
+        """Lets the EdgeCounts know that the vertices of one of the surfaces were changed (moved, added, removed)."""
+        if self._edgeCounts is not None:
+            self._edgeCounts.update(surface)
+
+    def nonManifoldEdges(self, tol: float = 0.0127) -> List[Surface3dEge]:
+        """The edges that aren't used exactly twice, from the persistent EdgeCounts (cf edgeCounts)."""
+        return self.edgeCounts(tol=tol).nonManifoldEdges()
+
+    @instrumented(elements=_countVertices)
+    def isEnclosedVolume(self, incremental: bool = False) -> Tuple[bool, List[Surface3dEge]]:
+        """Checks if the Polyhedron is enclosed, that is all its edges are used exactly twice.
+
+        With incremental=True, the persistent EdgeCounts are used instead of starting from scratch, cf
+        EdgeCounts.isEnclosedVolume.
+        """
+        if incremental:
+            return self.edgeCounts().isEnclosedVolume()
+
+        # The element counts of the stages are edges, except for the collinear update (surfaces)
+        with stage('Polyhedron.isEnclosedVolume.firstPass') as firstPass:
+            edgeNot2orig, edgeTwoOrig = Polyhedron.edgesNotTwoForEnclosedVolumeTest(zonePoly=self)
+            firstPass.addElements(len(edgeNot2orig) + len(edgeTwoOrig))
         if not edgeNot2orig:
             return True, []
 
         print("Updating Polyhedron with collinear vertices on lines")
-        updatedZonePoly = self.updateZonePolygonsForMissingColinearPoints()
-        edgeNot2again, _ = Polyhedron.edgesNotTwoForEnclosedVolumeTest(updatedZonePoly)
+        with stage('Polyhedron.isEnclosedVolume.collinearUpdate') as collinearUpdate:
+            updatedZonePoly = self.updateZonePolygonsForMissingColinearPoints()
+            collinearUpdate.addElements(len(updatedZonePoly.surfaces))
+        with stage('Polyhedron.isEnclosedVolume.secondPass') as secondPass:
+            edgeNot2again, edgeTwoAgain = Polyhedron.edgesNotTwoForEnclosedVolumeTest(updatedZonePoly)
+            secondPass.addElements(len(edgeNot2again) + len(edgeTwoAgain))
         if not edgeNot2again:
             return True, []
 
-        return False, edgesInBoth(edgeNot2orig, edgeNot2again)
+        with stage('Polyhedron.isEnclosedVolume.edgesInBoth', elements=len(edgeNot2orig) + len(edgeNot2again)):
+            return False, edgesInBoth(edgeNot2orig, edgeNot2again)
 
+    @instrumented(elements=_countVertices)
     def calcPolyhedronVolume(self) -> float:
         """Calculates the Volume of an ENCLOSED Polyhedron."""
-        volume = 0.0
-        for surface in self.surfaces:
-            vertices = surface.vertices
-            p3FaceOrigin = vertices[1] - Vertex(0, 0, 0)
-            newellAreaVector = getNewellVector(vertices)
-            pyramidVolume = newellAreaVector.dot(p3FaceOrigin)
-            volume += pyramidVolume
-        # Our newellArea vector has twice the length
-        volume /= 6.0
-        return volume
+        coords, offsets = flatten([surface.to_numpy() for surface in self.surfaces])
+        return float(getSignedVolumes(coords, offsets).sum())
 
     def to_os_cpp_code(self):
         """For my own convenience when writting OpenStudio tests."""
@@ -200,6 +358,218 @@ class Polyhedron:
                 print(f"    state->dataSurface->Surface({i+1}).Vertex(1) = Vector({v.x}, {v.y}, {v.z});")
 
 
+EdgeKey = Tuple[int, int]
+
+
+class EdgeCounts:
+    """A persistent count of the edges of a Polyhedron, updated as its surfaces change, cf Polyhedron.edgeCounts.
+
+    Like edgesNotTwoForEnclosedVolumeTest, vertices are welded and edges are keyed by the sorted pair of welded ids
+    of their start and end, but the welding is incremental (cf PointWelder): adding, removing or updating a Surface
+    only touches the edges of that Surface. The keys of the edges that aren't used exactly twice are kept in a set as
+    the counts change, so the non-manifold edges are known at any time without a recompute.
+    """
+
+    def __init__(self, surfaces: List[Surface], tol: float = 0.0127):
+        """Constructor for EdgeCounts, from the surfaces of a Polyhedron."""
+        self.tol = tol
+        self.rebuild(surfaces)
+
+    def rebuild(self, surfaces: List[Surface]) -> None:
+        """Recounts the edges of all the surfaces from scratch."""
+        self.welder = PointWelder(tol=self.tol)
+        # For each edge, the surfaces it was found on and the index of its start vertex in that surface
+        self.edges: Dict[EdgeKey, List[Tuple[Surface, int]]] = {}
+        self.notTwo: Set[EdgeKey] = set()
+        # id of a Surface -> the Surface and the welded ids of its vertices
+        self._surfaces: Dict[int, Tuple[Surface, List[int]]] = {}
+        # Cache of _splitEdges, and the vertices it was computed with
+        self._splits: Dict[EdgeKey, List[int]] = {}
+        self._candidates: Set[int] = set()
+        for surface in surfaces:
+            self.add(surface)
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        """Unpickles or deep copies, keying the surfaces by the id of the new objects."""
+        self.__dict__.update(state)
+        self._surfaces = {id(surface): (surface, ids) for surface, ids in self._surfaces.values()}
+
+    def __len__(self) -> int:
+        """Number of unique edges."""
+        return len(self.edges)
+
+    def __contains__(self, surface: Surface) -> bool:
+        """Whether the edges of this Surface are counted."""
+        return id(surface) in self._surfaces
+
+    def _addEdges(self, surface: Surface, ids: List[int]) -> None:
+        n = len(ids)
+        for i in range(n):
+            a, b = ids[i], ids[i + 1 if i < n - 1 else 0]
+            key = (a, b) if a <= b else (b, a)
+            found = self.edges.setdefault(key, [])
+            found.append((surface, i))
+            if len(found) == 2:
+                self.notTwo.discard(key)
+            else:
+                self.notTwo.add(key)
+
+    def _removeEdges(self, surface: Surface, ids: List[int]) -> None:
+        n = len(ids)
+        for i in range(n):
+            a, b = ids[i], ids[i + 1 if i < n - 1 else 0]
+            key = (a, b) if a <= b else (b, a)
+            found = self.edges[key]
+            found.remove((surface, i))
+            if not found:
+                del self.edges[key]
+                self.notTwo.discard(key)
+            elif len(found) == 2:
+                self.notTwo.discard(key)
+            else:
+                self.notTwo.add(key)
+
+    def add(self, surface: Surface) -> None:
+        """Counts the edges of a new Surface."""
+        if surface in self:
+            raise ValueError("The edges of this Surface are already counted")
+        ids = self.welder.add(surface.to_numpy())
+        self._surfaces[id(surface)] = (surface, ids)
+        self._addEdges(surface, ids)
+
+    def remove(self, surface: Surface) -> None:
+        """Uncounts the edges of a Surface."""
+        if surface not in self:
+            raise ValueError("The edges of this Surface aren't counted")
+        _, ids = self._surfaces.pop(id(surface))
+        self._removeEdges(surface, ids)
+        self.welder.remove(ids)
+
+    @instrumented(elements=lambda self, surface: len(surface.vertices))
+    def update(self, surface: Surface) -> None:
+        """Recounts the edges of a Surface whose vertices have changed."""
+        if surface not in self:
+            raise ValueError("The edges of this Surface aren't counted")
+        _, oldIds = self._surfaces[id(surface)]
+        # Add first, so a vertex that didn't move is welded to the same point
+        ids = self.welder.add(surface.to_numpy())
+        self.welder.remove(oldIds)
+        if ids == oldIds:
+            return
+        self._removeEdges(surface, oldIds)
+        self._surfaces[id(surface)] = (surface, ids)
+        self._addEdges(surface, ids)
+
+    def _toSurface3dEge(self, key: EdgeKey) -> Surface3dEge:
+        found = self.edges[key]
+        surface, i = found[0]
+        vertices = surface.vertices
+        edge = Surface3dEge(start=vertices[i], end=vertices[(i + 1) % len(vertices)], firstSurface=surface)
+        edge.allSurfaces.extend(s for s, _ in found[1:])
+        return edge
+
+    def nonManifoldEdges(self) -> List[Surface3dEge]:
+        """The edges that aren't used exactly twice, cf edgesNotTwoForEnclosedVolumeTest."""
+        return [self._toSurface3dEge(key) for key in sorted(self.notTwo)]
+
+    def _splitEdges(self) -> Dict[EdgeKey, List[int]]:
+        """The welded ids of the vertices found on each edge, in order along it.
+
+        This is the split of updateZonePolygonsForMissingColinearPoints, for all the edges.
+
+        Welded ids are never reused, so the result for an edge is kept from one call to the next, until a new vertex
+        falls in its bounding box or one of the vertices found on it is removed.
+        """
+        tol = self.tol
+        points = self.welder.points
+        candidates = set(points)
+        removed = self._candidates - candidates
+        added = candidates - self._candidates
+        splits = {key: self._splits[key] for key in self.edges if key in self._splits}
+        if removed:
+            splits = {key: interior for key, interior in splits.items() if removed.isdisjoint(interior)}
+        if len(added) > 1024:
+            splits = {}
+        elif added and splits:
+            keys = list(splits)
+            ends = np.array([[points[a], points[b]] for a, b in keys], dtype=np.float64)
+            lo = ends.min(axis=1) - tol
+            hi = ends.max(axis=1) + tol
+            addedCoords = np.array([points[uid] for uid in added], dtype=np.float64)
+            inBox = ((addedCoords >= lo[:, None]) & (addedCoords <= hi[:, None])).all(axis=2).any(axis=1)
+            for key in np.array(keys, dtype=np.intp).reshape(-1, 2)[inBox].tolist():
+                del splits[tuple(key)]  # type: ignore[arg-type]
+
+        missing = [key for key in self.edges if key not in splits]
+        if missing:
+            candidateIds = np.array(sorted(candidates), dtype=np.intp)
+            grid = PointGrid(np.array([points[uid] for uid in candidateIds.tolist()], dtype=np.float64))
+            for key in missing:
+                start, end = np.array([points[key[0]], points[key[1]]], dtype=np.float64)
+                splits[key] = candidateIds[_pointsOnEdge(grid, start, end, tol)].tolist()
+
+        self._splits = splits
+        self._candidates = candidates
+        return splits
+
+    @instrumented(elements=lambda self: len(self.notTwo))
+    def isEnclosedVolume(self) -> Tuple[bool, List[Surface3dEge]]:
+        """Same as Polyhedron.isEnclosedVolume, from the current counts.
+
+        If some edges aren't used twice, the edges are split at the collinear vertices (cf
+        updateZonePolygonsForMissingColinearPoints) and recounted. Only the edges that are not used twice or that
+        have a vertex on them are recounted: the others keep their count. The splits are cached, so after a change
+        only the edges near it are split again.
+        """
+        if not self.notTwo:
+            return True, []
+
+        splits = self._splitEdges()
+        newCounts: Dict[EdgeKey, int] = {}
+        unsplit = []
+        for key, interior in splits.items():
+            if not interior:
+                if key in self.notTwo:
+                    unsplit.append(key)
+                    newCounts[key] = newCounts.get(key, 0) + len(self.edges[key])
+                continue
+            count = len(self.edges[key])
+            chain = [key[0]] + interior + [key[1]]
+            for a, b in zip(chain[:-1], chain[1:]):
+                subKey = (a, b) if a <= b else (b, a)
+                newCounts[subKey] = newCounts.get(subKey, 0) + count
+
+        def total(key: EdgeKey) -> int:
+            # The edges used twice and not split are left as is
+            kept = len(self.edges[key]) if key in self.edges and key not in self.notTwo and not splits[key] else 0
+            return newCounts[key] + kept
+
+        if all(total(key) == 2 for key in newCounts):
+            return True, []
+        return False, [self._toSurface3dEge(key) for key in sorted(unsplit) if total(key) != 2]
+
+
+def simplifyPolyhedra(zonePolys: Sequence[Polyhedron], tol: float = 0.0127) -> np.ndarray:
+    """Simplifies the surfaces of many Polyhedra in place (eg: a whole model), cf Polyhedron.simplify.
+
+    All the surfaces go through a single call to kernels.getRedundantVertices. Returns the number of vertices removed
+    from each Polyhedron.
+    """
+    surfaces = [surface for zonePoly in zonePolys for surface in zonePoly.surfaces]
+    removed = np.zeros(len(zonePolys), dtype=np.intp)
+    if not surfaces:
+        return removed
+    coords, offsets = flatten([surface.to_numpy() for surface in surfaces])
+    redundant = getRedundantVertices(coords, offsets, tol=tol)
+    counts = np.add.reduceat(redundant.astype(np.intp), offsets[:-1])
+    for surface, start, end, count in zip(surfaces, offsets[:-1].tolist(), offsets[1:].tolist(), counts.tolist()):
+        if count:
+            surface.vertices = [v for v, remove in zip(surface.vertices, redundant[start:end].tolist()) if not remove]
+    zoneIds = np.repeat(np.arange(len(zonePolys)), [len(zonePoly.surfaces) for zonePoly in zonePolys])
+    np.add.at(removed, zoneIds, counts)
+    return removed
+
+
 def edgesInBoth(a: List[Surface3dEge], b: List[Surface3dEge]) -> List[Surface3dEge]:
     """Helper function."""
     in_both = []
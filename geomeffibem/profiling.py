@@ -0,0 +1,257 @@
+"""Opt-in instrumentation of the geometry operations.
+
+The main Polyhedron, Surface and Transformation operations are decorated with `instrumented`, and the steps inside
+them (eg: the passes of Polyhedron.isEnclosedVolume) are wrapped in a `stage`. Nothing is recorded until `enable` is
+called (or inside a `profile()` block), and while disabled this only costs a check of a global flag per call.
+
+Each stage records its number of calls, its total (cumulative) and own wall time, the number of elements it processed
+(surfaces, vertices, edges or points, depending on the stage) and which stage called it. The results can be exported
+as a dict (`to_dict`, `to_json`) or as `pstats.Stats` (`to_pstats`, `dump_stats`), to be inspected like a cProfile run
+(eg: with snakeviz). Stages are recorded in the current process only, so not in the workers of checkEnclosures.
+
+Usage: `with profiling.profile(): zonePoly.isEnclosedVolume()`, then `profiling.to_dict()` or
+`profiling.to_pstats().sort_stats('cumulative').print_stats()`.
+"""
+
+from __future__ import annotations
+
+import functools
+import json
+import marshal
+import pstats
+import sys
+from contextlib import contextmanager
+from pathlib import Path
+from time import perf_counter
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, TypeVar, Union
+
+F = TypeVar('F', bound=Callable[..., Any])
+
+_enabled = False
+
+
+class _Record:
+    """The aggregated measurements of one stage."""
+
+    __slots__ = ('location', 'calls', 'totalTime', 'ownTime', 'elements', 'callers')
+
+    def __init__(self, location: Tuple[str, int]):
+        """Constructor for _Record, location is the (filename, line number) where the stage is."""
+        self.location = location
+        self.calls = 0
+        self.totalTime = 0.0
+        self.ownTime = 0.0
+        self.elements = 0
+        # Name of the calling stage -> [calls, totalTime, ownTime]
+        self.callers: Dict[str, List[Any]] = {}
+
+
+_records: Dict[str, _Record] = {}
+_stack: List[_Stage] = []
+
+
+class _Stage:
+    """A stage being timed, cf stage. Stages nest: the time of the inner ones is excluded from the own time."""
+
+    __slots__ = ('name', 'location', 'elements', '_start', '_childTime')
+
+    def __init__(self, name: str, location: Tuple[str, int], elements: int = 0):
+        """Constructor for _Stage."""
+        self.name = name
+        self.location = location
+        self.elements = elements
+        self._childTime = 0.0
+        self._start = 0.0
+
+    def addElements(self, n: int) -> None:
+        """Adds to the number of elements processed by this stage."""
+        self.elements += n
+
+    def __enter__(self) -> _Stage:
+        """Starts the timer."""
+        _stack.append(self)
+        self._start = perf_counter()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        """Stops the timer and records the measurements."""
+        elapsed = perf_counter() - self._start
+        _stack.pop()
+        ownTime = elapsed - self._childTime
+        caller = None
+        if _stack:
+            _stack[-1]._childTime += elapsed
+            caller = _stack[-1].name
+
+        record = _records.get(self.name)
+        if record is None:
+            record = _records[self.name] = _Record(self.location)
+        record.calls += 1
+        record.totalTime += elapsed
+        record.ownTime += ownTime
+        record.elements += self.elements
+        if caller is not None:
+            callerRecord = record.callers.setdefault(caller, [0, 0.0, 0.0])
+            callerRecord[0] += 1
+            callerRecord[1] += elapsed
+            callerRecord[2] += ownTime
+
+
+class _NullStage:
+    """What stage returns when disabled: does nothing."""
+
+    __slots__ = ()
+
+    def addElements(self, n: int) -> None:
+        """Does nothing."""
+
+    def __enter__(self) -> _NullStage:
+        """Does nothing."""
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        """Does nothing."""
+
+
+_NULL_STAGE = _NullStage()
+
+
+def enable() -> None:
+    """Starts recording the stages. The measurements add up to the ones recorded so far, cf reset."""
+    global _enabled
+    _enabled = True
+
+
+def disable() -> None:
+    """Stops recording the stages. The measurements are kept."""
+    global _enabled
+    _enabled = False
+
+
+def isEnabled() -> bool:
+    """Whether the stages are being recorded."""
+    return _enabled
+
+
+def reset() -> None:
+    """Drops all the measurements."""
+    _records.clear()
+
+
+@contextmanager
+def profile(clear: bool = True) -> Iterator[None]:
+    """Records the stages inside the with block only. By default, the previous measurements are dropped first."""
+    wasEnabled = _enabled
+    if clear:
+        reset()
+    enable()
+    try:
+        yield
+    finally:
+        if not wasEnabled:
+            disable()
+
+
+def stage(name: str, elements: int = 0) -> Union[_Stage, _NullStage]:
+    """A context manager that times a block of code as the stage name, if enabled.
+
+    The number of elements can be passed here, or added inside the block with the addElements method of the object
+    the with statement returns. When disabled, a shared object that does nothing is returned, so pass counts that are
+    cheap to get.
+    """
+    if not _enabled:
+        return _NULL_STAGE
+    frame = sys._getframe(1)
+    return _Stage(name, (frame.f_code.co_filename, frame.f_lineno), elements)
+
+
+def instrumented(name: Optional[str] = None, elements: Optional[Callable[..., int]] = None) -> Callable[[F], F]:
+    """Decorator that records each call to a function as a stage, if enabled.
+
+    Args:
+    -----
+    * name (str): the name of the stage, defaults to the qualified name of the function, eg: 'Polyhedron.volume'
+    * elements (callable): called with the same arguments as the function (only when enabled), returns the number
+      of elements it processes
+
+    Returns:
+    ---------
+    * the decorator
+    """
+
+    def decorator(func: F) -> F:
+        stageName = name if name is not None else func.__qualname__
+        location = (func.__code__.co_filename, func.__code__.co_firstlineno)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            with _Stage(stageName, location, elements(*args, **kwargs) if elements is not None else 0):
+                return func(*args, **kwargs)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
+
+
+def to_dict() -> Dict[str, Dict[str, Any]]:
+    """The measurements, by stage name: calls, totalTime and ownTime (in seconds), elements and callers.
+
+    callers maps the name of each calling stage to the number of calls from it.
+    """
+    return {
+        name: {
+            'calls': record.calls,
+            'totalTime': record.totalTime,
+            'ownTime': record.ownTime,
+            'elements': record.elements,
+            'callers': {caller: values[0] for caller, values in record.callers.items()},
+        }
+        for name, record in sorted(_records.items())
+    }
+
+
+def to_json(path: Optional[Union[str, Path]] = None, indent: Optional[int] = 2) -> str:
+    """The measurements as a JSON string (cf to_dict), also written to path if passed."""
+    content = json.dumps(to_dict(), indent=indent)
+    if path is not None:
+        Path(path).write_text(content)
+    return content
+
+
+def _pstatsKey(name: str) -> Tuple[str, int, str]:
+    """The (filename, line number, function name) key of a stage in pstats."""
+    filename, lineno = _records[name].location
+    return filename, lineno, name
+
+
+class _StatsSource:
+    """Quacks like a cProfile.Profile for pstats.Stats: it has a create_stats method and a stats attribute."""
+
+    def __init__(self):
+        """Constructor for _StatsSource."""
+        self.stats: Dict[Tuple[str, int, str], Tuple[int, int, float, float, Dict[Any, Any]]] = {}
+
+    def create_stats(self) -> None:
+        """Converts the measurements to the pstats format."""
+        for name, record in _records.items():
+            callers = {
+                _pstatsKey(caller): (values[0], values[0], values[2], values[1])
+                for caller, values in record.callers.items()
+                if caller in _records
+            }
+            self.stats[_pstatsKey(name)] = (record.calls, record.calls, record.ownTime, record.totalTime, callers)
+
+
+def to_pstats() -> pstats.Stats:
+    """The measurements as a pstats.Stats, with a stage per function, eg: to sort_stats('cumulative').print_stats()."""
+    return pstats.Stats(_StatsSource())  # type: ignore[arg-type]
+
+
+def dump_stats(path: Union[str, Path]) -> None:
+    """Writes the measurements to a file in the format of cProfile.Profile.dump_stats, eg: for snakeviz."""
+    source = _StatsSource()
+    source.create_stats()
+    with open(path, 'wb') as f:
+        marshal.dump(source.stats, f)
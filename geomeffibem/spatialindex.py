@@ -0,0 +1,197 @@
+"""Spatial indexing helpers.
+
+Tolerance-aware welding of coincident vertices via grid hashing, and a uniform grid to query points in a box,
+so that we don't need to compare every vertex against every other one.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+def _cellOf(points: np.ndarray, cellSize: float) -> np.ndarray:
+    """Integer grid cell coordinates of each point."""
+    return np.floor(points / cellSize).astype(np.int64)
+
+
+def weldPoints(points, tol: float = 0.0127) -> Tuple[np.ndarray, np.ndarray]:
+    """Welds points that are almost equal, in roughly linear time.
+
+    Two points are considered equal when all their coordinates differ by less than tol, exactly like
+    isAlmostEqual3dPt. Points are hashed into a grid of cell size tol, so a match can only be in the same cell or in
+    one of its 26 neighbors.
+
+    The result is the same as the pairwise scan: points are visited in order, a point that doesn't match any
+    already kept point is kept, otherwise it is welded to the first kept point it matches.
+
+    Args:
+    -----
+    * points (array-like): an (N, 3) array of coordinates
+    * tol (float): the tolerance, defaults to 0.0127 m (1/2 inch), same as EnergyPlus
+
+    Returns:
+    ---------
+    * uniqueIndices (np.ndarray): the index in points of each kept (unique) point
+    * weldIds (np.ndarray): for each point, the index in uniqueIndices it was welded to
+    """
+    if tol <= 0:
+        raise ValueError("tol must be strictly positive")
+    pts = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+    n = pts.shape[0]
+
+    grid: Dict[Tuple[int, int, int], List[int]] = {}
+    uniqueCoords: List[List[float]] = []
+    uniqueIndices: List[int] = []
+    weldIds = np.empty(n, dtype=np.intp)
+
+    for i, ((x, y, z), (cx, cy, cz)) in enumerate(zip(pts.tolist(), _cellOf(pts, tol).tolist())):
+        found = -1
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                for dz in (-1, 0, 1):
+                    bucket = grid.get((cx + dx, cy + dy, cz + dz))
+                    if bucket is None:
+                        continue
+                    for uid in bucket:
+                        if found != -1 and uid > found:
+                            # We want the first kept point that matches
+                            break
+                        ux, uy, uz = uniqueCoords[uid]
+                        if abs(ux - x) < tol and abs(uy - y) < tol and abs(uz - z) < tol:
+                            found = uid
+                            break
+        if found == -1:
+            found = len(uniqueIndices)
+            uniqueIndices.append(i)
+            uniqueCoords.append([x, y, z])
+            grid.setdefault((cx, cy, cz), []).append(found)
+        weldIds[i] = found
+
+    return np.array(uniqueIndices, dtype=np.intp), weldIds
+
+
+class PointGrid:
+    """A uniform grid over a set of points, to quickly find the ones that fall within an axis-aligned box."""
+
+    def __init__(self, points, cellSize: Optional[float] = None):
+        """Constructor for PointGrid, from an (N, 3) array of coordinates.
+
+        If cellSize isn't provided, it is picked so there is about one point per cell on average.
+        """
+        self.points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+        n = self.points.shape[0]
+        if n == 0:
+            self.origin = np.zeros(3)
+        else:
+            self.origin = self.points.min(axis=0)
+        if cellSize is None:
+            extent = float(np.ptp(self.points, axis=0).max()) if n > 0 else 0.0
+            cellSize = extent / max(np.cbrt(n), 1.0)
+        if cellSize <= 0:
+            cellSize = 1.0
+        self.cellSize = cellSize
+
+        self.cells: Dict[Tuple[int, int, int], List[int]] = {}
+        for i, cell in enumerate(_cellOf(self.points - self.origin, self.cellSize).tolist()):
+            self.cells.setdefault(tuple(cell), []).append(i)  # type: ignore[arg-type]
+
+    def __len__(self) -> int:
+        """Number of points in the grid."""
+        return self.points.shape[0]
+
+    def queryBox(self, minCorner, maxCorner) -> np.ndarray:
+        """Returns the (sorted) indices of the points that are inside the box [minCorner, maxCorner]."""
+        minCorner = np.asarray(minCorner, dtype=np.float64)
+        maxCorner = np.asarray(maxCorner, dtype=np.float64)
+        lo = _cellOf(minCorner - self.origin, self.cellSize).tolist()
+        hi = _cellOf(maxCorner - self.origin, self.cellSize).tolist()
+
+        candidates: List[int] = []
+        nCells = (hi[0] - lo[0] + 1) * (hi[1] - lo[1] + 1) * (hi[2] - lo[2] + 1)
+        if nCells > len(self.cells):
+            # The box spans more cells than there are non-empty ones: just scan the non-empty ones
+            for (cx, cy, cz), bucket in self.cells.items():
+                if lo[0] <= cx <= hi[0] and lo[1] <= cy <= hi[1] and lo[2] <= cz <= hi[2]:
+                    candidates.extend(bucket)
+        else:
+            for cx in range(lo[0], hi[0] + 1):
+                for cy in range(lo[1], hi[1] + 1):
+                    for cz in range(lo[2], hi[2] + 1):
+                        cellBucket = self.cells.get((cx, cy, cz))
+                        if cellBucket is not None:
+                            candidates.extend(cellBucket)
+
+        idx = np.array(sorted(candidates), dtype=np.intp)
+        pts = self.points[idx]
+        inside = ((pts >= minCorner) & (pts <= maxCorner)).all(axis=1)
+        return idx[inside]
+
+
+class PointWelder:
+    """An incremental weldPoints: points can be added and removed at any time, and get a stable welded id.
+
+    Points are hashed into a grid of cell size tol, and each welded point keeps a reference count, so it is dropped
+    when the last point welded to it is removed. A new point is welded to the live point with the smallest id that is
+    almost equal to it (cf isAlmostEqual3dPt), so when points are only added this gives the same result as weldPoints.
+    """
+
+    def __init__(self, tol: float = 0.0127):
+        """Constructor for PointWelder, with the same tolerance semantics as weldPoints."""
+        if tol <= 0:
+            raise ValueError("tol must be strictly positive")
+        self.tol = tol
+        self.cells: Dict[Tuple[int, int, int], List[int]] = {}
+        self.points: Dict[int, Tuple[float, float, float]] = {}
+        self.refCounts: Dict[int, int] = {}
+        self._nextId = 0
+
+    def __len__(self) -> int:
+        """Number of live welded points."""
+        return len(self.points)
+
+    def add(self, points) -> List[int]:
+        """Adds an (N, 3) array of points, and returns the welded id of each."""
+        pts = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+        tol = self.tol
+        ids = []
+        for (x, y, z), (cx, cy, cz) in zip(pts.tolist(), _cellOf(pts, tol).tolist()):
+            found = -1
+            for dx in (-1, 0, 1):
+                for dy in (-1, 0, 1):
+                    for dz in (-1, 0, 1):
+                        bucket = self.cells.get((cx + dx, cy + dy, cz + dz))
+                        if bucket is None:
+                            continue
+                        for uid in bucket:
+                            if found != -1 and uid > found:
+                                break
+                            ux, uy, uz = self.points[uid]
+                            if abs(ux - x) < tol and abs(uy - y) < tol and abs(uz - z) < tol:
+                                found = uid
+                                break
+            if found == -1:
+                found = self._nextId
+                self._nextId += 1
+                self.points[found] = (x, y, z)
+                self.refCounts[found] = 0
+                # Ids only grow, so buckets stay sorted
+                self.cells.setdefault((cx, cy, cz), []).append(found)
+            self.refCounts[found] += 1
+            ids.append(found)
+        return ids
+
+    def remove(self, ids: List[int]) -> None:
+        """Removes points by their welded ids (as returned by add), dropping the welded points no longer used."""
+        for uid in ids:
+            count = self.refCounts[uid] - 1
+            if count > 0:
+                self.refCounts[uid] = count
+                continue
+            del self.refCounts[uid]
+            cell = tuple(_cellOf(np.array(self.points.pop(uid)), self.tol).tolist())
+            bucket = self.cells[cell]  # type: ignore[index]
+            bucket.remove(uid)
+            if not bucket:
+                del self.cells[cell]  # type: ignore[arg-type]
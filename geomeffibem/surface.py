@@ -6,24 +6,34 @@ A Surface3dEdge is a side of a Surface.
 
 from __future__ import annotations
 
-import copy
-from typing import List, Union
+import sys
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Union
 
-import matplotlib.pyplot as plt
 import numpy as np
-import openstudio
 
+from geomeffibem.kernels import getAreas, getCentroids, getPlanes, getPointsInPolygons, getRedundantVertices
 from geomeffibem.plane import Plane
+from geomeffibem.profiling import instrumented, stage
 from geomeffibem.vertex import (
     Vertex,
     distance,
     getAngle,
-    getNewellVector,
     getOutwardNormal,
     isAlmostEqual3dPt,
     isPointOnLineBetweenPoints,
 )
 
+if TYPE_CHECKING:
+    import openstudio
+
+# OpenStudio and matplotlib are slow to import and only needed for the interop and plotting,
+# so they are imported lazily, in the functions that need them.
+
+
+def _countVertices(surface: Surface, *args, **kwargs) -> int:
+    """Number of vertices processed by an instrumented Surface operation, cf profiling.instrumented."""
+    return len(surface.vertices)
+
 
 class Surface3dEge:
     """An Edge has a start and an end Vertex, and a list of surfaces it was found on."""
@@ -76,6 +86,8 @@ class Surface3dEge:
         surface = self.allSurfaces[0]
 
         if ax is None:
+            import matplotlib.pyplot as plt
+
             fig, ax = plt.subplots(figsize=(16, 9))
         surface.plot(ax=ax)
         plot_vertices([self.start, self.end], plane=surface.get_plot_axis(), c='r', ax=ax, annotate=False)
@@ -85,27 +97,40 @@ class Surface:
     """A 3D Surface."""
 
     @staticmethod
-    def from_numpy_array(arr) -> Surface:
+    def from_trusted_vertices(vertices: List[Vertex], name=None) -> Surface:
+        """Fast factory method that takes ownership of a list of Vertex.
+
+        Unlike the constructor, there is no type checking and no copy: the vertices must not be shared with
+        another Surface. This is O(N) and is what the other factory methods use.
+        """
+        surface = Surface.__new__(Surface)
+        surface._init_trusted(vertices=vertices, name=name)
+        return surface
+
+    @staticmethod
+    def from_numpy_array(arr, name=None) -> Surface:
         """Factory method to construct from a numpy array of 3-coordinates arrays."""
         if isinstance(arr, list):
             arr = np.array(arr)
         if arr.shape[0] < 3:
             raise ValueError("Need at least 3 vertices to construct a Surface")
-        if arr.shape[1] != 3:
+        if arr.ndim != 2 or arr.shape[1] != 3:
             raise ValueError(f"Expected a numpy array with a dimension (N, 3), got {arr.shape}")
-        return Surface([Vertex.from_numpy(x) for x in arr])
+        return Surface.from_trusted_vertices(vertices=[Vertex(x, y, z) for x, y, z in arr.tolist()], name=name)
 
     @staticmethod
     def from_Point3dVector(points: Union[openstudio.Point3dVector, List[openstudio.Point3d]]) -> Surface:
         """Factory method to construct from an openstudio Point3dVector or a list of Point3d."""
-        return Surface(vertices=[Vertex.from_Point3d(x) for x in points])
+        return Surface.from_trusted_vertices(vertices=[Vertex.from_Point3d(x) for x in points])
 
     @staticmethod
     def from_Surface(openstudio_surface: openstudio.model.Surface) -> Surface:
         """Factory method to construct from an openstudio.model.Surface."""
+        import openstudio
+
         if not isinstance(openstudio_surface, openstudio.model.Surface):
             raise ValueError("Expected an openstudio.model.Surface")
-        return Surface(
+        return Surface.from_trusted_vertices(
             vertices=[Vertex.from_Point3d(x) for x in openstudio_surface.vertices()],
             name=openstudio_surface.nameString(),
         )
@@ -123,9 +148,7 @@ class Surface:
                 [min_x, max_y, z],
             ]
         )
-        vertices = [Vertex.from_numpy(x) for x in vertices_arr]
-
-        return Surface(vertices=vertices)
+        return Surface.from_numpy_array(vertices_arr)
 
     @staticmethod
     def Rectangle(min_x=0.0, max_x=10.0, min_y=0.0, max_y=10.0, min_z=0.0, max_z=0.0) -> Surface:
@@ -178,9 +201,7 @@ class Surface:
                 ]
             )
 
-        vertices = [Vertex.from_numpy(x) for x in vertices_arr]
-
-        return Surface(vertices=vertices)
+        return Surface.from_numpy_array(vertices_arr)
 
     def __init__(self, vertices, name=None):
         """Surface constructor."""
@@ -191,27 +212,85 @@ class Surface:
             if not isinstance(vertex, Vertex):
                 raise ValueError(f"Element {i} is not a Vertex object")
 
-        self.name = name
-        self.os_plane = None
+        # Vertex.copy doesn't carry over the surface back-reference, unlike a deepcopy which would walk it
+        self._init_trusted(vertices=[vertex.copy() for vertex in vertices], name=name)
 
-        self.vertices = copy.deepcopy(vertices)
+    def _init_trusted(self, vertices: List[Vertex], name) -> None:
+        """Sets the attributes, taking ownership of vertices."""
+        self.name = name
+        self.os_plane: Optional[Plane] = None
+        # Derived quantities, valid for the vertex coordinates in _derived_key, cf _cached
+        self._derived: Dict[str, Any] = {}
+        self._derived_key: Optional[tuple] = None
+        # Whether a derived quantity is being computed, so the key was just checked by the outermost _cached call
+        self._derived_computing = False
+
+        self.vertices = vertices
         for vertex in self.vertices:
             vertex.surface = self
 
     def get_plane(self) -> Plane:
-        """Returns the Plane of the Surface."""
-        if self.os_plane is not None:
-            return self.os_plane
-        plane = openstudio.Plane(self.to_Point3dVector())
-        self.os_plane = Plane(plane.a(), plane.b(), plane.c(), plane.d())
+        """Returns the Plane of the Surface, fitted the same way openstudio.Plane does it (cf kernels.getPlanes).
+
+        The fit is cached, and recomputed if the vertices have changed since. A new Plane is returned each time, so
+        the caller can modify it without affecting the cache.
+        """
+        p = self._fittedPlane()
+        self.os_plane = Plane(p.a, p.b, p.c, p.d)
         return self.os_plane
 
+    def _fittedPlane(self) -> Plane:
+        """The cached Plane of get_plane, not to be modified."""
+        return self._cached('get_plane', lambda: Plane(*getPlanes(self.to_numpy()).tolist()))
+
+    def signedDistances(self, points) -> np.ndarray:
+        """Signed distances of an (N, 3) array of points to the plane of the Surface, cf Plane.signedDistances."""
+        return self._fittedPlane().signedDistances(points)
+
+    def containsPoints(self, points, tol: float = 0.001, planeTol: Optional[float] = None) -> np.ndarray:
+        """Checks whether each point of an (N, 3) array is inside the Surface, cf kernels.getPointsInPolygons.
+
+        The points are projected onto the plane of the Surface, in the local frame of Transformation.alignFace, and
+        the ones within tol of an edge count as inside. If planeTol is passed, the points must also be within planeTol
+        of the plane. Returns an (N,) mask.
+        """
+        inside = getPointsInPolygons(points, self.to_numpy(), tol=tol)
+        if planeTol is not None:
+            inside &= np.abs(self.signedDistances(points)) <= planeTol
+        return inside
+
+    def _coords_key(self) -> tuple:
+        """A hashable snapshot of the vertex coordinates, used to know whether cached results are still valid."""
+        return tuple([(v.x, v.y, v.z) for v in self.vertices])
+
+    def _cached(self, name: str, compute: Callable[[], Any]) -> Any:
+        """Returns the derived quantity name, calling compute only if it isn't cached for the current vertices.
+
+        The whole cache is dropped as soon as the vertices differ from the snapshot it was computed for, whether a
+        Vertex was moved or the list of vertices was changed (eg: by updateZonePolygonsForMissingColinearPoints).
+        The snapshot is only taken once per call chain: when compute asks for another derived quantity (eg: tilt
+        needs outwardNormal), the vertices haven't changed since the outermost call checked them.
+        """
+        if not self._derived_computing:
+            key = self._coords_key()
+            if key != self._derived_key:
+                self._derived = {}
+                self._derived_key = key
+        if name not in self._derived:
+            wasComputing = self._derived_computing
+            self._derived_computing = True
+            try:
+                self._derived[name] = compute()
+            finally:
+                self._derived_computing = wasComputing
+        return self._derived[name]
+
     def get_plot_axis(self) -> str:
         """Returns a string representation of the plane it is on.
 
         TODO: raises if not exactly on 'xy', 'xz' or 'yz'
         """
-        plane = self.get_plane()
+        plane = self._fittedPlane()
         tol = 0.001
         if abs(abs(plane.a) - 1) < tol:
             return 'yz'
@@ -224,7 +303,15 @@ class Surface:
         raise NotImplementedError("Surface is not on a standard plane!")
 
     def plane(self) -> Plane:
-        """Compute the plane from outwardNormal and the first point, not using OpenStudio."""
+        """Compute the plane from outwardNormal and the first point, not using OpenStudio.
+
+        Cached like get_plane, and likewise a new Plane is returned each time.
+        """
+        p = self._cached('plane', self._plane)
+        return Plane(p.a, p.b, p.c, p.d)
+
+    def _plane(self) -> Plane:
+        """Computes the result of plane."""
         normalVector = self.outwardNormal()
         if not np.isclose(normalVector.length(), 1.0):
             raise ValueError("Normal Unit Vector doesn't appear to be a unit vector")
@@ -241,23 +328,26 @@ class Surface:
 
     def area(self) -> float:
         """Compute area of the surface."""
-        newellVector = getNewellVector(self.vertices)
-        return newellVector.length() / 2.0
+        return self._cached('area', lambda: float(getAreas(self.to_numpy())))
 
     def outwardNormal(self) -> Vertex:
         """Returns the outward normal (normal unit vector)."""
-        return getOutwardNormal(self.vertices)
+        # A copy, so the caller can't modify the cached one
+        return self._cached('outwardNormal', lambda: getOutwardNormal(self.vertices)).copy()
 
     def tilt(self) -> float:
         """Returns the tilt of the surface, in radians, that is the angle between the outwardNormal and the Z axis."""
-        z = Vertex(0.0, 0.0, 1.0)
-        return getAngle(self.outwardNormal(), z)
+        return self._cached('tilt', lambda: getAngle(self.outwardNormal(), Vertex(0.0, 0.0, 1.0)))
 
     def azimuth(self) -> float:
         """Returns the azimuth of the surface, in radians.
 
         That is the angle between the outwardNormal and the North axis (Y-axis).
         """
+        return self._cached('azimuth', self._azimuth)
+
+    def _azimuth(self) -> float:
+        """Computes the result of azimuth."""
         normal = self.outwardNormal()
         north = Vertex(0.0, 1.0, 0.0)
         angle = getAngle(normal, north)
@@ -267,18 +357,30 @@ class Surface:
 
     def os_area(self) -> Vertex:
         """Returns area of the surface via openstudio."""
+        import openstudio
+
         return openstudio.getArea(self.to_Point3dVector()).get()
 
     def perimeter(self) -> float:
         """Returns the perimeter of the surface."""
-        return sum([edge.length() for edge in self.to_Surface3dEdges()])
+        return self._cached('perimeter', lambda: sum([edge.length() for edge in self.to_Surface3dEdges()]))
 
     def rough_centroid(self) -> Vertex:
         """Returns the centroid calculated in a rough way: the mean of the coordinates."""
         return Vertex.from_numpy(np.array([x.to_numpy() for x in self.vertices]).mean(axis=0))
 
+    def centroid(self) -> Vertex:
+        """Returns the area-weighted centroid of the (planar) surface, cf kernels.getCentroids."""
+        centroid_ = self._cached('centroid', lambda: getCentroids(self.to_numpy()))
+        if np.isnan(centroid_).any():
+            raise ValueError("Failed to calculate centroid, the surface has no area")
+        return Vertex.from_numpy(centroid_)
+
+    @instrumented(elements=_countVertices)
     def os_centroid(self) -> Vertex:
         """Returns the centroid via openstudio."""
+        import openstudio
+
         centroid_ = openstudio.getCentroid(self.to_Point3dVector())
         if not centroid_.is_initialized():
             raise ValueError("OpenStudio failed to calculate centroid")
@@ -290,11 +392,13 @@ class Surface:
 
     def to_OSSurface(self, model: openstudio.model.Model) -> openstudio.model.Surface:
         """Creates an openstudio.model.Surface in the model passed as argument."""
+        import openstudio
+
         return openstudio.model.Surface(self.to_Point3dVector(), model)
 
     def to_numpy(self) -> np.ndarray:
         """Get a numpy array representing the vertices."""
-        return np.array([v.to_numpy() for v in self.vertices])
+        return np.array([[v.x, v.y, v.z] for v in self.vertices], dtype=np.float64).reshape(-1, 3)
 
     def to_Surface3dEdges(self) -> List[Surface3dEge]:
         """Converts vertex pairs to Surface3dEge."""
@@ -307,11 +411,14 @@ class Surface:
             edges.append(Surface3dEge(start=curVertex, end=nextVertex, firstSurface=self))
         return edges
 
+    @instrumented(elements=_countVertices)
     def split_into_n_segments(self, n_segments, axis=None, plot=False) -> List[Surface]:
         """Splits a surface in N equal segments.
 
         If axis is not passed, it defaults to the first one of the plane
         eg: for a plane 'xy' it splits on 'x'
+
+        cf SurfaceArray.subdivide to split many rectangles of any orientation in a grid
         """
         plot_axis = self.get_plot_axis()
         if axis is None:
@@ -327,35 +434,44 @@ class Surface:
         v_np = self.to_numpy()
         minimum = v_np[:, idx].min()
         maximum = v_np[:, idx].max()
-        segment_length = (maximum - minimum) / n_segments
         is_max = v_np[:, idx] == maximum
         is_min = ~is_max
 
-        cur_min = minimum
-        cur_max = cur_min + segment_length
-
-        new_surfaces = []
-
-        for i in range(n_segments):
-            # print(cur_min, cur_max)
-            v_np_i = v_np.copy()
-            v_np_i[is_min, idx] = cur_min
-            v_np_i[is_max, idx] = cur_max
-            new_surface = Surface.from_numpy_array(v_np_i)
-            if self.name:
-                new_surface.name = f'{self.name}-{i+1}'
-            new_surfaces.append(new_surface)
+        # All the segments at once, as an (n_segments, N, 3) array
+        bounds = np.linspace(minimum, maximum, n_segments + 1)
+        segments = np.repeat(v_np[np.newaxis], n_segments, axis=0)
+        segments[:, is_min, idx] = bounds[:-1, np.newaxis]
+        segments[:, is_max, idx] = bounds[1:, np.newaxis]
 
-            cur_min = cur_max
-            cur_max += segment_length
+        new_surfaces = [
+            Surface.from_trusted_vertices(
+                vertices=[Vertex(x, y, z) for x, y, z in segment], name=f'{self.name}-{i+1}' if self.name else None
+            )
+            for i, segment in enumerate(segments.tolist())
+        ]
 
         if plot:
+            import matplotlib.pyplot as plt
+
             fig, ax = plt.subplots(figsize=(16, 9))
             for new_surface in new_surfaces:
                 new_surface.plot(ax=ax)
 
         return new_surfaces
 
+    @instrumented(elements=_countVertices)
+    def simplify(self, tol: float = 0.0127) -> int:
+        """Removes the duplicate consecutive vertices and the collinear ones, in place.
+
+        That is the vertices almost equal to the previous one, and the ones on the segment between their neighbors,
+        cf kernels.getRedundantVertices. Returns the number of vertices removed.
+        """
+        redundant = getRedundantVertices(self.to_numpy(), tol=tol)
+        if redundant.any():
+            self.vertices = [vertex for vertex, remove in zip(self.vertices, redundant.tolist()) if not remove]
+        return int(redundant.sum())
+
+    @instrumented(elements=_countVertices)
     def rotate(self, degrees: float, axis=None) -> Surface:
         """Rotates a surface by an amount of degrees.
 
@@ -374,7 +490,7 @@ class Surface:
         # Lazy load to avoid circular import
         from geomeffibem.transformation import Transformation
 
-        return Transformation.Rotation(axis=axis, radians=-openstudio.degToRad(degrees)) * self
+        return Transformation.Rotation(axis=axis, radians=-np.deg2rad(degrees)) * self
 
     def translate(self, translation: Vertex) -> Surface:
         """Translates a surface along a translation vector."""
@@ -411,7 +527,9 @@ class Surface:
 
 def get_surface_from_surface_like(surface_like: Union[Surface, List[Vertex], openstudio.model.Surface]) -> Surface:
     """Helper to get a Surface (class) from a surface like object."""
-    if isinstance(surface_like, openstudio.model.Surface):
+    # If openstudio was never imported, surface_like can't be an openstudio object
+    openstudio = sys.modules.get('openstudio')
+    if openstudio is not None and isinstance(surface_like, openstudio.model.Surface):
         surface = Surface.from_Surface(surface_like)
     elif isinstance(surface_like, Surface):
         surface = surface_like
@@ -419,7 +537,7 @@ def get_surface_from_surface_like(surface_like: Union[Surface, List[Vertex], ope
         if isinstance(surface_like, list):
             surface_like = np.array(surface_like)
 
-        if isinstance(surface_like[0], openstudio.Point3d):
+        if openstudio is not None and isinstance(surface_like[0], openstudio.Point3d):
             surface = Surface.from_Point3dVector(surface_like)
         elif isinstance(surface_like[0], np.ndarray):
             surface = Surface.from_numpy_array(surface_like)
@@ -429,6 +547,7 @@ def get_surface_from_surface_like(surface_like: Union[Surface, List[Vertex], ope
     return surface
 
 
+@instrumented()
 def plot_vertices(
     surface_like: Union[Surface, List[Vertex], openstudio.model.Surface],
     ax=None,
@@ -464,10 +583,11 @@ def plot_vertices(
         # Lazy load to avoid circular import
         from geomeffibem.transformation import Transformation
 
-        faceTransformation = Transformation.alignFace(surface.vertices)
-        faceTransformationInverse = faceTransformation.inverse()
-        points = faceTransformationInverse * surface.vertices
-        surface = Surface(points, name=surface.name)
+        with stage('plot_vertices.alignment', elements=len(surface.vertices)):
+            faceTransformation = Transformation.alignFace(surface.vertices)
+            faceTransformationInverse = faceTransformation.inverse()
+            points = faceTransformationInverse * surface.vertices
+            surface = Surface(points, name=surface.name)
         plane = 'xy'
         is_aligned = True
 
@@ -485,6 +605,8 @@ def plot_vertices(
     else:
         raise ValueError("plane must be in ['xy', 'xz', 'yz']")
     if ax is None:
+        import matplotlib.pyplot as plt
+
         # print("Making a figure")
         max_width = xs.max() - xs.min()
         max_height = ys.max() - ys.min()
@@ -505,7 +627,9 @@ def plot_vertices(
         ax.annotate(f"rough ({centroid_x}, {centroid_y})", xy=(centroid_x, centroid_y))
         ax.plot(centroid_x, centroid_y, 'rx')
     if with_os_centroid or name is not None and name is not False:
-        centroid_x, centroid_y = surface.os_centroid().get_coords_on_plane(plane=plane)
+        with stage('plot_vertices.centroid', elements=len(surface.vertices)):
+            centroid = surface.os_centroid() if with_os_centroid else surface.centroid()
+        centroid_x, centroid_y = centroid.get_coords_on_plane(plane=plane)
         if with_os_centroid:
             ax.annotate(f"os ({centroid_x}, {centroid_y})", xy=(centroid_x, centroid_y))
             ax.plot(centroid_x, centroid_y, 'gx')
@@ -0,0 +1,248 @@
+"""SurfaceArray: a columnar collection of surfaces.
+
+All the coordinates are in a single contiguous (M, 3) float64 array, and surface k is
+`coords[offsets[k]:offsets[k + 1]]`, which is the ragged batch layout of the kernels.
+
+It is also the compact serialization format of surfaces: either a single NumPy `.npz` file, or a directory of raw
+`.npy` files that can be memory-mapped. Both store the coordinates, the offsets, the names (as JSON) and optionally the
+welded vertex ids, without any pickle.
+"""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Any, Dict, List, Literal, Optional, Tuple, Union
+
+import numpy as np
+
+from geomeffibem.kernels import (
+    flatten,
+    getAreas,
+    getCentroids,
+    getGridTiles,
+    getNewellVectors,
+    getOutwardNormals,
+    getPlanes,
+    getPointsInPolygons,
+    getRedundantVertices,
+    getSignedDistances,
+    getSignedVolumes,
+)
+from geomeffibem.polyhedron import Polyhedron
+from geomeffibem.spatialindex import weldPoints
+from geomeffibem.surface import Surface
+from geomeffibem.vertex import VertexArray
+
+_NPY_FILES = {'coords': 'coords.npy', 'offsets': 'offsets.npy', 'weldIds': 'weldIds.npy'}
+_NAMES_FILE = 'names.json'
+
+
+class SurfaceArray:
+    """A collection of surfaces, stored as flat coordinates, offsets and names.
+
+    Optionally, weldIds maps each of the M vertices to its welded (unique) vertex id, cf weld.
+    """
+
+    @staticmethod
+    def from_surfaces(surfaces: List[Surface]) -> SurfaceArray:
+        """Factory method to construct from a list of Surface objects."""
+        coords, offsets = flatten([surface.to_numpy() for surface in surfaces])
+        return SurfaceArray(coords=coords, offsets=offsets, names=[surface.name for surface in surfaces])
+
+    @staticmethod
+    def from_polyhedron(polyhedron: Polyhedron) -> SurfaceArray:
+        """Factory method to construct from the surfaces of a Polyhedron."""
+        return SurfaceArray.from_surfaces(polyhedron.surfaces)
+
+    @staticmethod
+    def concatenate(arrays: List[SurfaceArray]) -> SurfaceArray:
+        """Factory method to join several SurfaceArray objects into one."""
+        if not arrays:
+            return SurfaceArray(coords=np.zeros((0, 3)), offsets=[0])
+        offsets = [arrays[0].offsets]
+        for array in arrays[1:]:
+            offsets.append(array.offsets[1:] + offsets[-1][-1])
+        return SurfaceArray(
+            coords=np.concatenate([array.coords for array in arrays]),
+            offsets=np.concatenate(offsets),
+            names=[name for array in arrays for name in array.names],
+        )
+
+    @staticmethod
+    def from_npz(path: Union[str, Path]) -> SurfaceArray:
+        """Factory method to load a file written by to_npz."""
+        with np.load(path, allow_pickle=False) as data:
+            return SurfaceArray(
+                coords=data['coords'],
+                offsets=data['offsets'],
+                names=json.loads(str(data['names'])),
+                weldIds=data['weldIds'] if 'weldIds' in data else None,
+            )
+
+    @staticmethod
+    def from_npy_dir(path: Union[str, Path], mmap_mode: Optional[Literal['r', 'r+', 'c']] = 'r') -> SurfaceArray:
+        """Factory method to load a directory written by to_npy_dir.
+
+        By default the arrays are memory-mapped read-only (cf numpy.load), so nothing is read until it is accessed.
+        Pass mmap_mode=None to read them in memory, or 'c' for copy-on-write.
+        """
+        path = Path(path)
+        weldIdsPath = path / _NPY_FILES['weldIds']
+        return SurfaceArray(
+            coords=np.load(path / _NPY_FILES['coords'], mmap_mode=mmap_mode, allow_pickle=False),
+            offsets=np.load(path / _NPY_FILES['offsets'], mmap_mode=mmap_mode, allow_pickle=False),
+            names=json.loads((path / _NAMES_FILE).read_text()),
+            weldIds=np.load(weldIdsPath, mmap_mode=mmap_mode, allow_pickle=False) if weldIdsPath.exists() else None,
+        )
+
+    def __init__(
+        self,
+        coords,
+        offsets,
+        names: Optional[List[Optional[str]]] = None,
+        weldIds: Optional[np.ndarray] = None,
+    ):
+        """Constructor for SurfaceArray. The arrays are used as is, without copy, if they have the right dtype."""
+        self.coords = np.asarray(coords, dtype=np.float64)
+        self.offsets = np.asarray(offsets, dtype=np.intp)
+        if self.coords.ndim != 2 or self.coords.shape[1] != 3:
+            raise ValueError(f"Expected coords with a dimension (M, 3), got {self.coords.shape}")
+        if self.offsets.ndim != 1 or len(self.offsets) == 0 or self.offsets[0] != 0:
+            raise ValueError("offsets must be a 1D array starting at 0")
+        if self.offsets[-1] != self.coords.shape[0]:
+            raise ValueError(f"offsets end at {self.offsets[-1]}, but there are {self.coords.shape[0]} coordinates")
+        if (np.diff(self.offsets) < 0).any():
+            raise ValueError("offsets must be increasing")
+        if names is None:
+            names = [None] * len(self)
+        elif len(names) != len(self):
+            raise ValueError(f"Expected {len(self)} names, got {len(names)}")
+        self.names = list(names)
+        if weldIds is not None:
+            weldIds = np.asarray(weldIds, dtype=np.intp)
+            if weldIds.shape != (self.coords.shape[0],):
+                raise ValueError(f"Expected {self.coords.shape[0]} weldIds, got {weldIds.shape}")
+        self.weldIds = weldIds
+
+    def __len__(self) -> int:
+        """Number of surfaces."""
+        return len(self.offsets) - 1
+
+    def numVertices(self) -> int:
+        """Total number of vertices."""
+        return self.coords.shape[0]
+
+    def get_coords(self, i: int) -> np.ndarray:
+        """Returns the (N_i, 3) coordinates of surface i, as a view (not a copy)."""
+        return self.coords[self.offsets[i] : self.offsets[i + 1]]
+
+    def to_surface(self, i: int, copy: bool = True) -> Surface:
+        """Creates Surface i.
+
+        With copy=False, its vertices are VertexView objects onto the coordinates of this SurfaceArray.
+        """
+        if copy:
+            return Surface.from_numpy_array(self.get_coords(i), name=self.names[i])
+        return Surface.from_trusted_vertices(vertices=list(VertexArray(self.get_coords(i))), name=self.names[i])
+
+    def to_surfaces(self, copy: bool = True) -> List[Surface]:
+        """Creates all Surfaces, cf to_surface."""
+        return [self.to_surface(i, copy=copy) for i in range(len(self))]
+
+    def to_polyhedron(self, copy: bool = True) -> Polyhedron:
+        """Creates a Polyhedron from all the surfaces, cf to_surface."""
+        return Polyhedron(surfaces=self.to_surfaces(copy=copy))
+
+    def weld(self, tol: float = 0.0127) -> np.ndarray:
+        """Welds the vertices that are almost equal, stores and returns the weldIds, cf Polyhedron.weldVertices."""
+        _, self.weldIds = weldPoints(self.coords, tol=tol)
+        return self.weldIds
+
+    def to_npz(self, path: Union[str, Path], compressed: bool = False):
+        """Writes to a single NumPy .npz file. Use to_npy_dir instead for memory-mapped reads."""
+        arrays: Dict[str, Any] = {
+            'coords': self.coords,
+            'offsets': self.offsets,
+            'names': np.array(json.dumps(self.names)),
+        }
+        if self.weldIds is not None:
+            arrays['weldIds'] = self.weldIds
+        if compressed:
+            np.savez_compressed(path, **arrays)
+        else:
+            np.savez(path, **arrays)
+
+    def to_npy_dir(self, path: Union[str, Path]):
+        """Writes to a directory of raw .npy files (one per array) and a names.json, which can be memory-mapped."""
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+        np.save(path / _NPY_FILES['coords'], self.coords, allow_pickle=False)
+        np.save(path / _NPY_FILES['offsets'], self.offsets, allow_pickle=False)
+        (path / _NAMES_FILE).write_text(json.dumps(self.names))
+        weldIdsPath = path / _NPY_FILES['weldIds']
+        if self.weldIds is not None:
+            np.save(weldIdsPath, self.weldIds, allow_pickle=False)
+        elif weldIdsPath.exists():
+            weldIdsPath.unlink()
+
+    def newellVectors(self) -> np.ndarray:
+        """(P, 3) Newell vectors of all surfaces."""
+        return getNewellVectors(self.coords, self.offsets)
+
+    def areas(self) -> np.ndarray:
+        """(P,) areas of all surfaces."""
+        return getAreas(self.coords, self.offsets)
+
+    def outwardNormals(self) -> np.ndarray:
+        """(P, 3) outward normals of all surfaces."""
+        return getOutwardNormals(self.coords, self.offsets)
+
+    def centroids(self) -> np.ndarray:
+        """(P, 3) area-weighted centroids of all surfaces."""
+        return getCentroids(self.coords, self.offsets)
+
+    def planes(self) -> np.ndarray:
+        """Fits a plane to each surface, returned as a (P, 4) array of (a, b, c, d)."""
+        return getPlanes(self.coords, self.offsets)
+
+    def signedDistances(self, points) -> np.ndarray:
+        """(N, P) signed distances of an (N, 3) array of points to the plane of each surface."""
+        return getSignedDistances(points, self.planes())
+
+    def containsPoints(self, points, tol: float = 0.001, planeTol: Optional[float] = None) -> np.ndarray:
+        """(N, P) mask of whether each point is inside each surface, cf Surface.containsPoints."""
+        inside = getPointsInPolygons(points, self.coords, self.offsets, tol=tol)
+        if planeTol is not None:
+            inside &= np.abs(self.signedDistances(points)) <= planeTol
+        return inside
+
+    def subdivide(self, nX: int, nY: int, tol: float = 0.001) -> SurfaceArray:
+        """Splits each rectangle into a grid of nX by nY tiles, cf kernels.getGridTiles.
+
+        Tile k comes from surface k // (nX * nY), and is named '<name>-<i>' (starting at 1) if that surface has a name.
+        """
+        coords, offsets = getGridTiles(self.coords, self.offsets, nX=nX, nY=nY, tol=tol)
+        nTiles = nX * nY
+        names: List[Optional[str]] = [None] * (len(offsets) - 1)
+        if any(name is not None for name in self.names):
+            names = [f'{name}-{i + 1}' if name is not None else None for name in self.names for i in range(nTiles)]
+        return SurfaceArray(coords=coords, offsets=offsets, names=names)
+
+    def simplify(self, tol: float = 0.0127) -> Tuple[SurfaceArray, np.ndarray]:
+        """Removes the duplicate consecutive and collinear vertices of all surfaces, cf kernels.getRedundantVertices.
+
+        Returns a new SurfaceArray (not welded) and the number of vertices removed from each surface.
+        """
+        redundant = getRedundantVertices(self.coords, self.offsets, tol=tol)
+        removed = np.add.reduceat(redundant.astype(np.intp), self.offsets[:-1]) if len(self) else np.zeros(0, np.intp)
+        offsets = np.concatenate([[0], np.cumsum(np.diff(self.offsets) - removed)])
+        return SurfaceArray(coords=self.coords[~redundant], offsets=offsets, names=self.names), removed
+
+    def volume(self) -> float:
+        """Volume enclosed by the surfaces, if they form an enclosed Polyhedron."""
+        return float(getSignedVolumes(self.coords, self.offsets).sum())
+
+    def __repr__(self):
+        """Repr."""
+        return f"SurfaceArray({len(self)} surfaces, {self.numVertices()} vertices)"
@@ -2,11 +2,13 @@
 
 from __future__ import annotations
 
-from typing import Optional
+from typing import List, Optional
 
 import numpy as np
 
+from geomeffibem.kernels import flatten
 from geomeffibem.plane import Plane
+from geomeffibem.profiling import instrumented
 from geomeffibem.surface import Surface
 from geomeffibem.vertex import Vertex, getOutwardNormal
 
@@ -98,6 +100,7 @@ class Transformation:
         return Transformation(matrix=storage)
 
     @staticmethod
+    @instrumented(name='Transformation.alignFace', elements=len)
     def alignFace(vertices: list[Vertex]) -> Transformation:
         """Transforms face coordinates to regular system, face normal will be z'.
 
@@ -140,23 +143,68 @@ class Transformation:
         t.matrix = np.linalg.inv(self.matrix)
         return t
 
+    def apply(self, points, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Applies the transformation to an (N, 3) array of points at once.
+
+        Args:
+        -----
+        * points (array-like): an (N, 3) array of coordinates (or a single point of 3 coordinates)
+        * out (np.ndarray): optional float64 buffer of the same shape to write the result in.
+          Passing points itself transforms them in place.
+
+        Returns:
+        ---------
+        * the transformed points, as an (N, 3) array (out, if it was passed)
+        """
+        pts = np.asarray(points, dtype=np.float64)
+        if pts.shape[-1] != 3:
+            raise ValueError(f"Expected an array with a dimension (N, 3), got {pts.shape}")
+        if out is None:
+            out = np.empty_like(pts)
+        elif out.shape != pts.shape:
+            raise ValueError(f"Expected out to have the same dimension as points {pts.shape}, got {out.shape}")
+        # Same as the homogeneous [x, y, z, 1] product, without having to append the column of ones
+        np.matmul(pts, self.matrix[:-1, :-1].T, out=out)
+        out += self.matrix[:-1, 3]
+        return out
+
+    @instrumented(elements=lambda self, surfaces: sum(len(surface.vertices) for surface in surfaces))
+    def apply_many(self, surfaces: List[Surface]) -> List[Surface]:
+        """Applies the transformation to a list of Surface objects, over one concatenated coordinate buffer."""
+        coords, offsets = flatten([surface.to_numpy() for surface in surfaces])
+        self.apply(coords, out=coords)
+        return [
+            Surface.from_numpy_array(coords[offsets[i] : offsets[i + 1]], name=Transformation._transformedName(surface))
+            for i, surface in enumerate(surfaces)
+        ]
+
+    @staticmethod
+    def _transformedName(surface: Surface) -> str:
+        """Name of a Surface that was multiplied by a Transformation."""
+        if surface.name is not None:
+            return f"Rotated {surface.name}"
+        return "Rotated unnamed"
+
     def __mul__(self, other):  # -> Union[Vertex, Transformation, np.ndarray, Surface, Plane]:
         """Multiplies self by other.
 
-        Accepts various objects: Vertex, Transformation, List of Vertex, Surface, Plane.
+        Accepts various objects: Vertex, Transformation, List of Vertex, (N, 3) numpy array of coordinates, Surface,
+        Plane.
         """
         if isinstance(other, Vertex):
-            temp = np.matmul(self.matrix, np.append(other.to_numpy(), 1.0))
-            return Vertex(temp[0], temp[1], temp[2])
+            x, y, z = self.apply([other.x, other.y, other.z]).tolist()
+            return Vertex(x, y, z)
         elif isinstance(other, Transformation):
             return Transformation(np.matmul(self.matrix, other.matrix))
+        elif isinstance(other, np.ndarray) and other.dtype != object:
+            return self.apply(other)
         elif isinstance(other, np.ndarray) or isinstance(other, list):
+            if len(other) > 0 and all(isinstance(v, Vertex) for v in other):
+                coords = self.apply([[v.x, v.y, v.z] for v in other])
+                return np.array([Vertex(x, y, z) for x, y, z in coords.tolist()])
             return np.array([self * v for v in other])
         elif isinstance(other, Surface):
-            name = "Rotated unnamed"
-            if other.name is not None:
-                name = f"Rotated {name}"
-            return Surface(vertices=[self * v for v in other.vertices], name=name)
+            return self.apply_many([other])[0]
         elif isinstance(other, Plane):
             # translate a point on the plane, just project (0,0,0)
             point = other.project(Vertex(0.0, 0.0, 0.0))
@@ -6,14 +6,24 @@ Includes utilities to go from/to numpy array and OpenStudio's Point3d
 
 from __future__ import annotations
 
-from typing import Any, List, Tuple
+import math
+from typing import TYPE_CHECKING, Iterable, Iterator, List, Tuple, Union
 
 import numpy as np
-import openstudio
+
+from geomeffibem.kernels import getNewellVectors
+
+if TYPE_CHECKING:
+    import openstudio
 
 
 class Vertex:
-    """Point3d and Vector3d."""
+    """Point3d and Vector3d.
+
+    It uses __slots__, so it is compact in memory and you can't set attributes other than x, y, z and surface.
+    """
+
+    __slots__ = ('x', 'y', 'z', 'surface')
 
     @staticmethod
     def from_numpy(arr):
@@ -22,7 +32,8 @@ class Vertex:
             arr = np.array(arr)
         if arr.shape != (3,):
             raise ValueError(f"Expected a numpy array with a dimension (3, ) (a Vector3d), got {arr.shape}")
-        return Vertex(arr[0], arr[1], arr[2])
+        x, y, z = arr.tolist()
+        return Vertex(x, y, z)
 
     @staticmethod
     def from_Point3d(pt: openstudio.Point3d):
@@ -53,7 +64,7 @@ class Vertex:
 
     def length(self) -> float:
         """Get the length of the vector."""
-        return np.sqrt(np.sum(self.to_numpy() ** 2))
+        return math.sqrt(self.x * self.x + self.y * self.y + self.z * self.z)
 
     def normalize(self) -> Vertex:
         """Normalize to a length of 1, returns a copy."""
@@ -142,6 +153,8 @@ class Vertex:
 
     def to_Point3d(self) -> openstudio.Point3d:
         """Export to an openstudio.Point3d."""
+        import openstudio
+
         return openstudio.Point3d(self.x, self.y, self.z)
 
     def __eq__(self, other):
@@ -163,25 +176,222 @@ class Vertex:
     #     return f"Vertex {self.__repr__()}"
 
 
+class VertexView(Vertex):
+    """A Vertex-compatible proxy onto one row of a VertexArray.
+
+    Reading or writing x, y, z goes straight to the underlying buffer, nothing is copied.
+    """
+
+    __slots__ = ('_data', '_index')
+
+    def __init__(self, data: np.ndarray, index: int):
+        """Constructor for VertexView, prefer indexing a VertexArray instead."""
+        self._data = data
+        self._index = index
+        self.surface = None
+
+    @property  # type: ignore[override]
+    def x(self) -> float:
+        """X coordinate."""
+        return float(self._data[self._index, 0])
+
+    @x.setter
+    def x(self, value: float) -> None:
+        self._data[self._index, 0] = value
+
+    @property  # type: ignore[override]
+    def y(self) -> float:
+        """Y coordinate."""
+        return float(self._data[self._index, 1])
+
+    @y.setter
+    def y(self, value: float) -> None:
+        self._data[self._index, 1] = value
+
+    @property  # type: ignore[override]
+    def z(self) -> float:
+        """Z coordinate."""
+        return float(self._data[self._index, 2])
+
+    @z.setter
+    def z(self, value: float) -> None:
+        self._data[self._index, 2] = value
+
+    def to_numpy(self) -> np.ndarray:
+        """Export to a numpy array of 3 coordinates (a copy)."""
+        return self._data[self._index].copy()
+
+
+class VertexArray:
+    """A batch of N vertices, stored as a contiguous (N, 3) float64 numpy array.
+
+    All arithmetic is vectorized over the rows. Indexing with an int hands out a VertexView (zero-copy), indexing with
+    a slice returns a VertexArray that is a view onto the same buffer.
+    """
+
+    @staticmethod
+    def from_vertices(vertices: Iterable[Vertex]) -> VertexArray:
+        """Factory method to construct from a list of Vertex (or anything with x, y, z attributes)."""
+        return VertexArray(np.array([[v.x, v.y, v.z] for v in vertices], dtype=np.float64).reshape(-1, 3))
+
+    @staticmethod
+    def from_surface(surface) -> VertexArray:
+        """Factory method to construct from the vertices of a Surface."""
+        return VertexArray.from_vertices(surface.vertices)
+
+    @staticmethod
+    def from_Point3dVector(points: Union[openstudio.Point3dVector, List[openstudio.Point3d]]) -> VertexArray:
+        """Factory method to construct from an openstudio Point3dVector or a list of Point3d."""
+        return VertexArray(np.array([[pt.x(), pt.y(), pt.z()] for pt in points], dtype=np.float64).reshape(-1, 3))
+
+    def __init__(self, data, copy: bool = False):
+        """Constructor for VertexArray, from an (N, 3) array-like.
+
+        If data is already a float64 numpy array, it is used as is (no copy) unless copy=True.
+        """
+        arr = np.array(data, dtype=np.float64, copy=True) if copy else np.asarray(data, dtype=np.float64)
+        if arr.ndim != 2 or arr.shape[1] != 3:
+            raise ValueError(f"Expected an array with a dimension (N, 3), got {arr.shape}")
+        self.data = arr
+
+    def __len__(self) -> int:
+        """Number of vertices."""
+        return self.data.shape[0]
+
+    def __getitem__(self, key):
+        """Returns a VertexView for an int, a VertexArray view for a slice or mask."""
+        if isinstance(key, (int, np.integer)):
+            n = len(self)
+            if key < -n or key >= n:
+                raise IndexError(f"Index {key} out of range for a VertexArray of length {n}")
+            return VertexView(self.data, key % n)
+        return VertexArray(self.data[key])
+
+    def __iter__(self) -> Iterator[VertexView]:
+        """Iterates over VertexView proxies."""
+        for i in range(len(self)):
+            yield VertexView(self.data, i)
+
+    def copy(self) -> VertexArray:
+        """Make a copy of this VertexArray."""
+        return VertexArray(self.data, copy=True)
+
+    def to_numpy(self) -> np.ndarray:
+        """Returns the underlying (N, 3) numpy array (not a copy)."""
+        return self.data
+
+    def to_vertices(self) -> List[Vertex]:
+        """Export to a list of (independent) Vertex objects."""
+        return [Vertex(x, y, z) for x, y, z in self.data.tolist()]
+
+    def to_Point3dVector(self) -> openstudio.Point3dVector:
+        """Export to an openstudio.Point3dVector."""
+        import openstudio
+
+        return openstudio.Point3dVector([openstudio.Point3d(x, y, z) for x, y, z in self.data.tolist()])
+
+    def to_surface(self, name=None):
+        """Creates a Surface from these vertices."""
+        # Lazy load to avoid circular import
+        from geomeffibem.surface import Surface
+
+        return Surface.from_trusted_vertices(vertices=self.to_vertices(), name=name)
+
+    def length(self) -> np.ndarray:
+        """Get the length of each vector, as an (N,) array."""
+        return np.sqrt(np.einsum('ij,ij->i', self.data, self.data))
+
+    def normalize(self) -> VertexArray:
+        """Normalize each vector to a length of 1, returns a copy."""
+        lengths = self.length()
+        if (lengths <= 0).any():
+            raise ValueError("Cannot normalize a vector of length 0")
+        return VertexArray(self.data / lengths[:, np.newaxis])
+
+    def dot(self, other) -> np.ndarray:
+        """Computes the row-wise dot product, as an (N,) array. other can be a VertexArray or a single Vertex."""
+        return np.einsum('ij,ij->i', self.data, np.broadcast_to(_as_coords(other), self.data.shape))
+
+    def cross(self, other, normalize: bool = False) -> VertexArray:
+        """Computes the row-wise cross product. other can be a VertexArray or a single Vertex."""
+        v = VertexArray(np.cross(self.data, _as_coords(other)))
+        if normalize:
+            return v.normalize()
+        return v
+
+    def __add__(self, other) -> VertexArray:
+        """Return a + b, row-wise. other can be a VertexArray or a single Vertex."""
+        return VertexArray(self.data + _as_coords(other))
+
+    def __sub__(self, other) -> VertexArray:
+        """Return a - b, row-wise. other can be a VertexArray or a single Vertex."""
+        return VertexArray(self.data - _as_coords(other))
+
+    def __neg__(self) -> VertexArray:
+        """Return obj negated (-obj)."""
+        return VertexArray(-self.data)
+
+    def __mul__(self, other) -> VertexArray:
+        """Multiplies each coordinate by a scalar, or each row by the matching entry of an (N,) array."""
+        if isinstance(other, np.ndarray) and other.ndim == 1:
+            return VertexArray(self.data * other[:, np.newaxis])
+        if not isinstance(other, (int, float, np.number)):
+            raise ValueError("Multiplication of a VertexArray by something else than a numeric is not supported")
+        return VertexArray(self.data * other)
+
+    def __rmul__(self, other) -> VertexArray:
+        """Multiplies each coordinate by a scalar."""
+        return self.__mul__(other)
+
+    def __truediv__(self, other) -> VertexArray:
+        """Divides each coordinate by a scalar, or each row by the matching entry of an (N,) array."""
+        if isinstance(other, np.ndarray) and other.ndim == 1:
+            return VertexArray(self.data / other[:, np.newaxis])
+        if not isinstance(other, (int, float, np.number)):
+            raise ValueError("Division of a VertexArray by something else than a numeric is not supported")
+        return VertexArray(self.data / other)
+
+    def __repr__(self):
+        """Repr."""
+        return f"VertexArray({len(self)} vertices)\n{self.data}"
+
+
+def _as_coords(other) -> np.ndarray:
+    """Helper to get the coordinates of a VertexArray, Vertex or array-like as a numpy array."""
+    if isinstance(other, VertexArray):
+        return other.data
+    if isinstance(other, Vertex):
+        return np.array([other.x, other.y, other.z])
+    return np.asarray(other, dtype=np.float64)
+
+
 def isAlmostEqual3dPt(v1: Vertex, v2: Vertex, tol=0.0127) -> bool:
     """Checks if both vertices almost equal within tolerance."""
     # 0.0127 m = 1.27 cm = 1/2 inch
-    return not (abs((v1.to_numpy() - v2.to_numpy())) >= tol).any()
+    # Plain float arithmetic: this is called a lot, and building numpy arrays for 3 coordinates is much slower
+    return abs(v1.x - v2.x) < tol and abs(v1.y - v2.y) < tol and abs(v1.z - v2.z) < tol
 
 
 def distance(lhs: Vertex, rhs: Vertex) -> float:
     """Distance between two vertices."""
-    squared_dist = np.sum((lhs.to_numpy() - rhs.to_numpy()) ** 2, axis=0)
-    dist = np.sqrt(squared_dist)
-    return dist
+    dx = lhs.x - rhs.x
+    dy = lhs.y - rhs.y
+    dz = lhs.z - rhs.z
+    return math.sqrt(dx * dx + dy * dy + dz * dz)
 
 
-def distanceFromPointToLine(start: Vertex, end: Vertex, test: Vertex) -> np.floating[Any]:
+def distanceFromPointToLine(start: Vertex, end: Vertex, test: Vertex) -> float:
     """Distance between a point and a line."""
-    s = start.to_numpy()
-    e = end.to_numpy()
-    p = test.to_numpy()
-    return np.linalg.norm(np.cross(e - s, p - s) / np.linalg.norm(e - s))
+    # |(e - s) x (p - s)| / |e - s|
+    ux, uy, uz = end.x - start.x, end.y - start.y, end.z - start.z
+    vx, vy, vz = test.x - start.x, test.y - start.y, test.z - start.z
+    cx = uy * vz - uz * vy
+    cy = uz * vx - ux * vz
+    cz = ux * vy - uy * vx
+    lineLength = math.sqrt(ux * ux + uy * uy + uz * uz)
+    if lineLength == 0.0:
+        return math.nan
+    return math.sqrt(cx * cx + cy * cy + cz * cz) / lineLength
 
 
 def isPointOnLineBetweenPoints(start: Vertex, end: Vertex, test: Vertex, tol: float = 0.0127) -> bool:
@@ -195,6 +405,23 @@ def isPointOnLineBetweenPoints(start: Vertex, end: Vertex, test: Vertex, tol: fl
     return False
 
 
+def arePointsOnLineBetweenPoints(start, end, points, tol: float = 0.0127) -> np.ndarray:
+    """Vectorized isPointOnLineBetweenPoints: checks which rows of an (N, 3) array are on the segment [start, end].
+
+    start and end can be Vertex objects or arrays of 3 coordinates. Returns an (N,) boolean mask.
+    """
+    s = _as_coords(start)
+    e = _as_coords(end)
+    pts = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+    lineLength = np.linalg.norm(e - s)
+    if lineLength == 0.0:
+        return np.zeros(pts.shape[0], dtype=bool)
+    distToLine = np.linalg.norm(np.cross(e - s, pts - s), axis=1) / lineLength
+    distStart = np.linalg.norm(pts - s, axis=1)
+    distEnd = np.linalg.norm(pts - e, axis=1)
+    return (distToLine < tol) & (np.abs(lineLength - (distStart + distEnd)) < tol)
+
+
 def getAngle(start: Vertex, end: Vertex) -> float:
     """Returns the angle between two vectors, in radians."""
     start = start.normalize()
@@ -208,13 +435,8 @@ def getNewellVector(points: List[Vertex]) -> Vertex:
     if n < 3:
         raise ValueError("Cannot compute Newell Vector for less than 3 points")
 
-    newellVector = Vertex(x=0, y=0, z=0)
-    for i in range(n - 1):
-        v1 = points[i] - points[0]
-        v2 = points[i + 1] - points[0]
-        newellVector += v1.cross(v2)
-
-    return newellVector
+    coords = np.array([[v.x, v.y, v.z] for v in points], dtype=np.float64)
+    return Vertex.from_numpy(getNewellVectors(coords))
 
 
 def getOutwardNormal(points: list[Vertex]) -> Vertex:
@@ -0,0 +1,108 @@
+#!/usr/bin/env python
+"""Tests for `geomeffibem` BoundingBox and BoundingBoxArray."""
+
+import numpy as np
+import pytest
+
+from geomeffibem.boundingbox import BoundingBox, BoundingBoxArray
+from geomeffibem.polyhedron import Polyhedron
+from geomeffibem.surface import Surface
+from geomeffibem.vertex import Vertex
+
+
+def test_boundingbox_addPoints():
+    """Test addPoints gives the same as addPoint, from Vertex objects or arrays."""
+    rng = np.random.default_rng(42)
+    pts = rng.uniform(-10.0, 10.0, size=(50, 3))
+
+    bb = BoundingBox()
+    for x, y, z in pts:
+        bb.addPoint(Vertex(x, y, z))
+
+    bb2 = BoundingBox()
+    bb2.addPoints([Vertex(x, y, z) for x, y, z in pts])
+    bb3 = BoundingBox.from_numpy(pts)
+    for b in [bb2, bb3]:
+        np.testing.assert_array_equal(b.to_numpy(), bb.to_numpy())
+        assert isinstance(b.minX, float)
+
+    np.testing.assert_array_equal(bb.to_numpy(), np.concatenate([pts.min(axis=0), pts.max(axis=0)]))
+    bb.addPoints([])
+    np.testing.assert_array_equal(bb.to_numpy(), bb3.to_numpy())
+
+    with pytest.raises(ValueError):
+        BoundingBox().to_numpy()
+
+
+def test_boundingbox_merge_and_queries():
+    """Test merging two boxes, intersections and containment."""
+    a = BoundingBox.from_numpy([[0.0, 0.0, 0.0], [10.0, 10.0, 3.0]])
+    b = BoundingBox.from_numpy([[10.0, 0.0, 0.0], [20.0, 10.0, 3.0]])
+    c = BoundingBox.from_numpy([[10.5, 0.0, 0.0], [20.0, 10.0, 3.0]])
+    assert a.intersects(b)
+    assert not a.intersects(c)
+    assert a.intersects(c, tol=0.5)
+    assert not a.intersects(BoundingBox())
+
+    assert a.containsPoint(Vertex(5.0, 5.0, 1.0))
+    assert not a.containsPoint(Vertex(5.0, 5.0, 4.0))
+    np.testing.assert_array_equal(a.containsPoints([[5.0, 5.0, 1.0], [5.0, 5.0, 4.0]]), [True, False])
+
+    merged = BoundingBox()
+    merged.addBoundingBox(a)
+    merged.addBoundingBox(BoundingBox())
+    merged.addBoundingBox(c)
+    np.testing.assert_array_equal(merged.to_numpy(), [0.0, 0.0, 0.0, 20.0, 10.0, 3.0])
+    assert merged.containsBoundingBox(a)
+    assert merged.containsBoundingBox(c)
+    assert not a.containsBoundingBox(merged)
+
+
+def test_boundingbox_from_polyhedron():
+    """Test the bounding boxes of a Polyhedron and of each of its surfaces."""
+    floor = Surface.Floor(min_x=0.0, max_x=10.0, min_y=0.0, max_y=5.0)
+    wall = Surface.Rectangle(min_x=0.0, max_x=10.0, min_y=0.0, max_y=0.0, min_z=0.0, max_z=3.0)
+    zonePoly = Polyhedron(surfaces=[floor, wall])
+
+    np.testing.assert_array_equal(BoundingBox.from_polyhedron(zonePoly).to_numpy(), [0, 0, 0, 10, 5, 3])
+    np.testing.assert_array_equal(BoundingBox.from_surface(wall).to_numpy(), [0, 0, 0, 10, 0, 3])
+
+    boxes = BoundingBoxArray.from_polyhedron(zonePoly)
+    assert len(boxes) == 2
+    np.testing.assert_array_equal(boxes.to_numpy(), [[0, 0, 0, 10, 5, 0], [0, 0, 0, 10, 0, 3]])
+    np.testing.assert_array_equal(boxes[1].to_numpy(), [0, 0, 0, 10, 0, 3])
+    np.testing.assert_array_equal(boxes.union().to_numpy(), [0, 0, 0, 10, 5, 3])
+    np.testing.assert_array_equal(boxes.dimensions(), [[10, 5, 0], [10, 0, 3]])
+    np.testing.assert_array_equal(boxes.containsPoint(Vertex(5.0, 2.0, 0.0)), [True, False])
+    np.testing.assert_array_equal(
+        boxes.intersects(BoundingBox.from_numpy([[0.0, 1.0, 0.0], [1.0, 2.0, 1.0]])), [True, False]
+    )
+    np.testing.assert_array_equal(
+        BoundingBoxArray.from_bounding_boxes([boxes[0], boxes[1]]).to_numpy(), boxes.to_numpy()
+    )
+
+    with pytest.raises(ValueError):
+        BoundingBoxArray(np.zeros((3, 3)))
+
+
+def test_boundingboxarray_intersectingPairs():
+    """Test the sweep and prune against a brute force check."""
+    rng = np.random.default_rng(0)
+    mins = rng.uniform(0.0, 100.0, size=(500, 3))
+    boxes = np.hstack([mins, mins + rng.uniform(0.0, 10.0, size=(500, 3))])
+    tol = 0.1
+    overlaps = (
+        (boxes[:, np.newaxis, :3] <= boxes[np.newaxis, :, 3:] + tol)
+        & (boxes[np.newaxis, :, :3] <= boxes[:, np.newaxis, 3:] + tol)
+    ).all(axis=2)
+
+    pairs = BoundingBoxArray(boxes).intersectingPairs(tol=tol)
+    assert len(pairs) > 0
+    np.testing.assert_array_equal(pairs, np.column_stack(np.nonzero(np.triu(overlaps, k=1))))
+
+    a = BoundingBoxArray(boxes[:200])
+    b = BoundingBoxArray(boxes[200:])
+    pairs = a.intersectingPairs(b, tol=tol)
+    np.testing.assert_array_equal(pairs, np.column_stack(np.nonzero(overlaps[:200, 200:])))
+
+    assert BoundingBoxArray(np.zeros((0, 6))).intersectingPairs().shape == (0, 2)
@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+"""Tests for `geomeffibem` bounding volume hierarchy."""
+
+import numpy as np
+import pytest
+
+from geomeffibem.bvh import SurfaceBVH
+from geomeffibem.polyhedron import Polyhedron
+from geomeffibem.surface import Surface
+from geomeffibem.surfacearray import SurfaceArray
+
+
+def box(min_x, max_x, min_y, max_y, min_z=0.0, max_z=3.0):
+    """An enclosed box Polyhedron."""
+    floor = np.array([[min_x, max_y, min_z], [max_x, max_y, min_z], [max_x, min_y, min_z], [min_x, min_y, min_z]])
+    surfaces = [
+        Surface.from_numpy_array(floor, name="Floor"),
+        Surface.from_numpy_array(floor[::-1] + [0.0, 0.0, max_z - min_z], name="Roof"),
+        Surface.Rectangle(min_x=min_x, max_x=max_x, min_y=min_y, max_y=min_y, min_z=min_z, max_z=max_z),
+        Surface.Rectangle(min_x=max_x, max_x=min_x, min_y=max_y, max_y=max_y, min_z=min_z, max_z=max_z),
+        Surface.Rectangle(min_x=min_x, max_x=min_x, min_y=max_y, max_y=min_y, min_z=min_z, max_z=max_z),
+        Surface.Rectangle(min_x=max_x, max_x=max_x, min_y=min_y, max_y=max_y, min_z=min_z, max_z=max_z),
+    ]
+    return Polyhedron(surfaces=surfaces)
+
+
+@pytest.fixture
+def zones():
+    """A 4 x 4 x 2 grid of adjacent 10 x 10 x 3 boxes, zone id = (4 * i + j) * 2 + k."""
+    return [
+        box(10.0 * i, 10.0 * (i + 1), 10.0 * j, 10.0 * (j + 1), 3.0 * k, 3.0 * (k + 1))
+        for i in range(4)
+        for j in range(4)
+        for k in range(2)
+    ]
+
+
+def test_bvh_build(zones):
+    """Test the tree covers every surface exactly once."""
+    bvh = SurfaceBVH.from_polyhedra(zones)
+    assert len(bvh) == 6 * 32
+    assert sorted(bvh.order.tolist()) == list(range(len(bvh)))
+    leaves = bvh.nodeLeft == -1
+    assert bvh.nodeCount[leaves].sum() == len(bvh)
+    assert bvh.nodeCount[leaves].max() <= 4
+    assert bvh.plane(0).c == -1.0
+
+    with pytest.raises(ValueError):
+        SurfaceBVH(SurfaceArray.from_polyhedron(zones[0]), leafSize=0)
+
+
+def test_bvh_intersectRays(zones):
+    """Test ray queries, against the single leaf (brute force) tree."""
+    bvh = SurfaceBVH.from_polyhedra(zones)
+
+    # From the middle of the first zone along +x: its east wall at x = 10, then the next ones every 10m
+    surfaceIds, ts = bvh.intersectRays([[5.0, 5.0, 1.5]], [[1.0, 0.0, 0.0]])
+    assert ts[0] == 5.0
+    assert bvh.surfaceArray.get_coords(surfaceIds[0])[:, 0].tolist() == [10.0] * 4
+    rays, _, ts = bvh.intersectRaysAll([[5.0, 5.0, 1.5]], [[1.0, 0.0, 0.0]])
+    # Each shared wall is there twice, once per zone
+    np.testing.assert_array_equal(ts, [5.0, 5.0, 15.0, 15.0, 25.0, 25.0, 35.0])
+
+    surfaceIds, ts = bvh.intersectRays([[5.0, 5.0, 1.5], [5.0, 5.0, 1.5]], [[0.0, 0.0, 1.0], [1.0, 0.0, 0.0]], tMax=2.0)
+    assert ts[0] == 1.5
+    assert surfaceIds[1] == -1
+    assert ts[1] == np.inf
+
+    rng = np.random.default_rng(0)
+    origins = rng.uniform([-5.0, -5.0, -1.0], [45.0, 45.0, 7.0], size=(2000, 3))
+    directions = rng.normal(size=(2000, 3))
+    ts = bvh.intersectRays(origins, directions)[1]
+    ts2 = SurfaceBVH.from_polyhedra(zones, leafSize=1000).intersectRays(origins, directions)[1]
+    np.testing.assert_allclose(ts, ts2)
+    assert np.isfinite(ts).any()
+    assert np.isinf(ts).any()
+
+
+def test_bvh_pointsInZones(zones):
+    """Test finding the zone of points."""
+    bvh = SurfaceBVH.from_polyhedra(zones)
+    rng = np.random.default_rng(1)
+    points = rng.uniform([0.0, 0.0, 0.0], [40.0, 40.0, 6.0], size=(1000, 3))
+    expected = (4 * np.floor(points[:, 0] / 10.0) + np.floor(points[:, 1] / 10.0)) * 2 + np.floor(points[:, 2] / 3.0)
+    np.testing.assert_array_equal(bvh.pointsInZones(points), expected.astype(int))
+    np.testing.assert_array_equal(bvh.pointsInZones([[50.0, 5.0, 1.0], [5.0, 5.0, -1.0]]), [-1, -1])
+
+    with pytest.raises(ValueError):
+        SurfaceBVH(SurfaceArray.from_polyhedron(zones[0])).pointsInZones([[1.0, 1.0, 1.0]])
+
+
+def test_bvh_nearestSurfaces(zones):
+    """Test nearest surface queries, against the single leaf (brute force) tree."""
+    bvh = SurfaceBVH.from_polyhedra(zones)
+    surfaceIds, distances = bvh.nearestSurfaces([[5.0, 1.0, 1.5], [-2.0, -2.0, 1.5]])
+    assert distances[0] == 1.0
+    assert bvh.surfaceArray.get_coords(surfaceIds[0])[:, 1].tolist() == [0.0] * 4
+    # Outside, closest to the vertical edge at the origin
+    assert np.isclose(distances[1], np.sqrt(8.0))
+
+    rng = np.random.default_rng(2)
+    points = rng.uniform([-5.0, -5.0, -1.0], [45.0, 45.0, 7.0], size=(2000, 3))
+    distances = bvh.nearestSurfaces(points)[1]
+    distances2 = SurfaceBVH.from_polyhedra(zones, leafSize=1000).nearestSurfaces(points)[1]
+    np.testing.assert_allclose(distances, distances2)
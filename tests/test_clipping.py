@@ -0,0 +1,168 @@
+#!/usr/bin/env python
+"""Tests for `geomeffibem` polygon boolean operations."""
+
+import numpy as np
+import pytest
+
+from geomeffibem.clipping import intersect, intersectMatches, intersectPairs, subtract, union
+from geomeffibem.kernels import flatten, getAreas
+from geomeffibem.matching import findMatchingSurfaces
+from geomeffibem.polyhedron import Polyhedron
+from geomeffibem.surface import Surface
+from geomeffibem.surfacearray import SurfaceArray
+from geomeffibem.transformation import Transformation
+from geomeffibem.vertex import Vertex
+
+
+def square(min_x, max_x, min_y, max_y, z=0.0):
+    """A horizontal rectangle, counterclockwise seen from above."""
+    return np.array([[min_x, min_y, z], [max_x, min_y, z], [max_x, max_y, z], [min_x, max_y, z]])
+
+
+def lshape(z=0.0):
+    """An L-shaped polygon, made of 3 squares of 2x2 at (1, 1), (3, 1) and (1, 3)."""
+    return np.array(
+        [[0.0, 0.0, z], [4.0, 0.0, z], [4.0, 2.0, z], [2.0, 2.0, z], [2.0, 4.0, z], [0.0, 4.0, z]], dtype=np.float64
+    )
+
+
+def diamond(z=0.0):
+    """A square of diagonal 4 centered on (3, 3), which overlaps both arms of the L-shape."""
+    return np.array([[3.0, 1.0, z], [5.0, 3.0, z], [3.0, 5.0, z], [1.0, 3.0, z]])
+
+
+def areas(surfaces):
+    """The areas of a list of Surface."""
+    return sorted(surface.area() for surface in surfaces)
+
+
+def test_boolean_overlapping_squares():
+    """Intersection, union and difference of two overlapping squares."""
+    a = square(0.0, 10.0, 0.0, 10.0)
+    b = square(5.0, 15.0, 5.0, 15.0)
+
+    (inter,) = intersect(a, b)
+    assert np.isclose(inter.area(), 25.0)
+    assert len(inter.vertices) == 4
+    (uni,) = union(a, b)
+    assert np.isclose(uni.area(), 175.0)
+    assert len(uni.vertices) == 8
+    (diff,) = subtract(a, b)
+    assert np.isclose(diff.area(), 75.0)
+    assert len(diff.vertices) == 6
+
+    # Results face like A, whatever the orientation of B
+    for surfaces in [intersect(a, b[::-1]), union(a, b[::-1]), subtract(a, b[::-1])]:
+        assert all(s.outwardNormal() == Vertex(0.0, 0.0, 1.0) for s in surfaces)
+    assert intersect(a[::-1], b)[0].outwardNormal() == Vertex(0.0, 0.0, -1.0)
+
+
+def test_boolean_degenerate_cases():
+    """Shared edges, identical polygons, touching corners and disjoint polygons."""
+    a = square(0.0, 10.0, 0.0, 10.0)
+    # The usual case of matched surfaces
+    (same,) = intersect(a, a[::-1])
+    assert np.isclose(same.area(), 100.0)
+    assert len(same.vertices) == 4
+    assert subtract(a, a[::-1]) == []
+
+    adjacent = square(10.0, 20.0, 0.0, 10.0)
+    assert intersect(a, adjacent) == []
+    (merged,) = union(a, adjacent)
+    assert np.isclose(merged.area(), 200.0)
+    assert len(merged.vertices) == 4
+    assert areas(subtract(a, adjacent)) == pytest.approx([100.0])
+
+    corner = square(10.0, 20.0, 10.0, 20.0)
+    assert areas(union(a, corner)) == pytest.approx([100.0, 100.0])
+    assert intersect(a, square(20.0, 30.0, 0.0, 10.0)) == []
+
+    # T-junction: B's edge ends in the middle of A's
+    assert areas(intersect(a, square(5.0, 15.0, 0.0, 5.0))) == pytest.approx([25.0])
+
+
+def test_boolean_non_convex_and_holes():
+    """Non-convex polygons, and results with holes which are cut in hole-free pieces."""
+    # The notch of the L is left out
+    assert areas(intersect(lshape(), square(1.0, 3.0, 1.0, 3.0))) == pytest.approx([3.0])
+    # Two pieces, touching at a vertex
+    assert areas(intersect(lshape(), diamond())) == pytest.approx([1.0, 1.0])
+    assert areas(intersect(lshape(), square(1.0, 5.0, 1.0, 5.0)[[0, 1, 3]])) == pytest.approx([5.0])
+    (filled,) = union(lshape(), square(2.0, 4.0, 2.0, 4.0))
+    assert np.isclose(filled.area(), 16.0)
+    assert len(filled.vertices) == 4
+
+    wall = Surface.Rectangle(min_x=0.0, max_x=10.0, min_y=0.0, max_y=0.0, min_z=0.0, max_z=3.0)
+    window = Surface.Rectangle(min_x=2.0, max_x=4.0, min_y=0.0, max_y=0.0, min_z=1.0, max_z=2.0)
+    pieces = subtract(wall, window)
+    assert len(pieces) == 2
+    assert np.isclose(sum(areas(pieces)), 28.0)
+    assert all(piece.outwardNormal() == wall.outwardNormal() for piece in pieces)
+    # None of the pieces contains the window
+    assert not any(piece.containsPoints(window.centroid().to_numpy(), tol=0.0)[0] for piece in pieces)
+
+    assert areas(union(square(0.0, 3.0, 0.0, 3.0), square(1.0, 2.0, 1.0, 2.0))) == pytest.approx([9.0])
+
+
+def test_boolean_rotated():
+    """Polygons in any plane."""
+    rotation = Transformation.Rotation(axis=Vertex(1.0, 2.0, 3.0), radians=0.7)
+    a = rotation.apply(lshape()) + [5.0, -3.0, 2.0]
+    b = rotation.apply(square(1.0, 5.0, 1.0, 5.0)[::-1]) + [5.0, -3.0, 2.0]
+    assert areas(intersect(a, b)) == pytest.approx([5.0])
+    assert areas(union(a, b)) == pytest.approx([23.0])
+    assert np.isclose(sum(areas(subtract(a, b))), 7.0)
+    assert np.isclose(sum(areas(subtract(b, a))), 11.0)
+
+    with pytest.raises(ValueError, match="not coplanar"):
+        intersect(a, b + [0.0, 0.0, 1.0])
+
+
+def test_intersectPairs():
+    """The batch mode gives the same results as intersect, for convex and non-convex pairs."""
+    rotation = Transformation.Rotation(axis=Vertex(1.0, 2.0, 3.0), radians=0.7)
+    polygons = [
+        square(0.0, 10.0, 0.0, 10.0),
+        square(5.0, 15.0, 5.0, 15.0)[::-1],
+        lshape(),
+        diamond(),
+        rotation.apply(lshape()),
+        rotation.apply(square(1.0, 3.0, 1.0, 3.0)),
+        square(20.0, 30.0, 0.0, 10.0),
+    ]
+    surfaceArray = SurfaceArray(*flatten(polygons))
+    pairs = [[0, 1], [2, 3], [4, 5], [0, 6], [0, 0], [1, 0]]
+    result, pairIds = intersectPairs(surfaceArray, pairs, tol=0.001)
+    assert pairIds.tolist() == [0, 1, 1, 2, 4, 5]
+    for k, (i, j) in enumerate(pairs):
+        expected = [s.to_numpy() for s in intersect(polygons[i], polygons[j], tol=0.001)]
+        got = [result.get_coords(n) for n in np.flatnonzero(pairIds == k)]
+        assert sorted(getAreas(p) for p in got) == pytest.approx(sorted(getAreas(p) for p in expected))
+    np.testing.assert_allclose(result.outwardNormals(), surfaceArray.outwardNormals()[np.array(pairs)[pairIds, 0]])
+
+    empty, emptyIds = intersectPairs(surfaceArray, np.zeros((0, 2)))
+    assert len(empty) == 0 and len(emptyIds) == 0
+
+    with pytest.raises(ValueError, match=r"pairs \[0\] are not coplanar"):
+        intersectPairs(surfaceArray, [[0, 4]])
+
+
+def test_intersectMatches():
+    """Intersecting the surfaces found by findMatchingSurfaces."""
+    spaces = []
+    for x in [0.0, 10.0, 20.0]:
+        surfaces = [
+            Surface.Floor(min_x=x, max_x=x + 10.0, min_y=0.0, max_y=10.0, z=0.0),
+            Surface.Rectangle(min_x=x, max_x=x, min_y=10.0, max_y=0.0, min_z=0.0, max_z=3.0),
+            Surface.Rectangle(min_x=x + 10.0, max_x=x + 10.0, min_y=0.0, max_y=10.0, min_z=0.0, max_z=3.0),
+        ]
+        spaces.append(Polyhedron(surfaces=surfaces))
+    # A shorter wall in the last space
+    spaces[2].surfaces[1] = Surface.Rectangle(min_x=20.0, max_x=20.0, min_y=10.0, max_y=4.0, min_z=0.0, max_z=3.0)
+    matches = findMatchingSurfaces(spaces)
+    assert len(matches) == 2
+
+    result, matchIds = intersectMatches(spaces, matches)
+    assert matchIds.tolist() == [0, 1]
+    assert result.areas() == pytest.approx([m.overlapArea for m in matches])
+    assert result.areas() == pytest.approx([30.0, 18.0])
@@ -0,0 +1,61 @@
+#!/usr/bin/env python
+"""Tests for `geomeffibem` batch enclosure checks."""
+
+import numpy as np
+import openstudio
+import pytest
+
+from geomeffibem.enclosure import EnclosureResult, checkEnclosures
+from geomeffibem.polyhedron import Polyhedron
+from geomeffibem.surface import Surface
+from geomeffibem.surfacearray import SurfaceArray
+
+
+@pytest.fixture
+def zones():
+    """A fixture with an enclosed box, a box with a split wall, and a box missing its floor."""
+    floor_surface = Surface.Floor(min_x=0.0, max_x=10.0, min_y=0.0, max_y=10.0, z=0.0)
+    m = openstudio.model.Model()
+    openstudio.model.Space.fromFloorPrint(floor_surface.to_Point3dVector(), 3.0, m).get()
+    surfaces = [Surface.from_Surface(s) for s in m.getSurfaces()]
+    box = Polyhedron(surfaces=surfaces)
+
+    wall = [s for s in surfaces if np.isclose(s.outwardNormal().y, -1.0)][0]
+    splitWall = Polyhedron(surfaces=[s for s in surfaces if s is not wall] + wall.split_into_n_segments(2, axis='x'))
+
+    open_box = Polyhedron(surfaces=[s for s in surfaces if s.outwardNormal().z > -0.5])
+    return [box, splitWall, open_box]
+
+
+def test_checkEnclosures(zones):
+    """Test the serial and parallel checks agree with Polyhedron."""
+    names = ['box', 'splitWall', 'open']
+    serial = checkEnclosures(zones, names=names, maxWorkers=1)
+    parallel = checkEnclosures(zones, names=names, maxWorkers=2, chunksize=1)
+
+    for zonePoly, name, r1, r2 in zip(zones, names, serial, parallel):
+        assert isinstance(r1, EnclosureResult)
+        assert r1.name == r2.name == name
+        isEnclosed, edges = zonePoly.isEnclosedVolume()
+        assert r1.isEnclosed == r2.isEnclosed == isEnclosed
+        assert r1.badEdges.shape == r2.badEdges.shape == (len(edges), 2, 3)
+        np.testing.assert_allclose(r1.badEdges, r2.badEdges)
+        assert r1.volume == r2.volume == zonePoly.calcPolyhedronVolume()
+
+    assert [r.isEnclosed for r in serial] == [True, True, False]
+    assert len(serial[2].badEdges) == 4
+    assert np.isclose(serial[0].volume, 300.0)
+    assert np.isclose(serial[1].volume, 300.0)
+
+
+def test_checkEnclosures_arrays(zones):
+    """Test zones given as SurfaceArray or raw (coords, offsets) arrays."""
+    sa = SurfaceArray.from_polyhedron(zones[1])
+    results = checkEnclosures([sa, (sa.coords, sa.offsets)], maxWorkers=2)
+    assert [r.isEnclosed for r in results] == [True, True]
+    assert [r.name for r in results] == [None, None]
+
+    with pytest.raises(ValueError):
+        checkEnclosures([(sa.coords, sa.offsets[:-1])])
+    with pytest.raises(ValueError):
+        checkEnclosures([sa], names=['a', 'b'])
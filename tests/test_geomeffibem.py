@@ -1,8 +1,13 @@
 #!/usr/bin/env python
 """Tests for `geomeffibem` package."""
 
+import subprocess
+import sys
+
 import pytest
 
+import geomeffibem
+
 
 @pytest.fixture
 def response():
@@ -19,3 +24,25 @@ def test_content(response):
     # from bs4 import BeautifulSoup
     # assert 'GitHub' in BeautifulSoup(response.content).title.string
     del response
+
+
+def test_import_is_lightweight():
+    """Importing the package doesn't pull in openstudio nor matplotlib.
+
+    This is run in a fresh interpreter so it isn't affected by what the other tests imported. The import time itself is
+    tracked by the asv benchmark in benchmarks/bench_import.py.
+    """
+    code = "import sys\nimport geomeffibem\nprint('openstudio' in sys.modules, 'matplotlib' in sys.modules)\n"
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    has_openstudio, has_matplotlib = result.stdout.split()
+    assert has_openstudio == 'False'
+    assert has_matplotlib == 'False'
+
+
+def test_openstudio_loaded_on_demand():
+    """The OpenStudio interop still works, importing it as needed."""
+    import openstudio
+
+    surface = geomeffibem.Surface.Floor()
+    assert isinstance(surface.to_Point3dVector()[0], openstudio.Point3d)
+    assert geomeffibem.surface.get_surface_from_surface_like(surface.to_Point3dVector()).area() == 100.0
@@ -0,0 +1,326 @@
+#!/usr/bin/env python
+"""Tests for `geomeffibem` vectorized kernels."""
+
+import numpy as np
+import openstudio
+import pytest
+
+from geomeffibem.kernels import (
+    flatten,
+    getAlignFaceMatrices,
+    getAreas,
+    getCentroids,
+    getGridTiles,
+    getNewellVectors,
+    getOutwardNormals,
+    getPlanes,
+    getPointsInPolygons,
+    getRedundantVertices,
+    getSignedDistances,
+    getSignedVolumes,
+)
+from geomeffibem.surface import Surface
+from geomeffibem.transformation import Transformation
+from geomeffibem.vertex import Vertex
+
+
+def _newellVectorLoop(points):
+    """The per-triangle loop the kernels replace."""
+    newellVector = Vertex(0.0, 0.0, 0.0)
+    for i in range(len(points) - 1):
+        newellVector += (points[i] - points[0]).cross(points[i + 1] - points[0])
+    return newellVector.to_numpy()
+
+
+@pytest.fixture
+def polygons():
+    """A few polygons of varying size and orientation."""
+    rng = np.random.default_rng(1)
+    floor = Surface.Floor(min_x=0.0, max_x=10.0, min_y=0.0, max_y=5.0, z=0.0).to_numpy()
+    wall = Surface.Rectangle(min_x=0.0, max_x=10.0, min_y=0.0, max_y=0.0, min_z=0.0, max_z=3.0).to_numpy()
+    triangle = np.array([[0.0, 0.0, 0.0], [1.0, 0.0, 1.0], [0.0, 1.0, 0.0]])
+    # An L-shaped floor with 6 vertices
+    lshape = np.array(
+        [[0.0, 0.0, 3.0], [4.0, 0.0, 3.0], [4.0, 2.0, 3.0], [2.0, 2.0, 3.0], [2.0, 4.0, 3.0], [0.0, 4.0, 3.0]]
+    )
+    random = rng.uniform(-5.0, 5.0, size=(7, 3))
+    return [floor, wall, triangle, lshape, random]
+
+
+def test_getNewellVectors(polygons):
+    """Single polygon and ragged batch agree with the loop."""
+    expected = np.array([_newellVectorLoop([Vertex.from_numpy(x) for x in p]) for p in polygons])
+    for p, e in zip(polygons, expected):
+        assert np.allclose(getNewellVectors(p), e)
+
+    coords, offsets = flatten(polygons)
+    assert coords.shape == (sum(len(p) for p in polygons), 3)
+    assert offsets.tolist() == [0, 4, 8, 11, 17, 24]
+    assert np.allclose(getNewellVectors(coords, offsets), expected)
+
+    with pytest.raises(ValueError):
+        getNewellVectors(np.zeros((2, 3)))
+    with pytest.raises(ValueError):
+        getNewellVectors(coords, np.array([0, 4, 5]))
+
+
+def test_getAreas_getOutwardNormals(polygons):
+    """Areas and normals."""
+    coords, offsets = flatten(polygons[:4])
+    assert np.allclose(getAreas(coords, offsets), [50.0, 30.0, np.sqrt(2) / 2.0, 12.0])
+    assert getAreas(polygons[0]) == 50.0
+
+    normals = getOutwardNormals(coords, offsets)
+    assert normals.shape == (4, 3)
+    assert np.allclose(normals[0], [0.0, 0.0, -1.0])
+    assert np.allclose(normals[1], [0.0, -1.0, 0.0])
+    assert np.allclose(normals[3], [0.0, 0.0, 1.0])
+    assert np.allclose(np.linalg.norm(normals, axis=1), 1.0)
+
+    # Degenerate polygon gets NaN
+    assert np.isnan(getOutwardNormals(np.zeros((3, 3)))).all()
+
+
+def test_getSignedVolumes():
+    """Volume of a box, from its faces."""
+    box = Surface.Floor(min_x=0.0, max_x=10.0, min_y=0.0, max_y=5.0, z=0.0).to_numpy()
+    assert np.isclose(getSignedVolumes(box), 0.0)
+    faces = [
+        box,
+        box[::-1] + [0.0, 0.0, 3.0],
+        np.array([[0.0, 0.0, 3.0], [0.0, 0.0, 0.0], [10.0, 0.0, 0.0], [10.0, 0.0, 3.0]]),
+        np.array([[10.0, 0.0, 3.0], [10.0, 0.0, 0.0], [10.0, 5.0, 0.0], [10.0, 5.0, 3.0]]),
+        np.array([[10.0, 5.0, 3.0], [10.0, 5.0, 0.0], [0.0, 5.0, 0.0], [0.0, 5.0, 3.0]]),
+        np.array([[0.0, 5.0, 3.0], [0.0, 5.0, 0.0], [0.0, 0.0, 0.0], [0.0, 0.0, 3.0]]),
+    ]
+    coords, offsets = flatten(faces)
+    volumes = getSignedVolumes(coords, offsets)
+    assert volumes.shape == (6,)
+    assert np.isclose(volumes.sum(), 150.0)
+    # Not depending on where the origin is
+    assert np.isclose(getSignedVolumes(coords + [100.0, -50.0, 7.0], offsets).sum(), 150.0)
+
+
+def test_getPlanes_matches_openstudio(polygons):
+    """Same planes as openstudio.Plane, for planar and non-planar polygons, one at a time or in a batch."""
+    rng = np.random.default_rng(2)
+    nonPlanar = []
+    for n in (4, 5, 8):
+        pts = rng.uniform(-5.0, 5.0, size=(n, 3))
+        pts[:, 2] = 0.2 * pts[:, 0] + 0.1 * pts[:, 1] + 1.0 + rng.normal(0.0, 0.05, size=n)
+        # Make the dominant axis of the normal vary
+        nonPlanar.append(pts[:, rng.permutation(3)])
+    allPolygons = polygons[:4] + nonPlanar
+
+    coords, offsets = flatten(allPolygons)
+    planes = getPlanes(coords, offsets)
+    assert planes.shape == (len(allPolygons), 4)
+    for pts, plane in zip(allPolygons, planes):
+        osPlane = openstudio.Plane([openstudio.Point3d(*p) for p in pts])
+        assert np.allclose(plane, [osPlane.a(), osPlane.b(), osPlane.c(), osPlane.d()])
+        assert np.allclose(getPlanes(pts), plane)
+
+    # Axis aligned planes are exact
+    assert getPlanes(polygons[0]).tolist() == [0.0, 0.0, -1.0, 0.0]
+
+    with pytest.raises(ValueError):
+        getPlanes(np.zeros((4, 3)))
+
+
+def test_getCentroids_matches_openstudio(polygons):
+    """Same centroids and areas as openstudio, including non-convex and tilted polygons."""
+    rotation = Transformation.Rotation(axis=Vertex(1.0, 2.0, 3.0), radians=0.7)
+    allPolygons = polygons[:4] + [rotation.apply(p) + [5.0, -3.0, 2.0] for p in polygons[:4]]
+    coords, offsets = flatten(allPolygons)
+    centroids = getCentroids(coords, offsets)
+    areas = getAreas(coords, offsets)
+    assert centroids.shape == (len(allPolygons), 3)
+    for pts, centroid, area in zip(allPolygons, centroids, areas):
+        points = [openstudio.Point3d(*p) for p in pts]
+        osCentroid = openstudio.getCentroid(points).get()
+        assert np.allclose(centroid, [osCentroid.x(), osCentroid.y(), osCentroid.z()])
+        assert np.isclose(area, openstudio.getArea(points).get())
+        assert np.allclose(getCentroids(pts), centroid)
+
+    # The L-shape: 3 squares of 2x2 at (1, 1), (3, 1) and (1, 3)
+    assert np.allclose(centroids[3], [5.0 / 3.0, 5.0 / 3.0, 3.0])
+    assert np.isnan(getCentroids(np.zeros((4, 3)))).all()
+
+
+def test_getAlignFaceMatrices(polygons):
+    """Same matrices as Transformation.alignFace, for all orientations."""
+    rotation = Transformation.Rotation(axis=Vertex(1.0, 2.0, 3.0), radians=0.7)
+    allPolygons = polygons[:4] + [rotation.apply(p) + [5.0, -3.0, 2.0] for p in polygons[:4]]
+    coords, offsets = flatten(allPolygons)
+    matrices = getAlignFaceMatrices(coords, offsets)
+    assert matrices.shape == (len(allPolygons), 4, 4)
+    for pts, matrix in zip(allPolygons, matrices):
+        expected = Transformation.alignFace([Vertex(*p) for p in pts]).matrix
+        assert np.allclose(matrix, expected)
+        assert np.allclose(getAlignFaceMatrices(pts), matrix)
+        # In the local frame, the polygon is at z'=0
+        local = Transformation(matrix).inverse().apply(pts)
+        assert np.allclose(local[:, 2], 0.0)
+        assert np.allclose(local.min(axis=0), 0.0)
+
+    # Degenerate polygons get the identity
+    assert np.array_equal(getAlignFaceMatrices(np.zeros((4, 3))), np.identity(4))
+
+
+def test_getSignedDistances(polygons):
+    """Signed distances to one or many planes."""
+    coords, offsets = flatten(polygons)
+    planes = getPlanes(coords, offsets)
+    points = np.random.default_rng(2).uniform(-5.0, 5.0, size=(20, 3))
+    distances = getSignedDistances(points, planes)
+    assert distances.shape == (20, len(polygons))
+    for k, plane in enumerate(planes):
+        assert np.allclose(distances[:, k], points @ plane[:3] + plane[3])
+        assert np.allclose(getSignedDistances(points, plane), distances[:, k])
+    # The floor at z=0 faces down
+    assert np.allclose(distances[:, 0], -points[:, 2])
+
+
+def test_getPointsInPolygons(polygons):
+    """Point in polygon, in the local frame of each polygon, including tilted and non-convex ones."""
+    lshape = polygons[3]
+    points = np.array(
+        [
+            [1.0, 1.0, 3.0],  # inside
+            [3.0, 3.0, 3.0],  # in the notch
+            [1.0, 3.0, -7.0],  # inside once projected
+            [4.0, 1.0, 3.0],  # on an edge
+            [4.0005, 1.0, 3.0],  # just outside
+            [5.0, 5.0, 3.0],  # outside
+        ]
+    )
+    # Points exactly on an edge may go either way without a tolerance
+    assert getPointsInPolygons(points, lshape)[[0, 1, 2, 4, 5]].tolist() == [True, False, True, False, False]
+    assert getPointsInPolygons(points, lshape, tol=0.001).tolist() == [True, False, True, True, True, False]
+
+    # Moving both the polygon and the points doesn't change anything
+    rotation = Transformation.Rotation(axis=Vertex(1.0, 2.0, 3.0), radians=0.7)
+    rotated = rotation.apply(lshape) + [5.0, -3.0, 2.0]
+    rotatedPoints = rotation.apply(points) + [5.0, -3.0, 2.0]
+    assert getPointsInPolygons(rotatedPoints, rotated, tol=0.001).tolist() == [True, False, True, True, True, False]
+
+    # Batch, against a brute force reference on random points in the bounding box of the floor
+    coords, offsets = flatten(polygons[:4] + [rotated])
+    random = np.random.default_rng(3).uniform(-1.0, 11.0, size=(200, 3))
+    inside = getPointsInPolygons(random, coords, offsets)
+    assert inside.shape == (200, 5)
+    expected = (random[:, 0] > 0.0) & (random[:, 0] < 10.0) & (random[:, 1] > 0.0) & (random[:, 1] < 5.0)
+    assert np.array_equal(inside[:, 0], expected)
+    assert np.array_equal(inside[:, 3], getPointsInPolygons(random, lshape))
+    movedInside = getPointsInPolygons(rotation.apply(random) + [5.0, -3.0, 2.0], coords, offsets)
+    assert np.array_equal(movedInside[:, 4], inside[:, 3])
+
+    # Degenerate polygons contain nothing
+    assert not getPointsInPolygons(random, np.zeros((4, 3))).any()
+
+
+def test_getGridTiles():
+    """Grid tiles of rectangles of any orientation, laid out in their local frame."""
+    wall = Surface.Rectangle(min_x=0.0, max_x=10.0, min_y=0.0, max_y=0.0, min_z=0.0, max_z=3.0).to_numpy()
+    coords, offsets = getGridTiles(wall, nX=5, nY=3)
+    assert coords.shape == (60, 3)
+    assert np.array_equal(offsets, np.arange(0, 61, 4))
+    # Columns are horizontal, rows vertical, starting at the bottom left corner
+    assert np.allclose(coords[:4], [[0.0, 0.0, 0.0], [2.0, 0.0, 0.0], [2.0, 0.0, 1.0], [0.0, 0.0, 1.0]])
+    assert np.allclose(coords[-4:], [[8.0, 0.0, 2.0], [10.0, 0.0, 2.0], [10.0, 0.0, 3.0], [8.0, 0.0, 3.0]])
+    assert np.allclose(getAreas(coords, offsets), 2.0)
+    assert np.allclose(getOutwardNormals(coords, offsets), [0.0, -1.0, 0.0])
+
+    # Rotated in their own plane and tilted
+    rotation = Transformation.Rotation(axis=Vertex(1.0, 2.0, 3.0), radians=0.7)
+    floor = Surface.Floor(min_x=0.0, max_x=4.0, min_y=0.0, max_y=2.0, z=1.0).rotate(30.0).to_numpy()
+    rects = [wall, floor, rotation.apply(wall), rotation.apply(floor) + [5.0, -3.0, 2.0]]
+    coords, offsets = getGridTiles(*flatten(rects), nX=4, nY=2)
+    assert len(offsets) == 4 * 8 + 1
+    areas = getAreas(coords, offsets).reshape(4, 8)
+    normals = getOutwardNormals(coords, offsets).reshape(4, 8, 3)
+    for k, rect in enumerate(rects):
+        assert np.allclose(areas[k], getAreas(rect) / 8.0)
+        assert np.allclose(normals[k], getOutwardNormals(rect))
+        tileCentroids = getCentroids(coords[32 * k : 32 * (k + 1)], np.arange(0, 33, 4))
+        assert np.allclose(tileCentroids.mean(axis=0), rect.mean(axis=0))
+
+    skewed = wall.copy()
+    skewed[2, 0] += 0.5
+    with pytest.raises(ValueError, match=r"Polygons \[1\] are not rectangles"):
+        getGridTiles(*flatten([wall, skewed]))
+    with pytest.raises(ValueError, match="exactly 4 vertices"):
+        getGridTiles(np.array([[0.0, 0.0, 0.0], [1.0, 0.0, 0.0], [0.0, 1.0, 0.0]]))
+    with pytest.raises(ValueError, match="at least one"):
+        getGridTiles(wall, nX=0, nY=2)
+
+
+def test_getRedundantVertices():
+    """Duplicate consecutive vertices and collinear ones are found in one pass, keeping at least 3 vertices."""
+    square = np.array(
+        [
+            [0.0, 0.0, 0.0],
+            [0.0, 0.0, 0.0],  # duplicate
+            [5.0, 0.0, 0.0],  # collinear
+            [10.0, 0.0, 0.0],
+            [10.0, 10.0, 0.0],
+            [10.0, 10.0, 0.001],  # duplicate, within tolerance
+            [0.0, 10.0, 0.0],
+            [0.0, 5.0, 0.0],  # collinear
+            [0.0, 0.005, 0.0],  # duplicate of the first vertex
+        ]
+    )
+    redundant = getRedundantVertices(square)
+    assert np.flatnonzero(redundant).tolist() == [1, 2, 5, 7, 8]
+    assert np.array_equal(square[~redundant], square[[0, 3, 4, 6]])
+    # A vertex further than tol from the edge is kept
+    assert not getRedundantVertices(square, tol=0.0001)[5]
+
+    # Polygons are never left with less than 3 vertices
+    flat = np.array([[0.0, 0.0, 0.0], [1.0, 0.0, 0.0], [2.0, 0.0, 0.0], [3.0, 0.0, 0.0]])
+    assert getRedundantVertices(flat).sum() <= 1
+    triangle = np.array([[0.0, 0.0, 0.0], [1.0, 0.0, 0.0], [1.0, 1.0, 0.0], [1.0, 1.0, 0.0]])
+    assert not getRedundantVertices(triangle[:3]).any()
+    assert getRedundantVertices(triangle).tolist() == [False, False, False, True]
+
+    # Batched, the polygons are independent
+    coords, offsets = flatten([triangle[:3], square, flat, triangle])
+    redundant = getRedundantVertices(coords, offsets)
+    expected = np.concatenate([getRedundantVertices(p) for p in [triangle[:3], square, flat, triangle]])
+    assert np.array_equal(redundant, expected)
+
+
+def _distancesToPolygon(points, polygon):
+    """The distance of each point to the closest edge of a closed polygon."""
+    starts, ends = polygon, np.roll(polygon, -1, axis=0)
+    d = ends - starts
+    t = np.clip(np.einsum('ijk,jk->ij', points[:, np.newaxis] - starts, d) / np.einsum('ij,ij->i', d, d), 0.0, 1.0)
+    closest = starts + t[..., np.newaxis] * d
+    return np.linalg.norm(points[:, np.newaxis] - closest, axis=2).min(axis=1)
+
+
+def test_getRedundantVertices_no_drift():
+    """The tolerance doesn't add up along a gentle arc nor along a chain of near-duplicates."""
+    tol = 0.0127
+    # A 100 m edge sampled every 0.5 m along a 0.5 m sag: removing all of it would lose 31.8 m2
+    x = np.linspace(0.0, 100.0, 201)
+    arc = np.column_stack([x, -0.5 * np.sin(np.pi * x / 100.0), np.zeros_like(x)])
+    polygon = np.concatenate([arc, [[100.0, 10.0, 0.0], [0.0, 10.0, 0.0]]])
+    redundant = getRedundantVertices(polygon, tol=tol)
+    assert 0 < redundant.sum() < 199
+    assert _distancesToPolygon(polygon, polygon[~redundant]).max() < tol
+    assert getAreas(polygon[~redundant]) == pytest.approx(getAreas(polygon), abs=100.0 * tol)
+
+    # Each vertex is within tol of the previous one, but the last one isn't within tol of the first one
+    chain = np.array(
+        [[0.0, 0.0, 0.0], [0.01, 0.0, 0.0], [0.02, 0.0, 0.0], [0.03, 0.0, 0.0], [0.03, 10.0, 0.0], [-10.0, 10.0, 0.0]]
+    )
+    redundant = getRedundantVertices(chain, tol=tol)
+    assert redundant.tolist() == [False, True, False, True, False, False]
+    assert _distancesToPolygon(chain, chain[~redundant]).max() < tol
+
+    # Same in a batch, and starting the polygons anywhere
+    coords, offsets = flatten([np.roll(polygon, 50, axis=0), np.roll(chain, 2, axis=0)])
+    redundant = getRedundantVertices(coords, offsets, tol=tol)
+    assert _distancesToPolygon(coords[:203], coords[:203][~redundant[:203]]).max() < tol
+    assert np.array_equal(redundant[203:], np.roll(getRedundantVertices(chain, tol=tol), 2))
@@ -0,0 +1,73 @@
+#!/usr/bin/env python
+"""Tests for `geomeffibem` loader from OpenStudio models."""
+
+import numpy as np
+import openstudio
+
+from geomeffibem.loader import SpaceGeometry, iter_spaces, transformation_from_openstudio
+from geomeffibem.polyhedron import Polyhedron
+from geomeffibem.surface import Surface
+from geomeffibem.surfacearray import SurfaceArray
+
+
+def test_transformation_from_openstudio():
+    """Test converting an openstudio.Transformation."""
+    os_t = openstudio.Transformation.translation(
+        openstudio.Vector3d(1.0, 2.0, 3.0)
+    ) * openstudio.Transformation.rotation(openstudio.Vector3d(0.0, 0.0, 1.0), openstudio.degToRad(30.0))
+    t = transformation_from_openstudio(os_t)
+    pts = np.array([[1.0, 0.0, 0.0], [4.0, 5.0, 6.0]])
+    expected = [os_t * openstudio.Point3d(*pt) for pt in pts]
+    np.testing.assert_allclose(t.apply(pts), [[pt.x(), pt.y(), pt.z()] for pt in expected])
+
+
+def test_iter_spaces():
+    """Test streaming the spaces of the example model."""
+    m = openstudio.model.exampleModel()
+    spaces = iter_spaces(m)
+    assert not isinstance(spaces, list)
+
+    spaceGeometries = list(spaces)
+    assert [x.name for x in spaceGeometries] == ['Space 1', 'Space 2', 'Space 3', 'Space 4']
+    for spaceGeometry in spaceGeometries:
+        assert isinstance(spaceGeometry, SpaceGeometry)
+        assert isinstance(spaceGeometry.surfaces, Polyhedron)
+        assert spaceGeometry.surfaces.isEnclosedVolume()[0]
+        assert np.isclose(spaceGeometry.surfaces.calcPolyhedronVolume(), 300.0)
+
+    # Space 2 has its origin at (10, 0, 0), so its surfaces are moved compared to from_Surface
+    space = m.getSpaceByName('Space 2').get()
+    os_surface = sorted(space.surfaces(), key=lambda x: x.nameString())[0]
+    relative = Surface.from_Surface(os_surface).to_numpy()
+    surface = spaceGeometries[1].surfaces.get_surface_by_name(os_surface.nameString())
+    np.testing.assert_allclose(surface.to_numpy(), relative + [10.0, 0.0, 0.0])
+
+    assert len(spaceGeometries[1].subSurfaces) == 1
+    assert len(spaceGeometries[1].shadingSurfaces) == 1
+    assert spaceGeometries[1].shadingSurfaces[0].name == 'Shading Surface 1'
+
+
+def test_iter_spaces_relative():
+    """Test the absolute=False option keeps the Space coordinates, like from_Surface."""
+    m = openstudio.model.exampleModel()
+    for spaceGeometry in iter_spaces(m, absolute=False):
+        space = m.getSpaceByName(spaceGeometry.name).get()
+        for os_surface in space.surfaces():
+            surface = spaceGeometry.surfaces.get_surface_by_name(os_surface.nameString())
+            np.testing.assert_allclose(surface.to_numpy(), Surface.from_Surface(os_surface).to_numpy())
+
+
+def test_iter_spaces_as_arrays():
+    """Test the asArrays option gives the same coordinates in contiguous arrays."""
+    m = openstudio.model.exampleModel()
+    for spaceGeometry, spaceArrays in zip(iter_spaces(m), iter_spaces(m, asArrays=True)):
+        assert spaceGeometry.name == spaceArrays.name
+        assert isinstance(spaceArrays.surfaces, SurfaceArray)
+        assert spaceArrays.surfaces.coords.flags['C_CONTIGUOUS']
+        assert np.isclose(spaceArrays.surfaces.volume(), 300.0)
+        np.testing.assert_allclose(
+            spaceArrays.surfaces.coords, np.concatenate([s.to_numpy() for s in spaceGeometry.surfaces.surfaces])
+        )
+        assert spaceArrays.surfaces.names == [s.name for s in spaceGeometry.surfaces.surfaces]
+        assert len(spaceArrays.subSurfaces) == len(spaceGeometry.subSurfaces)
+        assert len(spaceArrays.shadingSurfaces) == len(spaceGeometry.shadingSurfaces)
@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+"""Tests for `geomeffibem` surface matching."""
+
+import numpy as np
+import pytest
+
+from geomeffibem.matching import findMatchingSurfaces, getOverlapArea
+from geomeffibem.polyhedron import Polyhedron
+from geomeffibem.surface import Surface
+from geomeffibem.surfacearray import SurfaceArray
+from geomeffibem.vertex import Vertex
+
+
+def square(min_x, max_x, min_y, max_y, z=0.0):
+    """A horizontal rectangle, counterclockwise seen from above."""
+    return np.array([[min_x, min_y, z], [max_x, min_y, z], [max_x, max_y, z], [min_x, max_y, z]])
+
+
+def box(min_x, max_x, min_y, max_y, min_z=0.0, max_z=3.0):
+    """An enclosed box Polyhedron."""
+    surfaces = [
+        Surface.from_numpy_array(square(min_x, max_x, min_y, max_y, min_z)[::-1], name="Floor"),
+        Surface.from_numpy_array(square(min_x, max_x, min_y, max_y, max_z), name="Roof"),
+        Surface.Rectangle(min_x=min_x, max_x=max_x, min_y=min_y, max_y=min_y, min_z=min_z, max_z=max_z),
+        Surface.Rectangle(min_x=max_x, max_x=min_x, min_y=max_y, max_y=max_y, min_z=min_z, max_z=max_z),
+        Surface.Rectangle(min_x=min_x, max_x=min_x, min_y=max_y, max_y=min_y, min_z=min_z, max_z=max_z),
+        Surface.Rectangle(min_x=max_x, max_x=max_x, min_y=min_y, max_y=max_y, min_z=min_z, max_z=max_z),
+    ]
+    return Polyhedron(surfaces=surfaces)
+
+
+def test_getOverlapArea():
+    """Test overlap areas of coplanar polygons."""
+    a = square(0.0, 10.0, 0.0, 10.0)
+    assert np.isclose(getOverlapArea(a, a[::-1]), 100.0)
+    assert np.isclose(getOverlapArea(a, square(5.0, 15.0, 5.0, 15.0)), 25.0)
+    assert np.isclose(getOverlapArea(a, square(2.0, 4.0, 2.0, 4.0)), 4.0)
+    assert np.isclose(getOverlapArea(square(2.0, 4.0, 2.0, 4.0), a), 4.0)
+    assert np.isclose(getOverlapArea(a, square(0.0, 5.0, 0.0, 10.0)), 50.0)
+    assert getOverlapArea(a, square(10.0, 12.0, 0.0, 10.0)) == 0.0
+    assert getOverlapArea(a, square(20.0, 30.0, 0.0, 10.0)) == 0.0
+
+    # Non convex
+    lShape = np.array([[0, 0, 0], [10, 0, 0], [10, 5, 0], [5, 5, 0], [5, 10, 0], [0, 10, 0]], dtype=float)
+    assert np.isclose(getOverlapArea(lShape, a), 75.0)
+    assert np.isclose(getOverlapArea(lShape, square(6.0, 10.0, 6.0, 10.0)), 0.0)
+    assert np.isclose(getOverlapArea(lShape, square(4.0, 6.0, 4.0, 6.0)), 3.0)
+
+    # Tilted plane
+    c = 1.0 / np.sqrt(2.0)
+    rotation = np.array([[1.0, 0.0, 0.0], [0.0, c, c], [0.0, -c, c]])
+    assert np.isclose(getOverlapArea(a @ rotation.T, square(5.0, 15.0, 5.0, 15.0) @ rotation.T), 25.0)
+
+
+def test_findMatchingSurfaces():
+    """Test matching a 2x2 grid of boxes, with a second story on one."""
+    spaces = [
+        box(0.0, 10.0, 0.0, 10.0),
+        box(10.0, 20.0, 0.0, 10.0),
+        box(0.0, 10.0, 10.0, 20.0),
+        box(10.0, 20.0, 10.0, 20.0),
+        box(0.0, 10.0, 0.0, 10.0, 3.0, 6.0),
+    ]
+    matches = findMatchingSurfaces(spaces)
+    pairs = {(m.spaceA, spaces[m.spaceA].surfaces[m.surfaceA].name, m.spaceB, m.surfaceB) for m in matches}
+    assert len(matches) == 5
+    assert (0, "Roof", 4, 0) in pairs
+    assert all(np.isclose(m.overlapArea, 30.0) for m in matches if m.spaceB != 4)
+    for m in matches:
+        assert m.spaceA < m.spaceB
+        a = spaces[m.spaceA].surfaces[m.surfaceA]
+        b = spaces[m.spaceB].surfaces[m.surfaceB]
+        np.testing.assert_allclose(a.outwardNormal().to_numpy(), -b.outwardNormal().to_numpy(), atol=1e-12)
+
+    # Same result from SurfaceArrays
+    matches2 = findMatchingSurfaces([SurfaceArray.from_polyhedron(s) for s in spaces])
+    assert [(m.spaceA, m.surfaceA, m.spaceB, m.surfaceB) for m in matches2] == [
+        (m.spaceA, m.surfaceA, m.spaceB, m.surfaceB) for m in matches
+    ]
+
+
+def test_findMatchingSurfaces_partial():
+    """Test a big space next to two smaller ones, and tolerances."""
+    spaces = [box(0.0, 10.0, 0.0, 10.0), box(10.0, 20.0, 0.0, 4.0), box(10.0, 20.0, 4.0, 10.0)]
+    matches = findMatchingSurfaces(spaces)
+    assert [(m.spaceA, m.spaceB) for m in matches] == [(0, 1), (0, 2), (1, 2)]
+    np.testing.assert_allclose([m.overlapArea for m in matches], [12.0, 18.0, 30.0])
+
+    # A gap of 5mm is within the default tolerance of 1/2 inch, 5cm is not
+    assert len(findMatchingSurfaces([box(0.0, 10.0, 0.0, 10.0), box(10.005, 20.0, 0.0, 10.0)])) == 1
+    assert len(findMatchingSurfaces([box(0.0, 10.0, 0.0, 10.0), box(10.05, 20.0, 0.0, 10.0)])) == 0
+
+    # Surfaces of the same space are never matched
+    assert findMatchingSurfaces([box(0.0, 10.0, 0.0, 10.0)]) == []
+    assert findMatchingSurfaces([]) == []
+
+
+@pytest.mark.parametrize('angle', [0.5, 2.0])
+def test_findMatchingSurfaces_angle(angle):
+    """Test the tolerance on the normals."""
+    a = Surface.from_numpy_array(square(-5.0, 5.0, -5.0, 5.0), name="A")
+    b = Surface.from_numpy_array(square(-5.0, 5.0, -5.0, 5.0)[::-1], name="B").rotate(angle, axis=Vertex(1.0, 0.0, 0.0))
+    matches = findMatchingSurfaces([Polyhedron([a]), Polyhedron([b])], tol=0.1)
+    assert len(matches) == (1 if angle < 1.0 else 0)
@@ -32,3 +32,59 @@ def test_project():
     assert p.pointOnPlane(v2)
     with pytest.raises(ValueError):
         p.project(p)
+
+
+def test_batched_points():
+    """The batched signedDistances, pointsOnPlane and projectPoints match the per-Vertex methods."""
+    p = Plane(0.0, 0.6, -0.8, 3.0)
+    rng = np.random.default_rng(0)
+    points = rng.uniform(-10.0, 10.0, size=(50, 3))
+    points[:10] = p.projectPoints(points[:10])
+
+    distances = p.signedDistances(points)
+    assert distances.shape == (50,)
+    assert np.allclose(distances, points @ [0.0, 0.6, -0.8] + 3.0)
+    assert np.allclose(distances[:10], 0.0)
+
+    onPlane = p.pointsOnPlane(points)
+    assert onPlane.tolist() == [p.pointOnPlane(Vertex(*pt)) for pt in points]
+    assert onPlane[:10].all()
+
+    projected = p.projectPoints(points)
+    for pt, proj in zip(points, projected):
+        assert np.allclose(proj, p.project(Vertex(*pt)).to_numpy())
+
+
+def test_plane_cache_invalidation():
+    """The cached plane is recomputed when the vertices change."""
+    surface = Surface.Floor(min_x=0.0, max_x=10.0, min_y=0.0, max_y=10.0, z=3.0)
+    p = surface.get_plane()
+    assert p.d == 3.0
+
+    for v in surface.vertices:
+        v.z = 5.0
+    p2 = surface.get_plane()
+    assert p2 != p
+    assert p2.d == 5.0
+    assert surface.get_plane() == p2
+    cached = surface._fittedPlane()
+    assert surface._fittedPlane() is cached
+
+    surface.vertices.insert(1, Vertex(10.0, 5.0, 5.0))
+    assert surface._fittedPlane() is not cached
+    assert surface.get_plane() == p2
+
+    surface.vertices = list(reversed(surface.vertices))
+    assert surface.get_plane().c == 1.0
+
+
+def test_plane_equality():
+    """Planes compare and hash by their coefficients, so they can be used in sets and as dict keys."""
+    floor = Surface.Floor(min_x=0.0, max_x=10.0, min_y=0.0, max_y=10.0, z=3.0)
+    roof = Surface.Floor(min_x=0.0, max_x=10.0, min_y=0.0, max_y=10.0, z=6.0)
+    assert floor.get_plane() == Plane(0.0, 0.0, -1.0, 3.0)
+    assert hash(floor.get_plane()) == hash(floor.get_plane())
+    assert len({floor.get_plane(), floor.get_plane(), roof.get_plane()}) == 2
+    assert {floor.get_plane(): 'floor'}[Plane(0.0, 0.0, -1.0, 3.0)] == 'floor'
+    with pytest.raises(NotImplementedError):
+        floor.get_plane() == 1.0
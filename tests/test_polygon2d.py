@@ -0,0 +1,62 @@
+#!/usr/bin/env python
+"""Tests for `geomeffibem` 2D polygon helpers."""
+
+import numpy as np
+import pytest
+
+from geomeffibem.polygon2d import insidePolygon2d, segmentDistances2d, signedArea2d, splitEdges2d
+
+SQUARE = np.array([[0.0, 0.0], [2.0, 0.0], [2.0, 2.0], [0.0, 2.0]])
+
+
+def test_signedArea2d_insidePolygon2d():
+    """Shoelace area with its sign, and crossing number test, including a non-convex polygon."""
+    assert signedArea2d(SQUARE) == 4.0
+    assert signedArea2d(SQUARE[::-1]) == -4.0
+
+    lshape = np.array([[0.0, 0.0], [4.0, 0.0], [4.0, 2.0], [2.0, 2.0], [2.0, 4.0], [0.0, 4.0]])
+    points = np.array([[1.0, 1.0], [3.0, 1.0], [1.0, 3.0], [3.0, 3.0], [5.0, 1.0]])
+    assert insidePolygon2d(points, lshape).tolist() == [True, True, True, False, False]
+    assert insidePolygon2d(points, lshape[::-1]).tolist() == [True, True, True, False, False]
+
+
+def test_insidePolygon2d_edges():
+    """Explicit edges, eg: a region with a hole, and each point paired with its own polygon through offsets."""
+    hole = np.array([[0.5, 0.5], [0.5, 1.5], [1.5, 1.5], [1.5, 0.5]])
+    starts = np.concatenate([SQUARE, hole])
+    ends = np.concatenate([np.roll(SQUARE, -1, axis=0), np.roll(hole, -1, axis=0)])
+    points = np.array([[0.25, 1.0], [1.0, 1.0], [3.0, 1.0]])
+    assert insidePolygon2d(points, starts=starts, ends=ends).tolist() == [True, False, False]
+
+    # The first point against SQUARE, the second one against the hole alone, the last one against nothing
+    offsets = np.array([0, 4, 8, 8])
+    assert insidePolygon2d(points, starts=starts, ends=ends, offsets=offsets).tolist() == [True, True, False]
+    assert insidePolygon2d(points[:0], starts=starts[:0], ends=ends[:0], offsets=np.zeros(1, dtype=int)).size == 0
+
+    with pytest.raises(ValueError, match="either poly"):
+        insidePolygon2d(points, starts=starts)
+
+
+def test_segmentDistances2d():
+    """Distances to the closest point of each segment, including its ends."""
+    points = np.array([[1.0, -1.0], [3.0, 1.0], [1.0, 1.0]])
+    distances = segmentDistances2d(points, SQUARE, np.roll(SQUARE, -1, axis=0))
+    assert distances.shape == (3, 4)
+    np.testing.assert_allclose(distances[0], [1.0, np.sqrt(2.0), 3.0, np.sqrt(2.0)])
+    np.testing.assert_allclose(distances.min(axis=1), [1.0, 1.0, 1.0])
+
+
+def test_splitEdges2d():
+    """Edges are split where other edges cross them or end on them."""
+    starts, ends = SQUARE, np.roll(SQUARE, -1, axis=0)
+    # A square shifted by (1, 1): each of its edges crosses one edge of SQUARE
+    other = SQUARE + 1.0
+    fragStarts, fragEnds = splitEdges2d(starts, ends, other, np.roll(other, -1, axis=0), tol=0.001)
+    assert len(fragStarts) == 6
+    np.testing.assert_allclose(fragStarts[1:3], [[2.0, 0.0], [2.0, 1.0]])
+    np.testing.assert_allclose(fragEnds[:-1], fragStarts[1:])
+
+    # T-junction: a vertex of the other polygon on the first edge, within tol
+    tee = np.array([[1.0, 0.0005], [1.0, -1.0], [1.5, -1.0]])
+    fragStarts, _ = splitEdges2d(starts[:1], ends[:1], tee, np.roll(tee, -1, axis=0), tol=0.001)
+    np.testing.assert_allclose(fragStarts, [[0.0, 0.0], [1.0, 0.0]])
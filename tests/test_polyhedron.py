@@ -1,11 +1,17 @@
 #!/usr/bin/env python
 """Tests for `geomeffibem` Polyhedron class."""
 
+import copy
+import pickle
+
+import numpy as np
 import openstudio
 import pytest
 
-from geomeffibem.polyhedron import Polyhedron, edgesInBoth
+from geomeffibem.polyhedron import Polyhedron, edgesInBoth, simplifyPolyhedra
 from geomeffibem.surface import Surface
+from geomeffibem.transformation import Transformation
+from geomeffibem.vertex import Vertex
 
 
 @pytest.fixture
@@ -115,3 +121,269 @@ def test_edgesInBoth():
     assert len(edgesInBoth(edges, edges[:2])) == 2
     assert len(edgesInBoth(edges, [])) == 0
     assert len(edgesInBoth([], edges)) == 0
+
+
+def test_weldVertices(zonePolySplitWall):
+    """Test the welded vertices and index map."""
+    # 8 corners of the box, plus the 2 extra ones on the split wall
+    uniqueVertices = zonePolySplitWall.uniqueVertices()
+    assert len(uniqueVertices) == 10
+
+    uniqueVertices2, indexMap = zonePolySplitWall.weldVertices()
+    assert len(uniqueVertices2) == 10
+    assert len(indexMap) == len(zonePolySplitWall.surfaces)
+    for surface, ids in zip(zonePolySplitWall.surfaces, indexMap):
+        assert len(ids) == len(surface.vertices)
+        for vertex, uid in zip(surface.vertices, ids):
+            assert uniqueVertices2[uid] == vertex
+
+
+def test_edgesNotTwoForEnclosedVolumeTest(zonePoly, zonePolySplitWall):
+    """Test the edge counting."""
+    edgesNotTwo, edgesTwo = Polyhedron.edgesNotTwoForEnclosedVolumeTest(zonePoly)
+    assert not edgesNotTwo
+    # A box has 12 edges
+    assert len(edgesTwo) == 12
+    assert all(edge.count() == 2 for edge in edgesTwo)
+
+    # The split wall has a T-junction: the edge of the floor/ceiling is only used once, and so are the two halves
+    edgesNotTwo, edgesTwo = Polyhedron.edgesNotTwoForEnclosedVolumeTest(zonePolySplitWall)
+    assert len(edgesNotTwo) == 6
+    assert all(edge.count() == 1 for edge in edgesNotTwo)
+    # Vertical edge in the middle of the split wall is shared by the two halves
+    assert len(edgesTwo) == 11
+
+    # Edge order and orientation doesn't matter, and tolerance applies
+    floor = Surface.Floor(min_x=0.0, max_x=10.0, min_y=0.0, max_y=10.0, z=0.0)
+    ceiling = Surface.from_numpy_array(floor.to_numpy()[::-1] + [0.005, 0.0, 0.0])
+    edgesNotTwo, edgesTwo = Polyhedron.edgesNotTwoForEnclosedVolumeTest(Polyhedron([floor, ceiling]))
+    assert not edgesNotTwo
+    assert len(edgesTwo) == 4
+    assert edgesTwo[0].allSurfaces == [floor, ceiling]
+
+
+def _updateZonePolygonsForMissingColinearPointsReference(zonePoly):
+    """The original insert-and-restart algorithm, used as a reference."""
+    import copy
+
+    updZonePoly = copy.deepcopy(zonePoly)
+    uniqVertices = zonePoly.uniqueVertices()
+    for surface in updZonePoly.surfaces:
+        insertedVertex = True
+        while insertedVertex:
+            insertedVertex = False
+            for i, edge in enumerate(surface.to_Surface3dEdges()):
+                for testVertex in uniqVertices:
+                    if edge.containsPoints(testVertex):
+                        surface.vertices.insert(0 if i == len(surface.vertices) - 1 else i + 1, testVertex)
+                        insertedVertex = True
+                        break
+                if insertedVertex:
+                    break
+    return updZonePoly
+
+
+def test_updateZonePolygonsForMissingColinearPoints(zonePoly):
+    """Several collinear points on the same edge are all inserted, in order along the edge."""
+    wall = zonePoly.get_surface_by_name('1-SOUTH')
+    new_walls = wall.split_into_n_segments(n_segments=3, axis='x')
+    zonePolySplit3 = Polyhedron(surfaces=[x for x in zonePoly.surfaces if x.name != '1-SOUTH'] + new_walls)
+
+    isEnclosed, _ = Polyhedron.edgesNotTwoForEnclosedVolumeTest(zonePolySplit3)
+    updated = zonePolySplit3.updateZonePolygonsForMissingColinearPoints()
+    # Floor and ceiling got two extra vertices each
+    assert updated.numVertices() == zonePolySplit3.numVertices() + 4
+    edgesNotTwo, _ = Polyhedron.edgesNotTwoForEnclosedVolumeTest(updated)
+    assert not edgesNotTwo
+    # The original isn't modified
+    assert zonePolySplit3.numVertices() == 4 * 8
+
+    expected = _updateZonePolygonsForMissingColinearPointsReference(zonePolySplit3)
+    assert [s.name for s in updated.surfaces] == [s.name for s in expected.surfaces]
+    for s1, s2 in zip(updated.surfaces, expected.surfaces):
+        assert np.array_equal(s1.to_numpy(), s2.to_numpy())
+
+    # Same vertex order when the points are on the closing edge of a surface: they are inserted at the start
+    startsMoved = False
+    for _ in range(3):
+        for surface in zonePolySplit3.surfaces:
+            surface.vertices = surface.vertices[1:] + surface.vertices[:1]
+        updated = zonePolySplit3.updateZonePolygonsForMissingColinearPoints()
+        expected = _updateZonePolygonsForMissingColinearPointsReference(zonePolySplit3)
+        for s1, s2, original in zip(updated.surfaces, expected.surfaces, zonePolySplit3.surfaces):
+            assert np.array_equal(s1.to_numpy(), s2.to_numpy())
+            startsMoved |= not np.array_equal(s1.to_numpy()[0], original.to_numpy()[0])
+    assert startsMoved
+
+    # The class and the other attributes are kept, as with the deep copy it used to be
+    named = _NamedPolyhedron(zonePolySplit3.surfaces, zoneName="Zone 1")
+    named.edgeCounts()
+    updated = named.updateZonePolygonsForMissingColinearPoints()
+    assert type(updated) is _NamedPolyhedron
+    assert updated.zoneName == "Zone 1"
+    assert updated.numVertices() == named.numVertices() + 4
+    assert all(s1 is not s2 for s1, s2 in zip(updated.surfaces, named.surfaces))
+    assert updated._edgeCounts is None
+    assert updated.isEnclosedVolume(incremental=True) == (True, [])
+
+
+def test_simplify(zonePoly, zonePolySplitWall):
+    """Simplify undoes updateZonePolygonsForMissingColinearPoints, in place, for one or many Polyhedra."""
+    updated = zonePolySplitWall.updateZonePolygonsForMissingColinearPoints()
+    assert updated.numVertices() == zonePolySplitWall.numVertices() + 2
+    assert updated.simplify() == 2
+    assert updated.numVertices() == zonePolySplitWall.numVertices()
+    assert all(len(s.vertices) == 4 for s in updated.surfaces)
+    assert updated.calcPolyhedronVolume() == pytest.approx(300.0)
+    assert updated.simplify() == 0
+
+    polys = [zonePolySplitWall.updateZonePolygonsForMissingColinearPoints() for _ in range(3)]
+    polys[1].surfaces[0].vertices.append(polys[1].surfaces[0].vertices[0].copy())
+    assert simplifyPolyhedra([zonePoly] + polys).tolist() == [0, 2, 3, 2]
+    assert simplifyPolyhedra([]).tolist() == []
+
+
+def _edgeKeys(edges):
+    """The sorted (start, end, count) of a list of Surface3dEge, to compare them regardless of order."""
+    return sorted((tuple(sorted([tuple(e.start.to_numpy()), tuple(e.end.to_numpy())])), e.count()) for e in edges)
+
+
+def test_edgeCounts_incremental(zonePolySplitWall):
+    """The edge counts follow surfaces being added, removed and moved, and match a full recount."""
+    zonePoly = zonePolySplitWall
+    counts = zonePoly.edgeCounts()
+    assert zonePoly.edgeCounts() is counts
+    assert len(counts) == 17
+    # The split wall leaves a T-junction on the floor and roof edges
+    assert _edgeKeys(zonePoly.nonManifoldEdges()) == _edgeKeys(Polyhedron.edgesNotTwoForEnclosedVolumeTest(zonePoly)[0])
+    assert zonePoly.isEnclosedVolume(incremental=True) == (True, [])
+
+    roof = zonePoly.get_surface_by_name('ROOF')
+    zonePoly.removeSurface(roof)
+    assert roof not in counts
+    # The 5 top edges of the walls, and the T-junction on the floor
+    assert len(zonePoly.nonManifoldEdges()) == 8
+    isEnclosed, edges = zonePoly.isEnclosedVolume(incremental=True)
+    assert not isEnclosed
+    assert _edgeKeys(edges) == _edgeKeys(zonePoly.isEnclosedVolume()[1])
+    assert len(edges) == 5
+    zonePoly.addSurface(roof)
+    assert zonePoly.isEnclosedVolume(incremental=True) == (True, [])
+
+    # Moving a wall out and back
+    wall = zonePoly.get_surface_by_name('3-EAST')
+    zonePoly.transformSurface(wall, Transformation.Translation(Vertex(1.0, 0.0, 0.0)))
+    assert wall.to_numpy()[:, 0].tolist() == [11.0] * 4
+    assert _edgeKeys(zonePoly.nonManifoldEdges()) == _edgeKeys(Polyhedron.edgesNotTwoForEnclosedVolumeTest(zonePoly)[0])
+    isEnclosed, edges = zonePoly.isEnclosedVolume(incremental=True)
+    expected = zonePoly.isEnclosedVolume()
+    assert not isEnclosed
+    assert _edgeKeys(edges) == _edgeKeys(expected[1])
+    zonePoly.transformSurface(wall, Transformation.Translation(Vertex(-1.0, 0.0, 0.0)))
+    assert zonePoly.isEnclosedVolume(incremental=True) == (True, [])
+
+    # Editing the vertices directly, then telling the Polyhedron
+    wall.vertices[0].z = 4.0
+    zonePoly.updateSurface(wall)
+    assert len(zonePoly.nonManifoldEdges()) == len(Polyhedron.edgesNotTwoForEnclosedVolumeTest(zonePoly)[0])
+
+    with pytest.raises(ValueError, match="not in the Polyhedron"):
+        zonePoly.removeSurface(Surface.Floor())
+    with pytest.raises(ValueError, match="already counted"):
+        counts.add(wall)
+
+
+def test_edgeCounts_isEnclosedVolume_matches_full(zonePolySplitWall):
+    """After each kind of edit, the incremental check gives the same result and edges as a full isEnclosedVolume.
+
+    The added surfaces are on a 5 m grid, so they leave T-junctions on the existing edges and overlap them.
+    """
+    zonePoly = zonePolySplitWall
+    zonePoly.edgeCounts()
+    rng = np.random.default_rng(3)
+    kinds = []
+    for _ in range(60):
+        kind = rng.choice(['add', 'remove', 'transform'])
+        kinds.append(kind)
+        if kind == 'add':
+            x, y = rng.choice([0.0, 5.0, 10.0], size=2)
+            z = rng.choice([0.0, 3.0])
+            size = rng.choice([5.0, 10.0])
+            if rng.random() < 0.5:
+                zonePoly.addSurface(Surface.Rectangle(min_x=x, max_x=x + size, min_y=y, max_y=y, min_z=z, max_z=3.0))
+            else:
+                zonePoly.addSurface(Surface.Floor(min_x=x, max_x=x + size, min_y=y, max_y=y + size, z=z))
+        elif kind == 'remove' and len(zonePoly.surfaces) > 3:
+            zonePoly.removeSurface(zonePoly.surfaces[rng.integers(len(zonePoly.surfaces))])
+        else:
+            surface = zonePoly.surfaces[rng.integers(len(zonePoly.surfaces))]
+            zonePoly.transformSurface(
+                surface, Transformation.Translation(Vertex(*rng.choice([-5.0, 0.0, 5.0], size=3)))
+            )
+
+        isEnclosed, edges = zonePoly.isEnclosedVolume(incremental=True)
+        expectedEnclosed, expectedEdges = Polyhedron(surfaces=list(zonePoly.surfaces)).isEnclosedVolume()
+        assert isEnclosed == expectedEnclosed
+        assert _edgeKeys(edges) == _edgeKeys(expectedEdges)
+    assert set(kinds) == {'add', 'remove', 'transform'}
+
+
+def test_calcPolyhedronVolume(zonePoly, zonePolySplitWall):
+    """Test the volume calculation."""
+    assert np.isclose(zonePoly.calcPolyhedronVolume(), 300.0)
+    assert np.isclose(zonePolySplitWall.calcPolyhedronVolume(), 300.0)
+
+
+def test_polyhedron_pickle(zonePolySplitWall):
+    """Test pickling goes through flat arrays, and is lossless."""
+    data = pickle.dumps(zonePolySplitWall)
+    assert b'Vertex' not in data
+    zonePoly = pickle.loads(data)
+    assert [s.name for s in zonePoly.surfaces] == [s.name for s in zonePolySplitWall.surfaces]
+    for s, s2 in zip(zonePoly.surfaces, zonePolySplitWall.surfaces):
+        np.testing.assert_array_equal(s.to_numpy(), s2.to_numpy())
+        assert all(v.surface is s for v in s.vertices)
+    assert zonePoly.isEnclosedVolume()[0]
+
+
+class _NamedPolyhedron(Polyhedron):
+    """A subclass with an extra attribute."""
+
+    def __init__(self, surfaces, zoneName):
+        """Constructor."""
+        super().__init__(surfaces=surfaces)
+        self.zoneName = zoneName
+
+
+def test_polyhedron_copy(zonePolySplitWall):
+    """copy.copy shares the surfaces, copy.deepcopy keeps the class, attributes and edge counts, and pickle too."""
+    zonePoly = _NamedPolyhedron(zonePolySplitWall.surfaces, zoneName="Zone 1")
+    zonePoly.surfaces[0].tag = "custom"
+    counts = zonePoly.edgeCounts()
+
+    shallow = copy.copy(zonePoly)
+    assert type(shallow) is _NamedPolyhedron
+    assert shallow.surfaces is zonePoly.surfaces
+    assert shallow.surfaces[0] is zonePoly.surfaces[0]
+    assert shallow.edgeCounts() is counts
+
+    deep = copy.deepcopy(zonePoly)
+    assert type(deep) is _NamedPolyhedron
+    assert deep.zoneName == "Zone 1"
+    assert deep.surfaces[0] is not zonePoly.surfaces[0]
+    assert deep.surfaces[0].tag == "custom"
+    assert all(v.surface is s for s in deep.surfaces for v in s.vertices)
+    deepCounts = deep._edgeCounts
+    assert deepCounts is not None and deepCounts is not counts
+    assert deep.edgeCounts() is deepCounts
+    assert all(s in deepCounts for s in deep.surfaces)
+    # The copied edge counts follow the copied surfaces
+    deep.removeSurface(deep.surfaces[-1])
+    assert len(deep.nonManifoldEdges()) == len(Polyhedron.edgesNotTwoForEnclosedVolumeTest(deep)[0])
+    assert zonePoly.isEnclosedVolume(incremental=True) == (True, [])
+
+    unpickled = pickle.loads(pickle.dumps(zonePoly))
+    assert type(unpickled) is _NamedPolyhedron
+    assert unpickled.zoneName == "Zone 1"
+    assert unpickled._edgeCounts is None
+    assert unpickled.isEnclosedVolume(incremental=True) == (True, [])
@@ -0,0 +1,136 @@
+#!/usr/bin/env python
+"""Tests for `geomeffibem` instrumentation."""
+
+import json
+import pstats
+
+import matplotlib.pyplot as plt
+import pytest
+
+from geomeffibem import profiling
+from geomeffibem.polyhedron import Polyhedron
+from geomeffibem.surface import Surface, plot_vertices
+from geomeffibem.transformation import Transformation
+from geomeffibem.vertex import Vertex
+
+
+@pytest.fixture
+def splitWallBox():
+    """A box with its south wall split in two, so isEnclosedVolume goes through all its stages."""
+    surfaces = [
+        Surface.Floor(min_x=0.0, max_x=10.0, min_y=0.0, max_y=10.0, z=0.0),
+        Surface.Rectangle(min_x=10.0, max_x=0.0, min_y=0.0, max_y=10.0, min_z=3.0, max_z=3.0),
+        Surface.Rectangle(min_x=10.0, max_x=10.0, min_y=0.0, max_y=10.0, min_z=0.0, max_z=3.0),
+        Surface.Rectangle(min_x=10.0, max_x=0.0, min_y=10.0, max_y=10.0, min_z=0.0, max_z=3.0),
+        Surface.Rectangle(min_x=0.0, max_x=0.0, min_y=10.0, max_y=0.0, min_z=0.0, max_z=3.0),
+        Surface.Rectangle(min_x=0.0, max_x=5.0, min_y=0.0, max_y=0.0, min_z=0.0, max_z=3.0),
+        Surface.Rectangle(min_x=5.0, max_x=10.0, min_y=0.0, max_y=0.0, min_z=0.0, max_z=3.0),
+    ]
+    return Polyhedron(surfaces=surfaces)
+
+
+@pytest.fixture(autouse=True)
+def cleanProfiling():
+    """Each test starts with no measurements, and leaves the instrumentation disabled."""
+    profiling.reset()
+    yield
+    profiling.disable()
+    profiling.reset()
+
+
+def test_disabled(splitWallBox):
+    """Nothing is recorded unless enabled, and stage returns a shared object that does nothing."""
+    assert not profiling.isEnabled()
+    assert splitWallBox.isEnclosedVolume() == (True, [])
+    assert profiling.to_dict() == {}
+    with profiling.stage('test', elements=3) as s:
+        s.addElements(2)
+    assert profiling.stage('other') is s
+    assert profiling.to_dict() == {}
+
+
+def test_isEnclosedVolume_stages(splitWallBox):
+    """The stages of isEnclosedVolume are recorded, with their callers, times and element counts."""
+    with profiling.profile():
+        assert profiling.isEnabled()
+        assert splitWallBox.isEnclosedVolume() == (True, [])
+    assert not profiling.isEnabled()
+
+    stats = profiling.to_dict()
+    top = stats['Polyhedron.isEnclosedVolume']
+    assert top['calls'] == 1
+    assert top['elements'] == splitWallBox.numVertices()
+    assert top['callers'] == {}
+    for name in ['firstPass', 'collinearUpdate', 'secondPass']:
+        assert stats[f'Polyhedron.isEnclosedVolume.{name}']['callers'] == {'Polyhedron.isEnclosedVolume': 1}
+    # Enclosed on the second pass
+    assert 'Polyhedron.isEnclosedVolume.edgesInBoth' not in stats
+
+    assert stats['Polyhedron.isEnclosedVolume.firstPass']['elements'] == 17
+    assert stats['Polyhedron.isEnclosedVolume.secondPass']['elements'] == 15
+    assert stats['Polyhedron.edgesNotTwoForEnclosedVolumeTest']['callers'] == {
+        'Polyhedron.isEnclosedVolume.firstPass': 1,
+        'Polyhedron.isEnclosedVolume.secondPass': 1,
+    }
+    assert stats['Polyhedron.weldVertices']['calls'] == 3
+    for record in stats.values():
+        assert 0.0 <= record['ownTime'] <= record['totalTime'] <= top['totalTime']
+    assert top['ownTime'] < top['totalTime']
+
+    # Measurements add up, unless cleared
+    with profiling.profile(clear=False):
+        splitWallBox.isEnclosedVolume()
+    assert profiling.to_dict()['Polyhedron.isEnclosedVolume']['calls'] == 2
+
+
+def test_plot_vertices_stages():
+    """plot_vertices records the alignment and the centroid, and Transformation its operations."""
+    surface = Transformation.Rotation(axis=Vertex(1.0, 2.0, 3.0), radians=0.5) * Surface.Floor()
+    with profiling.profile():
+        plot_vertices(surface, force_align=True, name="Rotated")
+    plt.close('all')
+
+    stats = profiling.to_dict()
+    assert stats['plot_vertices']['calls'] == 1
+    assert stats['plot_vertices.alignment']['callers'] == {'plot_vertices': 1}
+    assert stats['plot_vertices.centroid']['elements'] == 4
+    assert stats['Transformation.alignFace']['callers'] == {'plot_vertices.alignment': 1}
+    # The Rotation above was done before enabling
+    assert 'Transformation.apply_many' not in stats
+
+
+def test_exports(tmp_path, splitWallBox):
+    """Export to JSON and to the cProfile formats."""
+
+    @profiling.instrumented(name='custom', elements=lambda n, scale=1: n * scale)
+    def custom(n, scale=1):
+        """A function to instrument."""
+        with profiling.stage('custom.inner') as inner:
+            inner.addElements(n)
+        return n
+
+    with profiling.profile():
+        assert custom(3, scale=2) == 3
+        splitWallBox.isEnclosedVolume()
+
+    stats = profiling.to_dict()
+    assert stats['custom']['elements'] == 6
+    assert stats['custom.inner']['elements'] == 3
+    assert custom.__doc__ == "A function to instrument."
+
+    path = tmp_path / 'profile.json'
+    content = profiling.to_json(path)
+    assert json.loads(path.read_text()) == json.loads(content) == stats
+
+    ps = profiling.to_pstats()
+    keys = {key[2]: key for key in ps.stats}
+    assert set(keys) == set(stats)
+    assert keys['custom'][0] == __file__
+    cc, nc, tt, ct, callers = ps.stats[keys['Polyhedron.weldVertices']]
+    assert nc == 3
+    assert callers[keys['Polyhedron.edgesNotTwoForEnclosedVolumeTest']][1] == 2
+    ps.sort_stats('cumulative')
+
+    dumped = tmp_path / 'profile.prof'
+    profiling.dump_stats(dumped)
+    assert pstats.Stats(str(dumped)).stats == ps.stats
@@ -0,0 +1,106 @@
+#!/usr/bin/env python
+"""Tests for `geomeffibem` spatial indexing helpers."""
+
+import numpy as np
+import pytest
+
+from geomeffibem.spatialindex import PointGrid, PointWelder, weldPoints
+from geomeffibem.vertex import Vertex
+
+
+def _bruteForceWeld(points, tol=0.0127):
+    """The pairwise scan weldPoints replaces."""
+    uniques = []
+    weldIds = []
+    for pt in points:
+        v = Vertex.from_numpy(pt)
+        for uid, u in enumerate(uniques):
+            if u == v:
+                weldIds.append(uid)
+                break
+        else:
+            weldIds.append(len(uniques))
+            uniques.append(v)
+    return uniques, weldIds
+
+
+def test_weldPoints():
+    """Welding is done within tolerance, including across grid cell boundaries."""
+    tol = 0.0127
+    points = np.array(
+        [
+            [0.0, 0.0, 0.0],
+            [0.0126, 0.0, 0.0],  # Same as 0
+            [0.0128, 0.0, 0.0],  # Not the same as 0
+            [10.0, 10.0, 10.0],
+            [tol * 100 - 0.001, 0.0, 0.0],  # Just below a cell boundary
+            [tol * 100 + 0.001, 0.0, 0.0],  # Just above, same as previous
+            [-0.005, -0.005, -0.005],  # Negative cell, same as 0
+        ]
+    )
+    uniqueIndices, weldIds = weldPoints(points, tol=tol)
+    assert uniqueIndices.tolist() == [0, 2, 3, 4]
+    assert weldIds.tolist() == [0, 0, 1, 2, 3, 3, 0]
+
+    with pytest.raises(ValueError):
+        weldPoints(points, tol=0.0)
+
+    uniqueIndices, weldIds = weldPoints(np.zeros((0, 3)))
+    assert len(uniqueIndices) == 0
+    assert len(weldIds) == 0
+
+
+def test_weldPoints_matches_pairwise_scan():
+    """Same result as the O(N^2) scan on clustered points."""
+    rng = np.random.default_rng(42)
+    centers = rng.uniform(0.0, 1.0, size=(50, 3)).round(1)
+    points = np.repeat(centers, 4, axis=0) + rng.uniform(-0.01, 0.01, size=(200, 3))
+    rng.shuffle(points)
+
+    uniques, expectedIds = _bruteForceWeld(points)
+    uniqueIndices, weldIds = weldPoints(points)
+    assert weldIds.tolist() == expectedIds
+    assert np.array_equal(points[uniqueIndices], np.array([v.to_numpy() for v in uniques]))
+
+
+def test_PointWelder():
+    """Adding points gives the same ids as weldPoints, and welded points are dropped with their last reference."""
+    rng = np.random.default_rng(0)
+    points = np.round(rng.uniform(0.0, 1.0, size=(200, 3)), 2)
+    _, weldIds = weldPoints(points)
+    welder = PointWelder()
+    assert welder.add(points[:100]) + welder.add(points[100:]) == weldIds.tolist()
+    assert len(welder) == weldIds.max() + 1
+
+    # Removing all the points welded to one of them drops it, and a new point near it gets a new id
+    uid = int(weldIds[0])
+    welder.remove([uid] * int((weldIds == uid).sum()))
+    assert uid not in welder.points
+    assert len(welder) == weldIds.max()
+    assert welder.add(points[0] + 0.001) == [weldIds.max() + 1]
+    # An existing point is found, across cells too
+    assert welder.add(points[1] - 0.01) == [weldIds[1]]
+
+    with pytest.raises(ValueError):
+        PointWelder(tol=0.0)
+
+
+def test_PointGrid():
+    """Box queries return the same points as a brute force scan."""
+    rng = np.random.default_rng(0)
+    points = rng.uniform(-10.0, 10.0, size=(500, 3))
+    grid = PointGrid(points)
+    assert len(grid) == 500
+
+    for _ in range(20):
+        a, b = rng.uniform(-12.0, 12.0, size=(2, 3))
+        lo = np.minimum(a, b)
+        hi = np.maximum(a, b)
+        expected = np.nonzero(((points >= lo) & (points <= hi)).all(axis=1))[0]
+        assert np.array_equal(grid.queryBox(lo, hi), expected)
+
+    # Huge box: all points
+    assert len(grid.queryBox([-1e6] * 3, [1e6] * 3)) == 500
+    # Degenerate grids
+    assert len(PointGrid(np.zeros((0, 3))).queryBox([0.0] * 3, [1.0] * 3)) == 0
+    assert PointGrid(np.zeros((3, 3))).queryBox([0.0] * 3, [0.0] * 3).tolist() == [0, 1, 2]
@@ -128,12 +128,22 @@ def test_Surface_centroid():
     """Test the centroid methods."""
     surface = Surface.Rectangle(min_x=0.0, max_x=10.0, min_y=0.0, max_y=10.0, min_z=0.0, max_z=0.0)
     assert surface.os_centroid() == Vertex(+5.0000, +5.0000, +0.0000)
+    assert surface.centroid() == Vertex(+5.0000, +5.0000, +0.0000)
     assert surface.rough_centroid() == Vertex(+5.0000, +5.0000, +0.0000)
 
+    # A square with an extra vertex on one side: the rough centroid is off, not the area-weighted one
+    surface = Surface.from_numpy_array(
+        [[0.0, 0.0, 0.0], [3.0, 0.0, 0.0], [3.0, 0.0, 3.0], [0.0, 0.0, 3.0], [0.0, 0.0, 2.0]]
+    )
+    assert surface.centroid() == surface.os_centroid()
+    assert surface.rough_centroid() != surface.os_centroid()
+
     # This isn't a surface, just four equal points...
     surface = Surface.Rectangle(min_x=0.0, max_x=0.0, min_y=0.0, max_y=0.0, min_z=0.0, max_z=0.0)
     with pytest.raises(ValueError):
         surface.os_centroid()
+    with pytest.raises(ValueError):
+        surface.centroid()
 
 
 def test_Surface_split():
@@ -240,3 +250,147 @@ def test_get_surface_from_surface_like():
     assert isinstance(get_surface_from_surface_like(os_sf), Surface)
 
     assert isinstance(get_surface_from_surface_like(surface.vertices), Surface)
+
+
+def test_surface_area_normal_tilt_azimuth():
+    """Test area, outwardNormal, tilt and azimuth."""
+    floor = Surface.Floor(min_x=0.0, max_x=10.0, min_y=0.0, max_y=5.0, z=0.0)
+    assert floor.area() == 50.0
+    assert floor.outwardNormal() == Vertex(0.0, 0.0, -1.0)
+    assert np.isclose(floor.tilt(), np.pi)
+
+    south_wall = Surface.Rectangle(min_x=0.0, max_x=10.0, min_y=0.0, max_y=0.0, min_z=0.0, max_z=3.0)
+    assert np.isclose(south_wall.area(), south_wall.os_area())
+    assert south_wall.outwardNormal() == Vertex(0.0, -1.0, 0.0)
+    assert np.isclose(south_wall.tilt(), np.pi / 2.0)
+    assert np.isclose(south_wall.azimuth(), np.pi)
+    assert np.isclose(south_wall.rotate(-90.0).azimuth(), np.pi / 2.0)
+    assert np.isclose(south_wall.rotate(90.0).azimuth(), 3.0 * np.pi / 2.0)
+
+
+def test_surface_containsPoints():
+    """Test point in polygon and signed distances for batches of points."""
+    south_wall = Surface.Rectangle(min_x=0.0, max_x=10.0, min_y=0.0, max_y=0.0, min_z=0.0, max_z=3.0)
+    points = np.array(
+        [
+            [5.0, 0.0, 1.5],  # inside
+            [5.0, -2.0, 1.5],  # inside once projected, outside the wall
+            [5.0, 0.0, 3.0],  # on the top edge
+            [11.0, 0.0, 1.5],  # outside
+        ]
+    )
+    assert south_wall.containsPoints(points).tolist() == [True, True, True, False]
+    assert south_wall.containsPoints(points, planeTol=0.01).tolist() == [True, False, True, False]
+    # The outward normal is -y
+    assert np.allclose(south_wall.signedDistances(points), [0.0, 2.0, 0.0, 0.0])
+
+    rotated = south_wall.rotate(30.0, axis=Vertex(1.0, 1.0, 0.0))
+    assert rotated.containsPoints(rotated.to_numpy()).all()
+    assert rotated.containsPoints(rotated.centroid().to_numpy(), planeTol=0.001).tolist() == [True]
+
+
+def test_surface_derived_cache(monkeypatch):
+    """Derived quantities are computed once, and recomputed as soon as the vertices change."""
+    import geomeffibem.surface
+
+    calls = []
+
+    def getAreasSpy(coords):
+        calls.append(1)
+        return getAreas(coords)
+
+    getAreas = geomeffibem.surface.getAreas
+    monkeypatch.setattr(geomeffibem.surface, 'getAreas', getAreasSpy)
+
+    floor = Surface.Floor(min_x=0.0, max_x=10.0, min_y=0.0, max_y=5.0, z=0.0)
+    assert floor.area() == 50.0
+    assert floor.area() == 50.0
+    assert len(calls) == 1
+    assert floor.perimeter() == 30.0
+    assert np.isclose(floor.tilt(), np.pi)
+
+    # The cached normal can't be modified through the returned Vertex
+    normal = floor.outwardNormal()
+    normal.z = 42.0
+    assert floor.outwardNormal() == Vertex(0.0, 0.0, -1.0)
+
+    # Same for the planes
+    for getter in [floor.get_plane, floor.plane]:
+        plane = getter()
+        assert getter() is not plane
+        plane.c = 42.0
+        plane.d = 42.0
+        assert (getter().c, getter().d) == (-1.0, 0.0)
+    assert floor.os_plane is not None and floor.os_plane.c == -1.0
+    assert floor.signedDistances(np.array([[0.0, 0.0, -1.0]])).tolist() == [1.0]
+
+    # Moving a vertex
+    floor.vertices[0].x = 20.0
+    assert floor.area() == 75.0
+    assert len(calls) == 2
+    assert np.isclose(floor.perimeter(), 35.0 + np.sqrt(125.0))
+
+    # Changing the list of vertices
+    floor.vertices.reverse()
+    assert floor.outwardNormal() == Vertex(0.0, 0.0, 1.0)
+    assert np.isclose(floor.tilt(), 0.0)
+    assert floor.plane().c == 1.0
+    assert floor.get_plane().c == 1.0
+    assert floor.area() == 75.0
+    assert len(calls) == 3
+
+    # Adding a collinear vertex changes the cache key, but not the results
+    floor.vertices.insert(1, Vertex(0.0, 2.5, 0.0))
+    assert floor.area() == 75.0
+    assert len(calls) == 4
+
+    # The key is taken once per call chain: tilt computes outwardNormal without checking the vertices again
+    keys = []
+    coords_key = Surface._coords_key
+    monkeypatch.setattr(Surface, '_coords_key', lambda self: keys.append(1) or coords_key(self))
+    floor.vertices[1].x = 1.0
+    assert np.isclose(floor.tilt(), 0.0)
+    assert len(keys) == 1
+    assert floor.outwardNormal() == Vertex(0.0, 0.0, 1.0)
+    assert len(keys) == 2
+
+
+def test_surface_simplify():
+    """Simplify removes duplicate and collinear vertices in place, and reports how many."""
+    floor = Surface.Floor(min_x=0.0, max_x=10.0, min_y=0.0, max_y=10.0, z=0.0)
+    vertices = floor.to_numpy()
+    floor.vertices.insert(1, Vertex(*vertices[0]))
+    floor.vertices.insert(3, Vertex(*((vertices[1] + vertices[2]) / 2.0)))
+    floor.vertices.insert(4, Vertex(*((vertices[1] + 3.0 * vertices[2]) / 4.0)))
+    area = floor.area()
+    assert len(floor.vertices) == 7
+
+    assert floor.simplify() == 3
+    assert np.array_equal(floor.to_numpy(), vertices)
+    assert floor.area() == area
+    assert all(v.surface is floor for v in floor.vertices)
+    assert floor.simplify() == 0
+
+
+def test_surface_construction_copies():
+    """The constructor copies the vertices, from_trusted_vertices takes ownership."""
+    surface = Surface.Floor(min_x=0.0, max_x=10.0, min_y=0.0, max_y=10.0, z=0.0)
+    assert all(v.surface is surface for v in surface.vertices)
+
+    # Constructing from the vertices of another Surface doesn't touch that one
+    other = Surface(vertices=surface.vertices, name="Other")
+    assert all(v.surface is other for v in other.vertices)
+    assert all(v.surface is surface for v in surface.vertices)
+    assert all(a is not b for a, b in zip(surface.vertices, other.vertices))
+    other.vertices[0].x = 100.0
+    assert surface.vertices[0].x == 10.0
+
+    vertices = [Vertex(0.0, 0.0, 0.0), Vertex(1.0, 0.0, 0.0), Vertex(1.0, 1.0, 0.0)]
+    trusted = Surface.from_trusted_vertices(vertices, name="Trusted")
+    assert trusted.name == "Trusted"
+    assert trusted.vertices is vertices
+    assert all(v.surface is trusted for v in vertices)
+
+    named = Surface.from_numpy_array(surface.to_numpy(), name="Named")
+    assert named.name == "Named"
+    assert np.array_equal(named.to_numpy(), surface.to_numpy())
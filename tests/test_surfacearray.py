@@ -0,0 +1,198 @@
+#!/usr/bin/env python
+"""Tests for `geomeffibem` SurfaceArray."""
+
+import numpy as np
+import openstudio
+import pytest
+
+from geomeffibem.polyhedron import Polyhedron
+from geomeffibem.surface import Surface
+from geomeffibem.surfacearray import SurfaceArray
+from geomeffibem.vertex import VertexView
+
+
+def test_surfacearray_roundtrip():
+    """Test the conversions from and to Surface objects."""
+    surfaces = [
+        Surface.Floor(min_x=0.0, max_x=10.0, min_y=0.0, max_y=10.0),
+        Surface.Rectangle(min_x=0.0, max_x=5.0, min_y=0.0, max_y=0.0, min_z=0.0, max_z=3.0),
+    ]
+    surfaces[0].name = "Floor"
+    sa = SurfaceArray.from_surfaces(surfaces)
+    assert len(sa) == 2
+    assert sa.numVertices() == 8
+    assert sa.names == ["Floor", None]
+    np.testing.assert_allclose(sa.areas(), [s.area() for s in surfaces])
+    np.testing.assert_allclose(sa.outwardNormals(), [s.outwardNormal().to_numpy() for s in surfaces])
+
+    for s, s2 in zip(surfaces, sa.to_surfaces()):
+        assert s.name == s2.name
+        np.testing.assert_allclose(s.to_numpy(), s2.to_numpy())
+
+    # Copy: modifying the surface doesn't touch the array
+    x = sa.coords[0, 0]
+    s = sa.to_surface(0)
+    s.vertices[0].x = 42.0
+    assert sa.coords[0, 0] == x
+
+    # No copy: the vertices are views
+    s = sa.to_surface(0, copy=False)
+    assert isinstance(s.vertices[0], VertexView)
+    s.vertices[0].x = 42.0
+    assert sa.coords[0, 0] == 42.0
+
+
+def test_surfacearray_volume():
+    """Test batched results on an enclosed zone."""
+    floor_surface = Surface.Floor(min_x=0.0, max_x=10.0, min_y=0.0, max_y=10.0, z=0.0)
+    m = openstudio.model.Model()
+    openstudio.model.Space.fromFloorPrint(floor_surface.to_Point3dVector(), 3.0, m).get()
+    zonePoly = Polyhedron([Surface.from_Surface(s) for s in m.getSurfaces()])
+
+    sa = SurfaceArray.from_polyhedron(zonePoly)
+    assert len(sa) == 6
+    assert np.isclose(sa.volume(), 300.0)
+    np.testing.assert_allclose(sa.centroids(), [s.centroid().to_numpy() for s in zonePoly.surfaces])
+    np.testing.assert_allclose(sa.planes()[:, :3], sa.outwardNormals())
+
+    poly = sa.to_polyhedron()
+    assert poly.isEnclosedVolume()[0]
+    assert np.isclose(poly.calcPolyhedronVolume(), 300.0)
+
+    # Points inside the box are on the inner side of all surfaces, and their projections are inside all of them
+    points = np.array([[5.0, 5.0, 1.5], [1.0, 9.0, 0.1]])
+    assert (sa.signedDistances(points) < 0.0).all()
+    inside = sa.containsPoints(points)
+    assert inside.shape == (2, 6)
+    assert inside.all()
+    assert not sa.containsPoints(points, planeTol=0.01).any()
+    assert sa.containsPoints(sa.centroids(), planeTol=0.01).diagonal().all()
+
+
+def test_surfacearray_concatenate():
+    """Test joining SurfaceArrays."""
+    a = SurfaceArray.from_surfaces([Surface.Floor(min_x=0.0, max_x=1.0, min_y=0.0, max_y=1.0)])
+    b = SurfaceArray.from_surfaces(
+        [
+            Surface.Rectangle(min_x=0.0, max_x=1.0, min_y=0.0, max_y=0.0, min_z=0.0, max_z=1.0),
+            Surface.Rectangle(min_x=0.0, max_x=2.0, min_y=0.0, max_y=0.0, min_z=0.0, max_z=1.0),
+        ]
+    )
+    c = SurfaceArray.concatenate([a, b])
+    assert len(c) == 3
+    np.testing.assert_array_equal(c.offsets, [0, 4, 8, 12])
+    np.testing.assert_allclose(c.areas(), [1.0, 1.0, 2.0])
+    assert len(SurfaceArray.concatenate([])) == 0
+
+
+def test_surfacearray_validation():
+    """Test that bad inputs are rejected."""
+    with pytest.raises(ValueError):
+        SurfaceArray(coords=np.zeros((4, 2)), offsets=[0, 4])
+    with pytest.raises(ValueError):
+        SurfaceArray(coords=np.zeros((4, 3)), offsets=[0, 3])
+    with pytest.raises(ValueError):
+        SurfaceArray(coords=np.zeros((4, 3)), offsets=[0, 4], names=["a", "b"])
+
+
+@pytest.fixture
+def surfaceArray():
+    """A fixture with a floor, an unnamed wall and welded vertices."""
+    floor = Surface.Floor(min_x=0.0, max_x=10.0, min_y=0.0, max_y=10.0)
+    floor.name = "Floor"
+    wall = Surface.Rectangle(min_x=0.0, max_x=10.0, min_y=0.0, max_y=0.0, min_z=0.0, max_z=3.0)
+    sa = SurfaceArray.from_surfaces([floor, wall])
+    sa.weld()
+    return sa
+
+
+@pytest.mark.parametrize('compressed', [False, True])
+def test_surfacearray_npz(tmp_path, surfaceArray, compressed):
+    """Test the npz round-trip is lossless."""
+    path = tmp_path / 'surfaces.npz'
+    surfaceArray.to_npz(path, compressed=compressed)
+    sa = SurfaceArray.from_npz(path)
+    np.testing.assert_array_equal(sa.coords, surfaceArray.coords)
+    np.testing.assert_array_equal(sa.offsets, surfaceArray.offsets)
+    np.testing.assert_array_equal(sa.weldIds, surfaceArray.weldIds)
+    assert sa.names == ["Floor", None]
+    # The floor and wall share two vertices
+    assert len(np.unique(sa.weldIds)) == 6
+
+    surfaceArray.weldIds = None
+    surfaceArray.to_npz(path, compressed=compressed)
+    assert SurfaceArray.from_npz(path).weldIds is None
+
+
+def test_surfacearray_npy_dir(tmp_path, surfaceArray):
+    """Test the memory-mapped npy directory round-trip, and zero-copy reconstruction."""
+    path = tmp_path / 'surfaces'
+    surfaceArray.to_npy_dir(path)
+    sa = SurfaceArray.from_npy_dir(path)
+    assert isinstance(sa.coords.base, np.memmap)
+    assert not sa.coords.flags.writeable
+    np.testing.assert_array_equal(sa.coords, surfaceArray.coords)
+    np.testing.assert_array_equal(sa.offsets, surfaceArray.offsets)
+    np.testing.assert_array_equal(sa.weldIds, surfaceArray.weldIds)
+    assert sa.names == ["Floor", None]
+    np.testing.assert_allclose(sa.areas(), [100.0, 30.0])
+
+    surface = sa.to_surface(1, copy=False)
+    assert np.shares_memory(surface.vertices[0]._data, sa.coords)
+    assert surface.name is None
+    np.testing.assert_array_equal(surface.to_numpy(), surfaceArray.get_coords(1))
+
+    # Overwriting without weldIds removes the stale file
+    surfaceArray.weldIds = None
+    surfaceArray.to_npy_dir(path)
+    assert SurfaceArray.from_npy_dir(path, mmap_mode=None).weldIds is None
+
+
+def test_surfacearray_polyhedron_roundtrip(tmp_path, surfaceArray):
+    """Test Polyhedron -> npz -> Polyhedron is lossless."""
+    zonePoly = surfaceArray.to_polyhedron()
+    path = tmp_path / 'zone.npz'
+    SurfaceArray.from_polyhedron(zonePoly).to_npz(path)
+    zonePoly2 = SurfaceArray.from_npz(path).to_polyhedron()
+    assert [s.name for s in zonePoly2.surfaces] == [s.name for s in zonePoly.surfaces]
+    for s, s2 in zip(zonePoly.surfaces, zonePoly2.surfaces):
+        np.testing.assert_array_equal(s.to_numpy(), s2.to_numpy())
+
+
+def test_surfacearray_subdivide():
+    """Subdivide rectangles in a grid of tiles, named after their surface."""
+    wall = Surface.Rectangle(min_x=0.0, max_x=10.0, min_y=0.0, max_y=0.0, min_z=0.0, max_z=3.0)
+    wall.name = "Wall"
+    roof = Surface.from_numpy_array(
+        Surface.Floor(min_x=0.0, max_x=10.0, min_y=0.0, max_y=5.0, z=3.0).rotate(20.0).to_numpy()
+    )
+    sa = SurfaceArray.from_surfaces([wall, roof])
+
+    tiles = sa.subdivide(nX=3, nY=2)
+    assert len(tiles) == 12
+    assert tiles.names[:6] == [f"Wall-{i}" for i in range(1, 7)]
+    assert tiles.names[6:] == [None] * 6
+    np.testing.assert_allclose(tiles.areas(), np.repeat(sa.areas() / 6.0, 6))
+    np.testing.assert_allclose(tiles.outwardNormals(), np.repeat(sa.outwardNormals(), 6, axis=0), atol=1e-12)
+
+    assert SurfaceArray.from_surfaces([roof]).subdivide(nX=2, nY=2).names == [None] * 4
+
+
+def test_surfacearray_simplify():
+    """Simplify all surfaces at once, and get the number of vertices removed from each."""
+    floor = Surface.Floor(min_x=0.0, max_x=10.0, min_y=0.0, max_y=10.0, z=0.0)
+    split = floor.split_into_n_segments(n_segments=3, axis='x')
+    sa = SurfaceArray.from_surfaces(split + [floor])
+    # Add the missing collinear points to the floor
+    updated = Polyhedron(surfaces=split + [floor]).updateZonePolygonsForMissingColinearPoints()
+    sa2 = SurfaceArray.from_polyhedron(updated)
+    assert sa2.numVertices() == sa.numVertices() + 4
+
+    simplified, removed = sa2.simplify()
+    assert removed.tolist() == [0, 0, 0, 4]
+    assert simplified.names == sa2.names
+    np.testing.assert_array_equal(simplified.coords, sa.coords)
+    np.testing.assert_array_equal(simplified.offsets, sa.offsets)
+
+    empty, removed = SurfaceArray.from_surfaces([]).simplify()
+    assert len(empty) == 0 and len(removed) == 0
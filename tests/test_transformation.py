@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+"""Tests for `geomeffibem` Transformation class."""
+
+import numpy as np
+import pytest
+
+from geomeffibem.surface import Surface
+from geomeffibem.transformation import Transformation
+from geomeffibem.vertex import Vertex
+
+
+@pytest.fixture
+def rotation():
+    """A rotation around Z, about a point that isn't the origin."""
+    return Transformation.Rotation(axis=Vertex(0.0, 0.0, 1.0), radians=np.deg2rad(30.0), point=Vertex(1.0, 2.0, 0.0))
+
+
+def _applyOne(t, point):
+    """Homogeneous product for a single point."""
+    return np.matmul(t.matrix, np.append(point, 1.0))[:3]
+
+
+def test_apply(rotation):
+    """Apply on an (N, 3) array is the same as the homogeneous product for each point."""
+    rng = np.random.default_rng(3)
+    points = rng.uniform(-10.0, 10.0, size=(50, 3))
+    expected = np.array([_applyOne(rotation, p) for p in points])
+
+    assert np.allclose(rotation.apply(points), expected)
+    assert np.allclose(rotation * points, expected)
+    assert np.allclose(rotation.apply(points[0]), expected[0])
+
+    out = np.empty_like(points)
+    result = rotation.apply(points, out=out)
+    assert result is out
+    assert np.allclose(out, expected)
+
+    # In place
+    rotation.apply(points, out=points)
+    assert np.allclose(points, expected)
+
+    with pytest.raises(ValueError):
+        rotation.apply(np.zeros((3, 2)))
+    with pytest.raises(ValueError):
+        rotation.apply(points, out=np.empty((2, 3)))
+
+
+def test_mul_vertices(rotation):
+    """Multiplying a Vertex or a list of Vertex."""
+    v = Vertex(3.0, 4.0, 5.0)
+    assert rotation * v == Vertex.from_numpy(_applyOne(rotation, v.to_numpy()))
+
+    vertices = [Vertex(0.0, 0.0, 0.0), Vertex(1.0, 0.0, 0.0)]
+    rotated = rotation * vertices
+    assert isinstance(rotated, np.ndarray)
+    assert all(isinstance(x, Vertex) for x in rotated)
+    assert rotated[1] == rotation * vertices[1]
+    assert all(isinstance(x, Vertex) for x in rotation * np.array(vertices))
+
+
+def test_apply_many(rotation):
+    """Transforming many surfaces at once."""
+    surfaces = [
+        Surface.Floor(min_x=0.0, max_x=10.0, min_y=0.0, max_y=10.0, z=0.0),
+        Surface.Rectangle(min_x=0.0, max_x=10.0, min_y=0.0, max_y=0.0, min_z=0.0, max_z=3.0),
+    ]
+    surfaces[0].name = "Floor"
+    results = rotation.apply_many(surfaces)
+    assert len(results) == 2
+    for surface, result in zip(surfaces, results):
+        assert np.allclose(result.to_numpy(), [_applyOne(rotation, p) for p in surface.to_numpy()])
+        assert np.allclose(result.to_numpy(), (rotation * surface).to_numpy())
+        assert np.isclose(result.area(), surface.area())
+    assert results[0].name == "Rotated Floor"
+    assert results[1].name == "Rotated unnamed"
+
+    # The original ones are untouched
+    assert np.array_equal(surfaces[0].to_numpy()[0], [10.0, 10.0, 0.0])
+    assert rotation.apply_many([]) == []
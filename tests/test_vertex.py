@@ -5,7 +5,16 @@ import numpy as np
 import openstudio
 import pytest
 
-from geomeffibem.vertex import Vertex, distanceFromPointToLine, isPointOnLineBetweenPoints
+from geomeffibem.surface import Surface
+from geomeffibem.vertex import (
+    Vertex,
+    VertexArray,
+    VertexView,
+    arePointsOnLineBetweenPoints,
+    distance,
+    distanceFromPointToLine,
+    isPointOnLineBetweenPoints,
+)
 
 
 def test_vertex_from_numpy():
@@ -101,3 +110,107 @@ def test_isPointOnLineBetweenPoints():
 
     testVertex.y = 1.0
     assert not isPointOnLineBetweenPoints(start=start, end=end, test=testVertex)
+
+
+def test_vertexarray_ops():
+    """Vectorized operations on a VertexArray match the Vertex ones."""
+    vertices = [Vertex(1.0, 0.0, 0.0), Vertex(0.0, 2.0, 0.0), Vertex(1.0, 2.0, 3.0)]
+    others = [Vertex(0.0, 1.0, 0.0), Vertex(3.0, 0.0, 1.0), Vertex(-1.0, 0.5, 2.0)]
+    va = VertexArray.from_vertices(vertices)
+    vb = VertexArray.from_vertices(others)
+    assert va.data.shape == (3, 3)
+    assert va.data.dtype == np.float64
+    assert len(va) == 3
+
+    for i, (v, o) in enumerate(zip(vertices, others)):
+        assert (va + vb)[i] == v + o
+        assert (va - vb)[i] == v - o
+        assert va.cross(vb)[i] == v.cross(o)
+        assert va.normalize()[i] == v.normalize()
+        assert np.isclose(va.dot(vb)[i], v.dot(o))
+        assert np.isclose(va.length()[i], v.length())
+        assert (2.0 * va)[i] == v * 2.0
+
+    # Broadcasting against a single Vertex
+    assert np.allclose((va - Vertex(1.0, 0.0, 0.0)).data[0], [0.0, 0.0, 0.0])
+    assert np.allclose(va.dot(Vertex(0.0, 0.0, 1.0)), [0.0, 0.0, 3.0])
+
+    with pytest.raises(ValueError):
+        VertexArray(np.zeros((3, 2)))
+    with pytest.raises(ValueError):
+        VertexArray(np.zeros((2, 3))).normalize()
+    with pytest.raises(ValueError):
+        va * va
+
+
+def test_vertexarray_views():
+    """Indexing a VertexArray hands out zero-copy Vertex-compatible proxies."""
+    arr = np.array([[0.0, 0.0, 0.0], [1.0, 2.0, 3.0]])
+    va = VertexArray(arr)
+    assert va.to_numpy() is arr
+
+    v = va[1]
+    assert isinstance(v, Vertex)
+    assert isinstance(v, VertexView)
+    assert v == Vertex(1.0, 2.0, 3.0)
+    assert np.array_equal(v.to_numpy(), [1.0, 2.0, 3.0])
+    v.x = 10.0
+    assert arr[1, 0] == 10.0
+    arr[1, 1] = 20.0
+    assert v.y == 20.0
+    assert va[-1] == v
+
+    # Operations on proxies return regular Vertex objects
+    assert type(v + v) is Vertex
+    assert type(v.copy()) is Vertex
+
+    sub = va[1:]
+    assert isinstance(sub, VertexArray)
+    sub[0].z = 30.0
+    assert arr[1, 2] == 30.0
+
+    assert [x.x for x in va] == [0.0, 10.0]
+    with pytest.raises(IndexError):
+        va[2]
+
+
+def test_vertexarray_conversions():
+    """Conversions from/to Surface, numpy and openstudio."""
+    surface = Surface.Rectangle(min_x=0.0, max_x=10.0, min_y=0.0, max_y=10.0, min_z=0.0, max_z=0.0)
+    va = VertexArray.from_surface(surface)
+    assert np.array_equal(va.to_numpy(), surface.to_numpy())
+    assert np.array_equal(VertexArray(surface.to_numpy()).to_numpy(), surface.to_numpy())
+    assert np.array_equal(va.to_surface(name="Floor").to_numpy(), surface.to_numpy())
+    assert all(a == b for a, b in zip(va.to_vertices(), surface.vertices))
+
+    points = va.to_Point3dVector()
+    assert isinstance(points, openstudio.Point3dVector)
+    assert np.array_equal(VertexArray.from_Point3dVector(points).to_numpy(), surface.to_numpy())
+    assert np.array_equal(VertexArray.from_Point3dVector(surface.to_Point3dVector()).to_numpy(), surface.to_numpy())
+
+    copied = va.copy()
+    copied[0].x = 100.0
+    assert va[0].x == 0.0
+
+
+def test_arePointsOnLineBetweenPoints():
+    """The vectorized version agrees with isPointOnLineBetweenPoints."""
+    start = Vertex(0.0, 0.0, 0.0)
+    end = Vertex(10.0, 0.0, 0.0)
+    points = np.array([[5.0, 0.0, 0.0], [11.0, 0.0, 0.0], [5.0, 0.0126, 0.0], [5.0, 1.0, 0.0], [0.0, 0.0, 0.0]])
+    mask = arePointsOnLineBetweenPoints(start, end, points)
+    assert mask.tolist() == [isPointOnLineBetweenPoints(start, end, Vertex.from_numpy(p)) for p in points]
+    assert mask.tolist() == [True, False, True, False, True]
+    assert not arePointsOnLineBetweenPoints(start, start, points).any()
+
+
+def test_vertex_slots():
+    """Vertex is a compact slotted type, and its scalar operations return plain floats."""
+    v = Vertex(3.0, 4.0, 0.0)
+    assert not hasattr(v, '__dict__')
+    with pytest.raises(AttributeError):
+        v.w = 1.0
+    assert v.length() == 5.0
+    assert distance(v, Vertex(0.0, 0.0, 0.0)) == 5.0
+    assert isinstance(distance(v, v), float)
+    assert np.isnan(distanceFromPointToLine(start=v, end=v, test=Vertex(0.0, 0.0, 0.0)))